@@ -1,4 +1,5 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import pool
@@ -7,6 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 from src.config import config as user_config
+from src.message.constant import PARTITION_PATTERN
 from src.models import Base
 
 # this is the Alembic Config object, which provides
@@ -26,6 +28,21 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # Monthly partitions of ``message`` are created at runtime, see
+    # src/message/partition.py, they must never be dropped.
+    if (
+        type_ == "table"
+        and reflected
+        and re.fullmatch(PARTITION_PATTERN, name)
+    ):
+        return False
+    # Postgres stores the trigram expression in its own normalized form,
+    # it never compares equal to the one declared in the model.
+    return not (type_ == "index" and name == "ix_user_search_trgm")
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +65,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -57,7 +75,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
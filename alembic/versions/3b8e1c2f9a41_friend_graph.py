@@ -0,0 +1,111 @@
+"""friend graph
+
+Revision ID: 3b8e1c2f9a41
+Revises: 65175d5b5fa2
+Create Date: 2024-09-20 14:02:11.318406
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b8e1c2f9a41"
+down_revision: str | None = "65175d5b5fa2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(
+        'DELETE FROM friend WHERE user_id NOT IN (SELECT id FROM "user")'
+    )
+    op.drop_constraint("friend_pkey", "friend", type_="primary")
+    op.drop_constraint("friend_friend_id_fkey", "friend", type_="foreignkey")
+    op.add_column(
+        "friend",
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+    )
+    op.create_primary_key("friend_pkey", "friend", ["user_id", "friend_id"])
+    op.create_foreign_key(
+        "friend_user_id_fkey",
+        "friend",
+        "user",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "friend_friend_id_fkey",
+        "friend",
+        "user",
+        ["friend_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        "ix_friend_friend_id_user_id",
+        "friend",
+        ["friend_id", "user_id"],
+        unique=False,
+    )
+    # Edges used to be stored one way only, add the missing direction.
+    op.execute(
+        "INSERT INTO friend (user_id, friend_id) "
+        "SELECT friend_id, user_id FROM friend "
+        "ON CONFLICT DO NOTHING"
+    )
+    op.create_table(
+        "friend_request",
+        sa.Column("sender_id", sa.Uuid(), nullable=False),
+        sa.Column("receiver_id", sa.Uuid(), nullable=False),
+        sa.Column("msg", sa.String(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["receiver_id"], ["user.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["sender_id"], ["user.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("sender_id", "receiver_id"),
+    )
+    op.create_index(
+        "ix_friend_request_receiver_id_sender_id",
+        "friend_request",
+        ["receiver_id", "sender_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_friend_request_receiver_id_sender_id", table_name="friend_request"
+    )
+    op.drop_table("friend_request")
+    op.drop_index("ix_friend_friend_id_user_id", table_name="friend")
+    op.drop_constraint("friend_friend_id_fkey", "friend", type_="foreignkey")
+    op.drop_constraint("friend_user_id_fkey", "friend", type_="foreignkey")
+    op.drop_constraint("friend_pkey", "friend", type_="primary")
+    # The old schema allows a single row per user_id.
+    op.execute(
+        "DELETE FROM friend a USING friend b "
+        "WHERE a.user_id = b.user_id AND a.friend_id > b.friend_id"
+    )
+    op.drop_column("friend", "created_at")
+    op.create_primary_key("friend_pkey", "friend", ["user_id"])
+    op.create_foreign_key(
+        "friend_friend_id_fkey", "friend", "user", ["friend_id"], ["id"]
+    )
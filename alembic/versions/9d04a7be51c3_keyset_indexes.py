@@ -0,0 +1,39 @@
+"""keyset indexes
+
+Revision ID: 9d04a7be51c3
+Revises: 3b8e1c2f9a41
+Create Date: 2024-09-23 11:47:52.604117
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d04a7be51c3"
+down_revision: str | None = "3b8e1c2f9a41"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_created_at_id",
+        "user",
+        ["created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_friend_user_id_created_at_friend_id",
+        "friend",
+        ["user_id", "created_at", "friend_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_friend_user_id_created_at_friend_id", table_name="friend"
+    )
+    op.drop_index("ix_user_created_at_id", table_name="user")
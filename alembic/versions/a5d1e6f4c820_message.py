@@ -0,0 +1,56 @@
+"""message
+
+Revision ID: a5d1e6f4c820
+Revises: f3c8d2a6b7e9
+Create Date: 2024-10-10 09:41:26.118302
+
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, date, datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a5d1e6f4c820"
+down_revision: str | None = "f3c8d2a6b7e9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# The current month and the next ones, later months are created by
+# ``python -m src.message.partition``.
+MONTHS = 4
+
+
+def _month(day: date, offset: int) -> date:
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "message",
+        sa.Column("conversation_id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("sender_id", sa.Uuid(), nullable=False),
+        sa.Column("recipient_id", sa.Uuid(), nullable=False),
+        sa.Column("body", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("conversation_id", "created_at", "id"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    today = datetime.now(UTC).date()
+    for offset in range(MONTHS):
+        start, end = _month(today, offset), _month(today, offset + 1)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS message_{start:%Y_%m} "
+            "PARTITION OF message FOR VALUES "
+            f"FROM ('{start} 00:00+00') TO ('{end} 00:00+00')"
+        )
+
+
+def downgrade() -> None:
+    # Dropping the parent drops every partition.
+    op.drop_table("message")
@@ -0,0 +1,32 @@
+"""user search
+
+Revision ID: d7e5f3a9b210
+Revises: c4a2e81f0d67
+Create Date: 2024-09-27 16:40:05.128734
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e5f3a9b210"
+down_revision: str | None = "c4a2e81f0d67"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # GiST rather than GIN: it can return rows nearest first for
+    # ORDER BY ... <<-> ... LIMIT, GIN would rank every match.
+    op.execute(
+        'CREATE INDEX ix_user_search_trgm ON "user" USING gist '
+        "(lower(first_name || ' ' || last_name || ' ' || email) "
+        "gist_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_search_trgm", table_name="user")
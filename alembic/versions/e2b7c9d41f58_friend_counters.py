@@ -0,0 +1,49 @@
+"""friend counters
+
+Revision ID: e2b7c9d41f58
+Revises: d7e5f3a9b210
+Create Date: 2024-10-04 11:22:37.504190
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7c9d41f58"
+down_revision: str | None = "d7e5f3a9b210"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COUNTERS = (
+    "friend_count",
+    "incoming_request_count",
+    "outgoing_request_count",
+)
+
+
+def upgrade() -> None:
+    for name in COUNTERS:
+        op.add_column(
+            "user",
+            sa.Column(
+                name, sa.Integer(), server_default=sa.text("0"), nullable=False
+            ),
+        )
+    op.execute(
+        'UPDATE "user" SET '
+        "friend_count = (SELECT count(*) FROM friend "
+        'WHERE friend.user_id = "user".id), '
+        "incoming_request_count = (SELECT count(*) FROM friend_request "
+        'WHERE friend_request.receiver_id = "user".id), '
+        "outgoing_request_count = (SELECT count(*) FROM friend_request "
+        'WHERE friend_request.sender_id = "user".id)'
+    )
+
+
+def downgrade() -> None:
+    for name in reversed(COUNTERS):
+        op.drop_column("user", name)
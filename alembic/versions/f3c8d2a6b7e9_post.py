@@ -0,0 +1,51 @@
+"""post
+
+Revision ID: f3c8d2a6b7e9
+Revises: e2b7c9d41f58
+Create Date: 2024-10-07 15:03:51.662418
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c8d2a6b7e9"
+down_revision: str | None = "e2b7c9d41f58"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "post",
+        sa.Column(
+            "id",
+            sa.BigInteger(),
+            sa.Identity(always=True),
+            nullable=False,
+        ),
+        sa.Column("author_id", sa.Uuid(), nullable=False),
+        sa.Column("body", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["author_id"], ["user.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_post_author_id_id", "post", ["author_id", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_author_id_id", table_name="post")
+    op.drop_table("post")
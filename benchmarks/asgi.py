@@ -0,0 +1,98 @@
+"""Minimal in-process ASGI client for the benchmarks.
+
+Requests go straight into the app's ASGI callable, so timings do not
+include a server, sockets or an HTTP client library.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlencode
+
+
+@dataclass
+class Response:
+    status: int = 0
+    headers: list[tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def cookie(self, name: str) -> str | None:
+        prefix = f"{name}=".encode()
+        for key, value in self.headers:
+            if key == b"set-cookie" and value.startswith(prefix):
+                return value[len(prefix) :].split(b";", 1)[0].decode()
+        return None
+
+
+class ASGIClient:
+    def __init__(self, app, cookies: dict[str, str] | None = None):
+        self.app = app
+        self.cookies = dict(cookies or {})
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        query: str = "",
+        json_body: Any = None,
+        form: dict[str, str] | None = None,
+    ) -> Response:
+        headers = []
+        body = b""
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers.append((b"content-type", b"application/json"))
+        elif form is not None:
+            body = urlencode(form).encode()
+            headers.append(
+                (b"content-type", b"application/x-www-form-urlencoded")
+            )
+        if body:
+            headers.append((b"content-length", str(len(body)).encode()))
+        if self.cookies:
+            cookie = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+            headers.append((b"cookie", cookie.encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+        }
+        response = Response()
+        chunks = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response.status = message["status"]
+                response.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        response.body = b"".join(chunks)
+        return response
+
+    async def get(self, path: str, query: str = "") -> Response:
+        return await self.request("GET", path, query)
+
+    async def post(
+        self,
+        path: str,
+        json_body: Any = None,
+        form: dict[str, str] | None = None,
+    ) -> Response:
+        return await self.request("POST", path, json_body=json_body, form=form)
@@ -0,0 +1,42 @@
+"""Emails rendered per second on one core.
+
+Compares building a ``MIMEMultipart`` tree per message with
+``generate_email`` against splicing fields into a precompiled message
+with ``renderer``:
+
+    python -m benchmarks.bench_email_render --messages 20000
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from benchmarks.baseline import generate_email
+from src.email_celery.constant import VERIFY_EMAIL
+from src.email_celery.renderer import TEMPLATE_DIR, renderer
+
+
+def rate(render, messages: int) -> float:
+    start = time.perf_counter()
+    for i in range(messages):
+        render(f"user{i}@example.com", f"token-{i:032d}")
+    return messages / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    html = Path(TEMPLATE_DIR / "confirm_email.html").read_text()
+    renderer.render(VERIFY_EMAIL, "warmup@example.com", "warmup")
+    cases = {
+        "generate_email": lambda email, token: generate_email(
+            email, token, html, "Verify your email"
+        ).as_string(),
+        "renderer": lambda email, token: renderer.render(
+            VERIFY_EMAIL, email, token
+        ),
+    }
+    for name, render in cases.items():
+        print(f"{name:>15}: {rate(render, args.messages):10.0f} msg/s")
@@ -0,0 +1,185 @@
+"""Home feed read latency and fan-out write amplification.
+
+Seeds synthetic users into the database and Redis from ``src.config``,
+use disposable ones. Friend counts follow a log-normal distribution,
+so most users have a few dozen friends and a tail has thousands, past
+``FANOUT_LIMIT``. A share of the users reads first so they have
+timelines, then random users post and the active users read:
+
+    python -m benchmarks.bench_feed --users 20000 --posts 20000
+
+Write amplification is the number of timelines a post was pushed to,
+reported next to the friend count pushing to everyone would cost.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from benchmarks.bench_pagination import SEED_USERS
+from src.cache import get_binary_redis
+from src.feed.repository import PostRepository
+from src.feed.service import Feed
+from src.models import Friend as FriendTable
+from src.models import User as UserTable
+from src.user.graph import FriendGraph
+from src.user.unit_of_work import UnitOfWork
+
+INSERT_BATCH = 5000
+UPDATE_COUNTERS = text(
+    'UPDATE "user" SET friend_count = ('
+    'SELECT count(*) FROM friend WHERE friend.user_id = "user".id) '
+    "WHERE email LIKE 'bench-%'"
+)
+
+
+def _friend_counts(users: int, median: float, sigma: float) -> list[int]:
+    return [
+        min(users - 1, max(1, round(random.lognormvariate(0, sigma) * median)))
+        for _ in range(users)
+    ]
+
+
+def _edges(ids: list[UUID], counts: list[int]) -> set[tuple[UUID, UUID]]:
+    """Undirected edges, each user picking about half its friends."""
+    edges = set()
+    for user_id, count in zip(ids, counts, strict=True):
+        for friend_id in random.sample(ids, count // 2 + 1):
+            if friend_id != user_id:
+                edges.add((user_id, friend_id))
+                edges.add((friend_id, user_id))
+    return edges
+
+
+async def seed(users: int, median: float, sigma: float) -> list[UUID]:
+    async with UnitOfWork() as uow:
+        await uow.session.execute(SEED_USERS, {"users": users})
+        ids = list(
+            await uow.session.scalars(
+                select(UserTable.id)
+                .where(UserTable.email.like("bench-%"))
+                .limit(users)
+            )
+        )
+        edges = [
+            {"user_id": user_id, "friend_id": friend_id}
+            for user_id, friend_id in _edges(
+                ids, _friend_counts(len(ids), median, sigma)
+            )
+        ]
+        for i in range(0, len(edges), INSERT_BATCH):
+            await uow.session.execute(
+                insert(FriendTable)
+                .values(edges[i : i + INSERT_BATCH])
+                .on_conflict_do_nothing()
+            )
+        await uow.session.execute(UPDATE_COUNTERS)
+        await uow.session.execute(text("ANALYZE friend"))
+        await uow.commit()
+    return ids
+
+
+async def _timed(
+    samples: list[float], call: Callable[[Feed, UnitOfWork], Awaitable]
+) -> Any:
+    async with UnitOfWork() as uow:
+        feed = Feed(
+            PostRepository(uow.session, uow.read_session),
+            FriendGraph(uow.friends, get_binary_redis()),
+            get_binary_redis(),
+        )
+        start = time.perf_counter()
+        result = await call(feed, uow)
+        samples.append(time.perf_counter() - start)
+        return result
+
+
+def _percentile(samples: list[float], percentile: int) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, len(samples) * percentile // 100)]
+
+
+async def main(
+    users: int,
+    median: float,
+    sigma: float,
+    active: float,
+    posts: int,
+    reads: int,
+) -> None:
+    ids = await seed(users, median, sigma)
+    readers = random.sample(ids, int(len(ids) * active))
+    warm: list[float] = []
+    for reader in readers:
+        await _timed(warm, lambda feed, uow, r=reader: feed.read(r, 20, None))
+
+    async def post(feed: Feed, uow: UnitOfWork) -> tuple[int, int]:
+        author = random.choice(ids)
+        created = await feed.repository.add(author, "bench post")
+        await uow.commit()
+        friends = len(await feed.graph.friend_ids(author))
+        return await feed.publish(created), friends
+
+    writes: list[float] = []
+    pushed, friends = [], []
+    for _ in range(posts):
+        timelines, count = await _timed(writes, post)
+        pushed.append(timelines)
+        friends.append(count + 1)
+
+    page: list[float] = []
+    for _ in range(reads):
+        reader = random.choice(readers)
+        await _timed(page, lambda feed, uow, r=reader: feed.read(r, 20, None))
+
+    print(f"{'':<22} {'p50':>9} {'p99':>9} {'max':>9}")
+    for name, samples in (
+        ("timeline build ms", warm),
+        ("post + fan-out ms", writes),
+        ("feed read ms", page),
+    ):
+        print(
+            f"{name:<22} {statistics.median(samples) * 1000:>9.2f} "
+            f"{_percentile(samples, 99) * 1000:>9.2f} "
+            f"{max(samples) * 1000:>9.2f}"
+        )
+    for name, values in (
+        ("timelines per post", pushed),
+        ("push-all per post", friends),
+    ):
+        print(
+            f"{name:<22} {statistics.median(values):>9.0f} "
+            f"{_percentile(values, 99):>9.0f} {max(values):>9.0f} "
+            f"mean {statistics.fmean(values):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--median-friends", type=float, default=80)
+    parser.add_argument("--sigma", type=float, default=1.2)
+    parser.add_argument("--active", type=float, default=0.3)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--reads", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(
+        main(
+            args.users,
+            args.median_friends,
+            args.sigma,
+            args.active,
+            args.posts,
+            args.reads,
+        )
+    )
@@ -0,0 +1,86 @@
+"""Throughput, latency and memory of batched message writes.
+
+Drives ``MessageWriter`` with many concurrent senders against the
+database and Redis from ``src.config``, use disposable ones:
+
+    python -m benchmarks.bench_messages --messages 100000 --senders 2000
+
+Peak memory is the traced peak over the run, it should stay flat as
+``--messages`` grows and grow with ``--senders`` only.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from src.cache import get_redis
+from src.database import get_engine
+from src.message.constant import (
+    WRITE_BATCH_SIZE,
+    WRITE_LINGER,
+    WRITE_QUEUE_SIZE,
+)
+from src.message.partition import ensure_partitions
+from src.message.schema import Message
+from src.message.writer import MessageWriter
+
+
+async def main(messages: int, senders: int, batch_size: int) -> None:
+    engine = get_engine()
+    await ensure_partitions(engine)
+    writer = MessageWriter(
+        engine, get_redis(), WRITE_QUEUE_SIZE, batch_size, WRITE_LINGER
+    )
+    pairs = [(uuid4(), uuid4()) for _ in range(senders)]
+    latencies: list[float] = []
+
+    async def sender(index: int, count: int) -> None:
+        sender_id, recipient_id = pairs[index]
+        for _ in range(count):
+            start = time.perf_counter()
+            await writer.write(
+                Message(
+                    id=uuid4(),
+                    sender_id=sender_id,
+                    recipient_id=recipient_id,
+                    body="bench message",
+                    created_at=datetime.now(UTC),
+                )
+            )
+            latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            sender(i, messages // senders + (i < messages % senders))
+            for i in range(senders)
+        )
+    )
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    await writer.close()
+
+    latencies.sort()
+    p99 = latencies[len(latencies) * 99 // 100]
+    stats = writer.stats()
+    print(f"messages/s      {stats['written'] / seconds:>10.0f}")
+    print(f"batches         {stats['batches']:>10}")
+    print(f"mean batch      {stats['written'] / stats['batches']:>10.1f}")
+    print(f"p50 ms          {statistics.median(latencies) * 1000:>10.2f}")
+    print(f"p99 ms          {p99 * 1000:>10.2f}")
+    print(f"peak KiB        {peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--senders", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=WRITE_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.senders, args.batch_size))
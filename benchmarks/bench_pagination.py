@@ -0,0 +1,94 @@
+"""Per-page latency of keyset vs OFFSET pagination of ``/user``.
+
+Seeds synthetic users into the database from ``src.config`` and times a
+page read at growing depths of the table:
+
+    python -m benchmarks.bench_pagination --users 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import delete, func, select, text
+
+from src.database import async_session_maker
+from src.models import User as UserTable
+from src.user.repositry import UserReadRepository
+
+SEED_USERS = text(
+    """
+    INSERT INTO "user" (
+        id, email, hashed_password, first_name, last_name,
+        is_active, is_superuser, is_verified, created_at
+    )
+    SELECT
+        gen_random_uuid(), 'bench-' || i || '@example.com', 'x',
+        'Bench', 'User', true, false, true,
+        TIMEZONE('utc', now()) - i * interval '1 millisecond'
+    FROM generate_series(1, :users) AS i
+    ON CONFLICT (email) DO NOTHING
+    """
+)
+DEPTHS = (0.0, 0.01, 0.1, 0.5, 0.9, 0.999)
+
+
+async def _timed(coro_factory, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def main(users: int, page_size: int, repeat: int, cleanup: bool):
+    async with async_session_maker() as session:
+        await session.execute(SEED_USERS, {"users": users})
+        await session.execute(text('ANALYZE "user"'))
+        await session.commit()
+        total = await session.scalar(
+            select(func.count()).select_from(UserTable)
+        )
+
+        repository = UserReadRepository(session)
+        order = (UserTable.created_at, UserTable.id)
+        print(f"{'depth':>10} {'keyset ms':>10} {'offset ms':>10}")
+        for fraction in DEPTHS:
+            depth = int(total * fraction)
+            after = None
+            if depth:
+                res = await session.execute(
+                    select(*order).order_by(*order).offset(depth - 1).limit(1)
+                )
+                after = tuple(res.one())
+            keyset = await _timed(
+                lambda after=after: repository.list(page_size, after), repeat
+            )
+            offset_stmt = (
+                select(UserTable)
+                .order_by(*order)
+                .offset(depth)
+                .limit(page_size)
+            )
+            offset = await _timed(
+                lambda stmt=offset_stmt: session.execute(stmt), repeat
+            )
+            print(f"{depth:>10} {keyset:>10.2f} {offset:>10.2f}")
+
+        if cleanup:
+            await session.execute(
+                delete(UserTable).where(UserTable.email.like("bench-%"))
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.page_size, args.repeat, args.cleanup))
@@ -0,0 +1,77 @@
+"""Per-request overhead of the rate limiter, p50 and p99.
+
+Drives ``RateLimiter.hit`` against the Redis from ``src.config`` with a
+few concurrent clients and many identities:
+
+    python -m benchmarks.bench_rate_limit --requests 20000
+
+``round trip`` takes one token from Redis per request, ``leased`` takes
+20 at a time, ``denied`` is a flood of an identity already over limit,
+answered in process.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from src.cache import get_redis
+from src.rate_limit import Policy, RateLimiter
+
+PERCENTILES = (50, 99)
+
+
+def _percentiles(samples: list[float]) -> list[float]:
+    samples = sorted(samples)
+    return [
+        samples[min(len(samples) - 1, len(samples) * p // 100)] * 1000
+        for p in PERCENTILES
+    ]
+
+
+async def run(
+    limiter: RateLimiter,
+    policy: Policy,
+    requests: int,
+    identities: int,
+    concurrency: int,
+) -> list[float]:
+    samples: list[float] = []
+
+    async def client(offset: int) -> None:
+        for i in range(offset, requests, concurrency):
+            start = time.perf_counter()
+            await limiter.hit(policy, "/bench", str(i % identities))
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return samples
+
+
+async def main(requests: int, identities: int, concurrency: int) -> None:
+    limiter = RateLimiter(get_redis(), 100000, 1)
+    prefix = uuid.uuid4().hex
+    cases = {
+        "round trip": Policy(f"{prefix}:rt", 10**9, 60),
+        "leased": Policy(f"{prefix}:lease", 10**9, 60, lease=20),
+        "denied": Policy(f"{prefix}:deny", 1, 3600),
+    }
+    print(f"{'case':>12} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, policy in cases.items():
+        await run(limiter, policy, identities, identities, concurrency)
+        samples = await run(limiter, policy, requests, identities, concurrency)
+        p50, p99 = _percentiles(samples)
+        print(f"{name:>12} {p50:8.3f} {p99:8.3f}")
+    print(limiter.stats())
+    keys = [key async for key in get_redis().scan_iter(f"*{prefix}*")]
+    if keys:
+        await get_redis().delete(*keys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--identities", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.identities, args.concurrency))
@@ -0,0 +1,72 @@
+"""Throughput and memory of the JSON read endpoints, served in process.
+
+Drives ``src.main.app`` over ASGI without a server or HTTP client, so
+the numbers are the cost of routing, queries and serialisation alone.
+Needs the database and Redis from ``src.config`` and a session cookie:
+
+    python -m benchmarks.bench_serialization --cookie <fastapi_users cookie>
+
+Run it on both sides of a change to compare. Peak memory is traced in a
+separate pass, as tracing slows every allocation down.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import text
+
+from benchmarks.asgi import ASGIClient
+from benchmarks.bench_pagination import SEED_USERS
+from src.database import async_session_maker
+from src.main import api_rate_limit, app
+
+ENDPOINTS = (
+    ("/user/me", ""),
+    ("/user", "limit=50"),
+    ("/user", "limit=500"),
+)
+
+
+async def main(cookie: str, users: int, requests: int) -> None:
+    async with async_session_maker() as session:
+        await session.execute(SEED_USERS, {"users": users})
+        await session.execute(text('ANALYZE "user"'))
+        await session.commit()
+    app.dependency_overrides[api_rate_limit] = lambda: None
+    client = ASGIClient(app, {"fastapi_users": cookie})
+
+    async def get(path: str, query: str) -> bytes:
+        response = await client.get(path, query)
+        assert response.status == 200, response.status
+        return response.body
+
+    print(f"{'endpoint':<20} {'bytes':>8} {'req/s':>8} {'peak KiB':>9}")
+    for path, query in ENDPOINTS:
+        size = len(await get(path, query))
+        start = time.perf_counter()
+        for _ in range(requests):
+            await get(path, query)
+        rate = requests / (time.perf_counter() - start)
+
+        tracemalloc.start()
+        peaks = []
+        for _ in range(min(requests, 100)):
+            tracemalloc.reset_peak()
+            await get(path, query)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        peak = sorted(peaks)[len(peaks) // 2] / 1024
+
+        name = f"{path}?{query}" if query else path
+        print(f"{name:<20} {size:>8} {rate:>8.0f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cookie", required=True)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.cookie, args.users, args.requests))
@@ -0,0 +1,49 @@
+"""Email throughput with and without a reused SMTP session.
+
+Sends rendered verification emails to a local SMTP sink. ``reconnect``
+opens a session per message, as the worker used to. ``persistent``
+keeps one session for the whole run, as ``SMTPConnection`` does now:
+
+    python -m benchmarks.bench_smtp --messages 500 --handshake-ms 30
+"""
+
+import argparse
+import time
+
+from benchmarks.baseline import generate_email
+from benchmarks.smtp_server import SMTPSink
+from src.email_celery.util import SMTPConnection
+
+HTML = "<html><body><a href='/verify/|token|'>Verify</a></body></html>"
+
+
+def run(sink: SMTPSink, messages: int, persistent: bool) -> float:
+    connection = SMTPConnection(
+        sink.host, sink.port, "bench@example.com", "secret", use_ssl=False
+    )
+    start = time.perf_counter()
+    for i in range(messages):
+        email = generate_email(
+            f"user{i}@example.com", f"token-{i}", HTML, "Verify your email"
+        )
+        connection.send(f"user{i}@example.com", email.as_string())
+        if not persistent:
+            connection.close()
+    connection.close()
+    return messages / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--handshake-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    with SMTPSink(handshake_delay=args.handshake_ms / 1000) as sink:
+        for mode, persistent in (("reconnect", False), ("persistent", True)):
+            connections = sink.connections
+            rate = run(sink, args.messages, persistent)
+            print(
+                f"{mode:>10}: {rate:8.1f} msg/s, "
+                f"{sink.connections - connections} connections"
+            )
@@ -0,0 +1,74 @@
+"""Import time of the web app and the worker entry points.
+
+Imports each module in a fresh interpreter under ``python -X importtime``,
+which is what a new worker pays before serving anything:
+
+    python -m benchmarks.bench_startup --runs 5
+
+Reports the median wall time of the process, the median cumulative
+import time of the module, the packages costing the most on the median
+run, and any stack the process loads although it should not, such as
+FastAPI in the outbox relay or Celery in the web app.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+# Entry point to packages its process should never import.
+TARGETS = {
+    "src.main": ("celery", "kombu", "uvicorn", "jinja2"),
+    "src.outbox.relay": ("fastapi", "fastapi_users", "starlette"),
+    "src.email_celery.router": ("fastapi", "fastapi_users", "sqlalchemy"),
+}
+
+
+def _import(module: str) -> tuple[float, dict[str, tuple[int, int]]]:
+    """Wall seconds and ``{module: (self, cumulative)}`` microseconds."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    seconds = time.perf_counter() - start
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return seconds, times
+
+
+def main(runs: int, top: int) -> None:
+    for module, forbidden in TARGETS.items():
+        samples = sorted(
+            (_import(module) for _ in range(runs)), key=lambda s: s[0]
+        )
+        seconds, times = samples[len(samples) // 2]
+        packages: Counter[str] = Counter()
+        for name, (own, _) in times.items():
+            packages[name.split(".")[0]] += own
+        loaded = sorted({name.split(".")[0] for name in times} & {*forbidden})
+
+        print(module)
+        print(f"  wall ms         {seconds * 1000:>9.1f}")
+        imported = statistics.median(t[module][1] for _, t in samples)
+        print(f"  import ms       {imported / 1000:>9.1f}")
+        print(f"  modules         {len(times):>9}")
+        for package, own in packages.most_common(top):
+            print(f"  {package:<16}{own / 1000:>9.1f}")
+        print(f"  unwanted        {', '.join(loaded) or '-':>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+    main(args.runs, args.top)
@@ -0,0 +1,140 @@
+"""Concurrent notification sockets per node and fan-out latency.
+
+Opens ``--sockets`` sockets to a running server with one auth cookie,
+then publishes events to that user through Redis and reports how long
+they took to reach every socket:
+
+    python -m benchmarks.bench_websocket --cookie <fastapi_users cookie> \\
+        --sockets 50000
+
+One client address can open about 28k sockets to one server port, raise
+``ulimit -n`` on both sides and use several client machines or source
+addresses (``--clients``) above that.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from uuid import UUID
+
+import websockets
+
+from src.auth.constant import SESSION_KEY
+from src.cache import get_redis
+from src.notification.constant import NotificationType
+from src.notification.schema import Notification
+from src.notification.service import publish
+
+PONG = json.dumps({"type": NotificationType.PONG})
+
+
+def _percentile(samples: list[float], p: int) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, len(samples) * p // 100)] * 1000
+
+
+async def client(
+    url: str,
+    cookie: str,
+    source: str | None,
+    handshakes: asyncio.Semaphore,
+    connected: asyncio.Event,
+    latencies: dict[str, list[float]],
+) -> None:
+    async with handshakes:
+        socket = await websockets.connect(
+            url,
+            additional_headers={"Cookie": f"fastapi_users={cookie}"},
+            local_addr=(source, 0) if source else None,
+            ping_interval=None,
+            max_queue=None,
+        )
+    connected.set()
+    async with socket:
+        async for raw in socket:
+            message = json.loads(raw)
+            if message["type"] == NotificationType.PING:
+                await socket.send(PONG)
+            elif message["type"] == NotificationType.FRIEND_REQUEST:
+                sent = float(message["msg"])
+                latencies[message["msg"]].append(time.time() - sent)
+
+
+async def main(
+    url: str,
+    cookie: str,
+    sockets: int,
+    events: int,
+    handshake_concurrency: int,
+    clients: list[str],
+) -> None:
+    session = await get_redis().get(SESSION_KEY.format(cookie))
+    user_id = UUID(session.split("|")[0])
+    handshakes = asyncio.Semaphore(handshake_concurrency)
+    latencies: dict[str, list[float]] = {}
+    events_connected = [asyncio.Event() for _ in range(sockets)]
+
+    start = time.perf_counter()
+    tasks = [
+        asyncio.create_task(
+            client(
+                url,
+                cookie,
+                clients[i % len(clients)] if clients else None,
+                handshakes,
+                events_connected[i],
+                latencies,
+            )
+        )
+        for i in range(sockets)
+    ]
+    await asyncio.gather(*(event.wait() for event in events_connected))
+    print(f"{sockets} sockets open in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'event':>6} {'delivered':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for i in range(events):
+        sent = repr(time.time())
+        latencies[sent] = []
+        await publish(
+            [user_id],
+            Notification(
+                type=NotificationType.FRIEND_REQUEST,
+                user_id=user_id,
+                msg=sent,
+            ),
+        )
+        await asyncio.sleep(2)
+        samples = latencies.pop(sent)
+        if samples:
+            p50, p99 = _percentile(samples, 50), _percentile(samples, 99)
+            print(f"{i:>6} {len(samples):>10} {p50:8.1f} {p99:8.1f}")
+        else:
+            print(f"{i:>6} {0:>10}")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--url", default="ws://127.0.0.1:8000/ws/notifications"
+    )
+    parser.add_argument("--cookie", required=True)
+    parser.add_argument("--sockets", type=int, default=50000)
+    parser.add_argument("--events", type=int, default=10)
+    parser.add_argument("--handshake-concurrency", type=int, default=500)
+    parser.add_argument("--clients", nargs="*", default=[])
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.url,
+            args.cookie,
+            args.sockets,
+            args.events,
+            args.handshake_concurrency,
+            args.clients,
+        )
+    )
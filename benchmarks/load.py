@@ -0,0 +1,224 @@
+"""Throughput and latency of the main API flows against local stand-ins.
+
+Starts a throwaway Postgres cluster (``initdb`` and ``pg_ctl`` on the
+PATH or in ``--pg-bin``), fakeredis and an in-memory Celery broker,
+migrates the database and drives ``src.main.app`` in process:
+
+    python -m benchmarks.load --users 500 --json .benchmarks/load.json
+
+Pass ``--database-url`` to use an existing, disposable database instead.
+Each flow runs as its own phase over all users (register, login,
+``/user/me``, verify and friend requests), so every row of the report
+is a single endpoint under ``--concurrency`` concurrent clients. The
+JSON output is meant to be diffed across commits.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from benchmarks import standins
+from benchmarks.asgi import ASGIClient, Response
+
+PASSWORD = "bench-password"
+
+
+class Phase:
+    def __init__(self, name: str, expected: int):
+        self.name = name
+        self.expected = expected
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.seconds = 0.0
+
+    async def run(
+        self,
+        calls: list[Callable[[], Awaitable[Response]]],
+        concurrency: int,
+    ) -> None:
+        slots = asyncio.Semaphore(concurrency)
+
+        async def timed(call):
+            async with slots:
+                start = time.perf_counter()
+                response = await call()
+                self.latencies.append(time.perf_counter() - start)
+                if response.status != self.expected:
+                    self.errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(timed(call) for call in calls))
+        self.seconds = time.perf_counter() - start
+
+    def result(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: int) -> float:
+            index = min(len(latencies) - 1, len(latencies) * p // 100)
+            return latencies[index] * 1000
+
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "req_per_s": len(latencies) / self.seconds,
+            "p50_ms": percentile(50),
+            "p99_ms": percentile(99),
+            "mean_ms": statistics.fmean(latencies) * 1000,
+        }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(users: int, concurrency: int, me_requests: int) -> dict:
+    # Imported here: settings are read at import, after the stand-ins.
+    from fastapi_users.jwt import generate_jwt
+
+    from src.auth.service import UserManager
+    from src.database import async_session_maker
+    from src.email_celery.router import async_queue
+    from src.main import app
+    from src.outbox.constant import BATCH_SIZE, POLL_INTERVAL
+    from src.outbox.relay import OutboxRelay
+
+    relay = asyncio.create_task(
+        OutboxRelay(
+            async_session_maker, async_queue, BATCH_SIZE, POLL_INTERVAL
+        ).run()
+    )
+    run_id = int(time.time())
+    emails = [f"bench-{run_id}-{i}@example.com" for i in range(users)]
+    clients = [ASGIClient(app) for _ in range(users)]
+    ids: list[str] = [""] * users
+    results = {}
+
+    async def register(i: int) -> Response:
+        response = await clients[i].post(
+            "/auth/register",
+            json_body={
+                "email": emails[i],
+                "password": PASSWORD,
+                "first_name": "Bench",
+                "last_name": f"User{i}",
+            },
+        )
+        if response.status == 201:
+            ids[i] = response.json()["id"]
+        return response
+
+    async def login(i: int) -> Response:
+        response = await clients[i].post(
+            "/auth/login", form={"username": emails[i], "password": PASSWORD}
+        )
+        cookie = response.cookie("fastapi_users")
+        if cookie:
+            clients[i].cookies["fastapi_users"] = cookie
+        return response
+
+    async def user_me(i: int) -> Response:
+        return await clients[i].get("/user/me")
+
+    async def request_verify(i: int) -> Response:
+        return await clients[i].post(
+            "/auth/request-verify-token", json_body={"email": emails[i]}
+        )
+
+    async def verify(i: int) -> Response:
+        # The same token the emailed link carries.
+        token = generate_jwt(
+            {
+                "sub": ids[i],
+                "email": emails[i],
+                "aud": UserManager.verification_token_audience,
+            },
+            UserManager.verification_token_secret,
+            UserManager.verification_token_lifetime_seconds,
+        )
+        return await clients[i].get(f"/auth/verify/{token}")
+
+    async def friend_request(i: int) -> Response:
+        other = ids[(i + 1) % users]
+        return await clients[i].post(f"/user/{other}/friend-request")
+
+    phases = (
+        ("register", 201, [register]),
+        ("login", 204, [login]),
+        ("user_me", 200, [user_me] * me_requests),
+        ("request_verify", 202, [request_verify]),
+        ("verify", 200, [verify]),
+        ("friend_request", 201, [friend_request]),
+    )
+    print(
+        f"{'phase':<16} {'requests':>8} {'errors':>6} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for name, expected, calls in phases:
+        phase = Phase(name, expected)
+        await phase.run(
+            [
+                lambda call=call, i=i: call(i)
+                for call in calls
+                for i in range(users)
+            ],
+            concurrency,
+        )
+        results[name] = result = phase.result()
+        print(
+            f"{name:<16} {result['requests']:>8} {result['errors']:>6} "
+            f"{result['req_per_s']:>8.0f} {result['p50_ms']:>8.1f} "
+            f"{result['p99_ms']:>8.1f}"
+        )
+
+    relay.cancel()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--me-requests", type=int, default=10)
+    parser.add_argument("--database-url")
+    parser.add_argument("--pg-bin")
+    parser.add_argument("--rate-limit", action="store_true")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_TOKEN_FOR_AUTH", "bench-secret")
+    if not args.rate_limit:
+        os.environ["RATE_LIMIT_ENABLED"] = "False"
+    standins.fake_redis()
+    if args.database_url:
+        standins.use_database_url(args.database_url)
+        database = contextlib.nullcontext()
+    else:
+        database = standins.ephemeral_postgres(args.pg_bin)
+
+    with database:
+        standins.migrate()
+        standins.memory_broker()
+        results = asyncio.run(
+            main(args.users, args.concurrency, args.me_requests)
+        )
+
+    if args.json_path:
+        report = {"commit": _commit(), "args": vars(args), "results": results}
+        os.makedirs(os.path.dirname(args.json_path) or ".", exist_ok=True)
+        with open(args.json_path, "w") as file:
+            json.dump(report, file, indent=2)
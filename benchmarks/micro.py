@@ -0,0 +1,102 @@
+"""Micro-benchmarks of hot in-process code, run with pytest-benchmark.
+
+Not collected by a plain ``pytest`` run, pass the file explicitly and
+keep the JSON to compare against later commits:
+
+    pytest benchmarks/micro.py --benchmark-json=.benchmarks/micro.json
+    pytest benchmarks/micro.py --benchmark-compare=.benchmarks/micro.json
+"""
+
+import uuid
+
+import pytest
+
+from benchmarks.baseline import generate_email
+from src.email_celery.constant import VERIFY_EMAIL
+from src.email_celery.renderer import renderer
+from src.user.repositry import FakeUserRepository
+from src.user.service import User
+
+REPOSITORY_SIZES = (100, 10_000)
+BULK_SIZE = 100_000
+TOKEN = "a" * 200
+
+
+def _user(i: int, validate: bool = True) -> User:
+    return User(
+        uuid.uuid4(),
+        "Bench",
+        f"User{i}",
+        f"bench-{i}@example.com",
+        validate=validate,
+    )
+
+
+@pytest.fixture(scope="module", params=REPOSITORY_SIZES, ids=str)
+def repository(request) -> FakeUserRepository:
+    return FakeUserRepository([_user(i) for i in range(request.param)])
+
+
+def test_user_init(benchmark):
+    benchmark(_user, 0)
+
+
+def test_send_friendrequest(benchmark):
+    sender, receiver = _user(0), _user(1)
+
+    def round_trip():
+        sender.send_friendrequest(receiver)
+        receiver.reject_friendrequest(sender)
+
+    benchmark(round_trip)
+
+
+def test_accept_friendrequest(benchmark):
+    sender, receiver = _user(0), _user(1)
+
+    def round_trip():
+        sender.send_friendrequest(receiver)
+        receiver.send_friendrequest(sender)
+        sender.remove_from_friend(receiver)
+        sender.reject_friendrequest(receiver)
+
+    benchmark(round_trip)
+
+
+def test_generate_email(benchmark):
+    html = "<p>Confirm your email: |token|</p>" * 20
+    benchmark(
+        lambda: generate_email(
+            "bench@example.com", TOKEN, html, "Confirm email"
+        ).as_string()
+    )
+
+
+def test_render_email(benchmark):
+    benchmark(renderer.render, VERIFY_EMAIL, "bench@example.com", TOKEN)
+
+
+def test_repository_get_by_id(benchmark, repository):
+    user = repository.list()[-1]
+    benchmark(repository.get_by_id, user.id)
+
+
+def test_repository_get_by_email(benchmark, repository):
+    user = repository.list()[-1]
+    benchmark(repository.get_by_email, user.email)
+
+
+def test_repository_add(benchmark):
+    repository = FakeUserRepository()
+    users = iter(_user(i, validate=False) for i in range(10**9))
+    benchmark.pedantic(
+        repository.add, setup=lambda: ((next(users),), {}), rounds=10_000
+    )
+
+
+def test_repository_add_many(benchmark):
+    def build():
+        users = [_user(i, validate=False) for i in range(BULK_SIZE)]
+        FakeUserRepository().add_many(users)
+
+    benchmark.pedantic(build, rounds=3)
@@ -0,0 +1,64 @@
+"""Minimal in-process SMTP sink standing in for the real mail server.
+
+Speaks enough SMTP for ``smtplib`` (EHLO, AUTH, MAIL, RCPT, DATA, RSET,
+NOOP, QUIT) and drops every message. ``handshake_delay`` is slept once
+per connection to model the TLS handshake and login round trips.
+"""
+
+import asyncio
+import threading
+
+
+class SMTPSink:
+    def __init__(self, host: str = "127.0.0.1", handshake_delay: float = 0):
+        self.host = host
+        self.port = 0
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self.messages = 0
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "SMTPSink":
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, 0)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake_delay)
+        writer.write(b"220 sink ESMTP\r\n")
+        while line := await reader.readline():
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-sink\r\n250 AUTH PLAIN LOGIN\r\n")
+            elif command == b"AUTH":
+                writer.write(b"235 2.7.0 Authentication successful\r\n")
+            elif command == b"DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                while await reader.readline() not in (b".\r\n", b""):
+                    pass
+                self.messages += 1
+                writer.write(b"250 OK\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
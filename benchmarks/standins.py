@@ -0,0 +1,143 @@
+"""Local stand-ins for the services the app talks to.
+
+Settings are read when ``src`` modules are imported, so everything here
+must be set up before the app is imported.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# The cluster only lives for one run, durability is not needed.
+POSTGRES_OPTIONS = (
+    "-c fsync=off -c synchronous_commit=off -c full_page_writes=off "
+    "-c max_connections=200"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _pg_binary(name: str, bin_dir: str | None) -> str:
+    path = shutil.which(name, path=bin_dir)
+    if path is None:
+        raise RuntimeError(
+            f"{name} not found, pass --pg-bin or --database-url"
+        )
+    return path
+
+
+@contextmanager
+def ephemeral_postgres(bin_dir: str | None = None) -> Iterator[None]:
+    """Run a throwaway Postgres cluster and point the settings at it."""
+    initdb = _pg_binary("initdb", bin_dir)
+    pg_ctl = _pg_binary("pg_ctl", bin_dir)
+    with tempfile.TemporaryDirectory(prefix="bench-pg-") as data:
+        subprocess.run(
+            [initdb, "-D", data, "-U", "bench", "--auth=trust", "-E", "UTF8"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        port = _free_port()
+        subprocess.run(
+            [
+                pg_ctl,
+                "-D",
+                data,
+                "-l",
+                os.path.join(data, "server.log"),
+                "-o",
+                f"-p {port} -k {data} {POSTGRES_OPTIONS}",
+                "-w",
+                "start",
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        os.environ.update(
+            POSTGRES_HOST="127.0.0.1",
+            POSTGRES_PORT=str(port),
+            POSTGRES_USER="bench",
+            POSTGRES_PASSWORD="",
+            POSTGRES_DB="postgres",
+        )
+        os.environ.pop("POSTGRES_REPLICA_HOST", None)
+        try:
+            yield
+        finally:
+            subprocess.run(
+                [pg_ctl, "-D", data, "-m", "immediate", "stop"],
+                check=False,
+                stdout=subprocess.DEVNULL,
+            )
+
+
+def use_database_url(url: str) -> None:
+    """Point the settings at an existing, disposable database."""
+    from sqlalchemy.engine import make_url
+
+    parsed = make_url(url)
+    os.environ.update(
+        POSTGRES_HOST=parsed.host or "127.0.0.1",
+        POSTGRES_PORT=str(parsed.port or 5432),
+        POSTGRES_USER=parsed.username or "",
+        POSTGRES_PASSWORD=parsed.password or "",
+        POSTGRES_DB=parsed.database or "",
+    )
+    os.environ.pop("POSTGRES_REPLICA_HOST", None)
+
+
+def migrate() -> None:
+    from alembic.config import Config
+
+    from alembic import command
+
+    command.upgrade(Config("alembic.ini"), "head")
+
+
+def fake_redis() -> None:
+    """Route every Redis client, sync and async, to one in-memory server.
+
+    Lua scripts (rate limiting, presence) need ``lupa`` installed.
+    """
+    import fakeredis
+    import redis
+    import redis.asyncio
+
+    server = fakeredis.FakeServer()
+
+    def from_url(cls, url, **kwargs):
+        fake = fakeredis.FakeRedis(server=server, **kwargs)
+        return cls(connection_pool=fake.connection_pool)
+
+    def async_from_url(cls, url, **kwargs):
+        fake = fakeredis.FakeAsyncRedis(server=server, **kwargs)
+        return cls(connection_pool=fake.connection_pool)
+
+    def pool_from_url(cls, url, **kwargs):
+        # Pool sizing means nothing in memory, keep only what clients see.
+        decode = kwargs.get("decode_responses", False)
+        fake = fakeredis.FakeAsyncRedis(server=server, decode_responses=decode)
+        return fake.connection_pool
+
+    # Keep the requested class, so instrumented clients stay instrumented.
+    redis.Redis.from_url = classmethod(from_url)
+    redis.asyncio.Redis.from_url = classmethod(async_from_url)
+    redis.from_url = redis.Redis.from_url
+    redis.asyncio.from_url = redis.asyncio.Redis.from_url
+    redis.asyncio.BlockingConnectionPool.from_url = classmethod(pool_from_url)
+
+
+def memory_broker() -> None:
+    """Keep Celery messages in process instead of sending them to RabbitMQ."""
+    from src.email_celery.router import async_queue
+
+    async_queue.conf.broker_url = "memory://"
+    async_queue.conf.broker_transport_options = {}
@@ -0,0 +1,158 @@
+from datetime import datetime
+from functools import cache
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.auth.constant import USER_CACHE_KEY
+from src.cache import LRUCache, get_redis
+from src.config import config
+from src.database import get_session
+from src.models import User
+
+# Never copied out of the database, Redis is shared with everything
+# else. Code that needs it reads the user with ``get_stored``.
+_UNCACHED = {"hashed_password"}
+# Every other column, a user rebuilt from the cache has no attribute
+# left to load from a session it is not attached to.
+_FIELDS: dict[str, type] = {
+    column.key: column.type.python_type
+    for column in User.__table__.columns
+    if column.key not in _UNCACHED
+}
+
+
+def _dump(user: User) -> dict[str, str]:
+    raw = {}
+    for name, type_ in _FIELDS.items():
+        value = getattr(user, name)
+        if value is None:
+            raw[name] = ""
+        elif type_ is bool:
+            raw[name] = "1" if value else "0"
+        elif type_ is datetime:
+            raw[name] = value.isoformat()
+        else:
+            raw[name] = str(value)
+    return raw
+
+
+def _load(raw: dict[str, str]) -> dict[str, Any]:
+    fields = {}
+    for name, type_ in _FIELDS.items():
+        value = raw[name]
+        if type_ is bool:
+            fields[name] = value == "1"
+        elif type_ is datetime:
+            fields[name] = datetime.fromisoformat(value) if value else None
+        elif type_ is UUID:
+            fields[name] = UUID(value)
+        elif type_ is int:
+            fields[name] = int(value)
+        else:
+            fields[name] = value
+    return fields
+
+
+class UserCache:
+    """Read-through cache of user rows keyed by id.
+
+    A short-lived in-process LRU sits in front of one Redis hash per
+    user. Entries are dropped by the ``UserManager`` hooks whenever a
+    user changes, and by the friend routes when counters change.
+    """
+
+    def __init__(self, redis: Redis, local: LRUCache, ttl: int):
+        self.redis = redis
+        self.local = local
+        self.ttl = ttl
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: UUID) -> dict[str, Any] | None:
+        fields = self.local.get(user_id)
+        if fields is not None:
+            self.local_hits += 1
+            return fields
+        raw = await self.redis.hgetall(USER_CACHE_KEY.format(user_id))
+        # Entries written before a column was added count as misses.
+        if not raw or _FIELDS.keys() - raw.keys():
+            self.misses += 1
+            return None
+        self.redis_hits += 1
+        fields = _load(raw)
+        self.local.set(user_id, fields)
+        return fields
+
+    async def set(self, user: User) -> None:
+        key = USER_CACHE_KEY.format(user.id)
+        raw = _dump(user)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=raw)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+        self.local.set(user.id, _load(raw))
+
+    async def invalidate(self, *user_ids: UUID) -> None:
+        for user_id in user_ids:
+            self.local.pop(user_id)
+        await self.redis.unlink(
+            *(USER_CACHE_KEY.format(user_id) for user_id in user_ids)
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "local_size": len(self.local),
+        }
+
+
+@cache
+def get_user_cache() -> UserCache:
+    return UserCache(
+        get_redis(),
+        LRUCache(config.USER_CACHE_LOCAL_SIZE, config.USER_CACHE_LOCAL_TTL),
+        config.USER_CACHE_TTL,
+    )
+
+
+class CachedUserDatabase(SQLAlchemyUserDatabase):
+    """``SQLAlchemyUserDatabase`` that reads users by id from the cache.
+
+    Cached users carry no ``hashed_password``, reading it raises
+    ``DetachedInstanceError``.
+    """
+
+    def __init__(
+        self, session: AsyncSession, user_table: type[User], cache: UserCache
+    ):
+        super().__init__(session, user_table)
+        self.cache = cache
+
+    async def get(self, id: UUID) -> User | None:
+        fields = await self.cache.get(id)
+        if fields is None:
+            user = await super().get(id)
+            if user is not None:
+                await self.cache.set(user)
+            return user
+        # Detached with its identity, so updates flush as UPDATE.
+        user = self.user_table(**fields)
+        make_transient_to_detached(user)
+        return user
+
+    async def get_stored(self, id: UUID) -> User | None:
+        """The user read from the database, password hash included."""
+        return await super().get(id)
+
+
+async def get_user_db(session: AsyncSession = Depends(get_session)):  # noqa: B008
+    yield CachedUserDatabase(session, User, get_user_cache())
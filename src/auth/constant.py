@@ -0,0 +1,22 @@
+USER_CACHE_KEY = "user:{}"
+SESSION_KEY = "session:{}"
+# Sorted set of a user's tokens scored by the end of their max age.
+SESSION_INDEX_KEY = "sessions:{}"
+# A session is extended once less than this share of its lifetime is left.
+SESSION_REFRESH_SHARE = 0.5
+
+ACCESS_TOKEN_AUDIENCE = "fastapi-users:auth"
+ACCESS_TOKEN_ALGORITHM = "HS256"
+REFRESH_COOKIE_NAME = "fastapi_users_refresh"
+# Joins the access and refresh token between strategy and transport.
+TOKEN_PAIR_SEPARATOR = "~"
+# Sorted set of "jti:<id>" and "user:<id>" scored by revocation time.
+REVOKED_KEY = "auth:revoked"
+
+# Rate limits as (requests, seconds).
+LOGIN_PER_IP = (30, 60)
+LOGIN_PER_USER_IP = (10, 300)
+REGISTER_PER_IP = (10, 3600)
+PASSWORD_RESET_PER_IP = (20, 3600)
+VERIFY_PER_IP = (10, 3600)
+EMAIL_PER_ADDRESS = (3, 3600)
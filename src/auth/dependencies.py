@@ -1,9 +1,33 @@
 import uuid
 
+from fastapi import WebSocket
 from fastapi_users import FastAPIUsers
 
-from src.auth.service import auth_backend, get_user_manager
+from src.auth.cache import CachedUserDatabase, get_user_cache
+from src.auth.constant import (
+    EMAIL_PER_ADDRESS,
+    LOGIN_PER_IP,
+    LOGIN_PER_USER_IP,
+    PASSWORD_RESET_PER_IP,
+    REGISTER_PER_IP,
+    VERIFY_PER_IP,
+)
+from src.auth.service import (
+    UserManager,
+    auth_backend,
+    cookie_transport,
+    get_auth_strategy,
+    get_user_manager,
+)
+from src.database import async_session_maker
 from src.models import User
+from src.rate_limit import (
+    Policy,
+    RateLimit,
+    body_email,
+    client_ip,
+    form_username_and_ip,
+)
 
 fastapi_users = FastAPIUsers[User, uuid.UUID](get_user_manager, [auth_backend])
 
@@ -12,3 +36,35 @@ current_verified = fastapi_users.current_user(active=True, verified=True)
 current_active_superuser = fastapi_users.current_user(
     active=True, superuser=True, verified=True
 )
+
+
+async def websocket_user(websocket: WebSocket) -> User | None:
+    """The active user owning the auth cookie of a WebSocket handshake.
+
+    The session is closed before returning, a long-lived socket must not
+    hold a database connection.
+    """
+    token = websocket.cookies.get(cookie_transport.cookie_name)
+    if token is None:
+        return None
+    async with async_session_maker() as session:
+        user_manager = UserManager(
+            CachedUserDatabase(session, User, get_user_cache())
+        )
+        user = await get_auth_strategy().read_token(token, user_manager)
+    return user if user is not None and user.is_active else None
+
+
+login_ip_limit = RateLimit(Policy("login:ip", *LOGIN_PER_IP), client_ip)
+login_user_limit = RateLimit(
+    Policy("login:user", *LOGIN_PER_USER_IP), form_username_and_ip
+)
+register_ip_limit = RateLimit(
+    Policy("register:ip", *REGISTER_PER_IP), client_ip
+)
+password_reset_ip_limit = RateLimit(
+    Policy("password:ip", *PASSWORD_RESET_PER_IP), client_ip
+)
+verify_ip_limit = RateLimit(Policy("verify:ip", *VERIFY_PER_IP), client_ip)
+# Caps the emails sent to one address, whoever asks for them.
+email_limit = RateLimit(Policy("email", *EMAIL_PER_ADDRESS), body_email)
@@ -32,3 +32,7 @@ class InvalidResetPasswordToken(Exception):
 class InvalidPasswordException(Exception):
     def __init__(self, reason: Any) -> None:
         self.reason = reason
+
+
+class PasswordHasherBusy(Exception):
+    pass
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any
+
+from fastapi_users.password import PasswordHelper
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from src.auth.exceptions import PasswordHasherBusy
+from src.config import config
+
+# New hashes use argon2 with the configured cost. Hashes made with other
+# parameters, or with bcrypt, still verify and are upgraded on login.
+password_helper = PasswordHelper(
+    PasswordHash(
+        (
+            Argon2Hasher(
+                time_cost=config.ARGON2_TIME_COST,
+                memory_cost=config.ARGON2_MEMORY_COST,
+                parallelism=config.ARGON2_PARALLELISM,
+            ),
+            BcryptHasher(),
+        )
+    )
+)
+
+
+def _hash(password: str) -> str:
+    return password_helper.hash(password)
+
+
+def _verify_and_update(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return password_helper.verify_and_update(password, hashed_password)
+
+
+class AsyncPasswordHelper:
+    """Run password hashing in an executor instead of the event loop.
+
+    At most ``max_pending`` calls are queued or running at a time,
+    callers past that get ``PasswordHasherBusy`` rather than waiting
+    behind a backlog that would time them out anyway.
+    """
+
+    def __init__(self, kind: str, workers: int, max_pending: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.seconds_total = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy("Too many pending password hashes")
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.seconds_total += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._run(_verify_and_update, password, hashed_password)
+
+    def generate(self) -> str:
+        return password_helper.generate()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "seconds_total": self.seconds_total,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+async_password_helper = AsyncPasswordHelper(
+    config.PASSWORD_HASH_EXECUTOR,
+    config.PASSWORD_HASH_WORKERS,
+    config.PASSWORD_HASH_MAX_PENDING,
+)
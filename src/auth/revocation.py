@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import logging
+import time
+from functools import cache
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.auth.constant import REVOKED_KEY
+from src.cache import get_auth_redis
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# Each sync reads again what was revoked this long before the previous
+# one started, for revocations written late or by a clock behind ours.
+SYNC_OVERLAP = 5
+
+
+class BloomFilter:
+    """Set of strings that may answer yes for a string never added."""
+
+    def __init__(self, bits: int, hashes: int):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8])
+        second = int.from_bytes(digest[8:]) | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationList:
+    """Revoked access tokens and users, checked in process.
+
+    Revocations go to a Redis sorted set scored by when they were made.
+    Every worker mirrors the set into a Bloom filter, reading what is
+    new every ``interval`` seconds and rebuilding the filter once per
+    ``lifetime``, after which older entries can not match a valid
+    token. A token that the filter does not know costs no I/O. A match
+    is confirmed with one ``ZMSCORE``.
+
+    Another worker sees a revocation up to ``interval`` seconds late.
+    When Redis can not be reached the last filter is kept and tokens it
+    does not know stay valid until they expire, while tokens it matches
+    are refused, as their match can not be confirmed.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        lifetime: int,
+        interval: float,
+        bits: int,
+        hashes: int,
+    ):
+        self.redis = redis
+        self.lifetime = lifetime
+        self.interval = interval
+        self.bits = bits
+        self.hashes = hashes
+        self.filter = BloomFilter(bits, hashes)
+        self._synced_at = 0.0
+        self._rebuild_at = 0.0
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.checks = 0
+        self.filter_hits = 0
+        self.revoked = 0
+        self.syncs = 0
+        self.sync_errors = 0
+        self.check_errors = 0
+
+    async def revoke_token(self, jti: str) -> None:
+        await self._revoke(f"jti:{jti}")
+
+    async def revoke_user(self, user_id: UUID) -> None:
+        """Revoke every access token issued to the user until now."""
+        await self._revoke(f"user:{user_id}")
+
+    async def _revoke(self, member: str) -> None:
+        await self.redis.zadd(REVOKED_KEY, {member: time.time()})
+        self.filter.add(member)
+
+    async def is_revoked(
+        self, jti: str, user_id: str, issued_at: float
+    ) -> bool:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        self.checks += 1
+        user = f"user:{user_id}"
+        members = [
+            member for member in (f"jti:{jti}", user) if member in self.filter
+        ]
+        if not members:
+            return False
+        self.filter_hits += 1
+        try:
+            scores = await self.redis.zmscore(REVOKED_KEY, members)
+        except RedisError:
+            # A filter hit that can not be confirmed counts as revoked.
+            self.check_errors += 1
+            logger.exception("Revocation check failed")
+            return True
+        for member, revoked_at in zip(members, scores, strict=True):
+            if revoked_at is not None and (
+                member != user or issued_at <= revoked_at
+            ):
+                self.revoked += 1
+                return True
+        return False
+
+    async def sync(self) -> None:
+        start = time.time()
+        if start >= self._rebuild_at:
+            await self.redis.zremrangebyscore(
+                REVOKED_KEY, "-inf", start - self.lifetime
+            )
+            members = await self.redis.zrange(REVOKED_KEY, 0, -1)
+            bloom = BloomFilter(self.bits, self.hashes)
+            for member in members:
+                bloom.add(member)
+            self.filter = bloom
+            self._rebuild_at = start + self.lifetime
+        else:
+            members = await self.redis.zrangebyscore(
+                REVOKED_KEY, self._synced_at - SYNC_OVERLAP, "+inf"
+            )
+            for member in members:
+                self.filter.add(member)
+        self._synced_at = start
+        self.syncs += 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except RedisError:
+                self.sync_errors += 1
+                logger.exception("Revocation sync failed")
+            self._ready.set()
+            await asyncio.sleep(self.interval)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "revoked": self.revoked,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+            "check_errors": self.check_errors,
+        }
+
+
+@cache
+def get_revocation_list() -> RevocationList:
+    return RevocationList(
+        get_auth_redis(),
+        config.ACCESS_TOKEN_LIFETIME,
+        config.REVOCATION_SYNC_INTERVAL,
+        config.REVOCATION_FILTER_BITS,
+        config.REVOCATION_FILTER_HASHES,
+    )
@@ -1,29 +1,64 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
-from fastapi.templating import Jinja2Templates
-from fastapi_users import BaseUserManager, exceptions, models, schemas
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Cookie,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from fastapi_users import BaseUserManager, exceptions, models
 from fastapi_users.router.common import ErrorCode, ErrorModel
 from pydantic import EmailStr
 
-from src.auth.dependencies import fastapi_users
-from src.auth.schema import UserCreate, UserRead, UserUpdate
-from src.auth.service import auth_backend, get_user_manager
+from src.auth.cache import get_user_cache
+from src.auth.constant import REFRESH_COOKIE_NAME
+from src.auth.dependencies import (
+    current_active_superuser,
+    current_active_user,
+    email_limit,
+    fastapi_users,
+    login_ip_limit,
+    login_user_limit,
+    password_reset_ip_limit,
+    register_ip_limit,
+    verify_ip_limit,
+)
+from src.auth.password import async_password_helper
+from src.auth.schema import StoredUserRead, UserCreate, UserRead
+from src.auth.service import (
+    auth_backend,
+    cookie_transport,
+    get_auth_strategy,
+    get_user_manager,
+)
+from src.auth.strategy import JwtStrategy, TokenPairTransport
+from src.models import User
 
 router = APIRouter()
 
 router.include_router(
     fastapi_users.get_auth_router(auth_backend),
+    dependencies=[Depends(login_ip_limit), Depends(login_user_limit)],
 )
 router.include_router(
     fastapi_users.get_register_router(UserRead, UserCreate),
+    dependencies=[Depends(register_ip_limit)],
 )
 router.include_router(
     fastapi_users.get_reset_password_router(),
+    dependencies=[Depends(password_reset_ip_limit), Depends(email_limit)],
 )
 
 
 @router.get(
     "/verify/{token}",
-    response_model=UserUpdate,
+    response_model=UserRead,
     name="verify:verify",
     tags=["auth"],
     responses={
@@ -60,17 +95,17 @@ async def verify(
 ):
     try:
         user = await user_manager.verify(token, request)
-        return schemas.model_validate(UserRead, user)
-    except (exceptions.InvalidVerifyToken, exceptions.UserNotExists) as exec:
+        return StoredUserRead.model_validate(user, from_attributes=True)
+    except (exceptions.InvalidVerifyToken, exceptions.UserNotExists) as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ErrorCode.VERIFY_USER_BAD_TOKEN,
-        ) from exec
-    except exceptions.UserAlreadyVerified as exec:
+        ) from exc
+    except exceptions.UserAlreadyVerified as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=ErrorCode.VERIFY_USER_ALREADY_VERIFIED,
-        ) from exec
+        ) from exc
 
 
 @router.post(
@@ -78,6 +113,7 @@ async def verify(
     status_code=status.HTTP_202_ACCEPTED,
     name="verify:request-token",
     tags=["auth"],
+    dependencies=[Depends(verify_ip_limit), Depends(email_limit)],
 )
 async def request_verify_token(
     request: Request,
@@ -99,13 +135,84 @@ async def request_verify_token(
     return None
 
 
-templates = Jinja2Templates(directory="src/auth/template")
+@router.post(
+    "/logout-all",
+    status_code=status.HTTP_204_NO_CONTENT,
+    name="auth:logout-all",
+    tags=["auth"],
+)
+async def logout_all(
+    user: User = Depends(current_active_user),  # noqa: B008
+) -> Response:
+    """End every session of the user, this one included."""
+    await get_auth_strategy().destroy_all(user.id)
+    return await cookie_transport.get_logout_response()
+
+
+@router.post(
+    "/refresh",
+    status_code=status.HTTP_204_NO_CONTENT,
+    name="auth:refresh",
+    tags=["auth"],
+)
+async def refresh(
+    refresh_token: str | None = Cookie(None, alias=REFRESH_COOKIE_NAME),
+    user_manager: BaseUserManager[models.UP, models.ID] = Depends(  # noqa: B008
+        get_user_manager
+    ),
+) -> Response:
+    """Trade the refresh token cookie for new access and refresh tokens."""
+    auth_strategy = get_auth_strategy()
+    if not isinstance(auth_strategy, JwtStrategy) or not isinstance(
+        cookie_transport, TokenPairTransport
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    refreshed = (
+        await auth_strategy.refresh(refresh_token) if refresh_token else None
+    )
+    if refreshed is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    user_id, token = refreshed
+    try:
+        user = await user_manager.get(user_manager.parse_id(user_id))
+    except (exceptions.UserNotExists, exceptions.InvalidID) as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED) from exc
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return await cookie_transport.get_login_response(token)
+
+
+@router.get("/user-cache", name="auth:user-cache-stats", tags=["auth"])
+async def user_cache_stats(
+    user: User = Depends(current_active_superuser),  # noqa: B008
+) -> dict[str, int]:
+    return get_user_cache().stats()
+
+
+@router.get(
+    "/password-hasher", name="auth:password-hasher-stats", tags=["auth"]
+)
+async def password_hasher_stats(
+    user: User = Depends(current_active_superuser),  # noqa: B008
+) -> dict[str, Any]:
+    return async_password_helper.stats()
+
+
+TEMPLATE_DIR = Path(__file__).parent / "template"
+
+
+@cache
+def _templates():
+    # Only this page renders a template, keep Jinja out of startup.
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(directory=TEMPLATE_DIR)
 
 
 @router.get(
     "/forgot-password-page", name="reset:forgot-password-page", tags=["page"]
 )
 async def forgot_password(token: str, request: Request):
-    return templates.TemplateResponse(
-        "forgot_password_form.html", {"request": request, "token": token}
+    return _templates().TemplateResponse(
+        request, "forgot_password_form.html", {"token": token}
     )
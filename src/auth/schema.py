@@ -17,6 +17,16 @@ class UserRead(schemas.BaseUser[UUID]):
     update_at: datetime.datetime | None = None
 
 
+class StoredUserRead(UserRead):
+    """``UserRead`` of a user loaded from the database.
+
+    Emails are validated before they are stored, checking them again on
+    the way out costs more than the rest of the response put together.
+    """
+
+    email: str
+
+
 class UserCreate(schemas.BaseUserCreate):
     first_name: first_name
     last_name: last_name
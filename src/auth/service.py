@@ -1,73 +1,300 @@
+import logging
 import uuid
+from functools import cache
+from typing import Any
 
-import redis
+import jwt
 from fastapi import Depends, Request
-from fastapi_users import BaseUserManager, UUIDIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, UUIDIDMixin, exceptions, schemas
 from fastapi_users.authentication import (
     AuthenticationBackend,
     CookieTransport,
-    RedisStrategy,
 )
-from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt, generate_jwt
 
-from src.auth.config import config as auth_config
-from src.config import config
-from src.database import get_user_db
-from src.email_celery.router import (
-    send_verification_email_task,
-    send_forgot_password_email_task,
+from src.auth.cache import CachedUserDatabase, get_user_cache, get_user_db
+from src.auth.constant import REFRESH_COOKIE_NAME
+from src.auth.password import async_password_helper, password_helper
+from src.auth.revocation import get_revocation_list
+from src.auth.strategy import (
+    JwtStrategy,
+    SessionStrategy,
+    TokenPairTransport,
 )
+from src.cache import LRUCache, get_auth_redis, get_redis
+from src.config import config
+from src.email_celery.constant import FORGOT_PASSWORD_EMAIL, VERIFY_EMAIL
 from src.models import User
+from src.outbox.constant import Topic
+from src.outbox.service import add_event
+from src.user.profile import invalidate_profiles
 
-SECRET = auth_config.SECRET_TOKEN_FOR_AUTH
-redis_connection = redis.asyncio.from_url(
-    config.REDIS_URL, decode_responses=True
-)
+SECRET = config.SECRET_TOKEN_FOR_AUTH
+
+logger = logging.getLogger(__name__)
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
+    """User manager that never hashes a password on the event loop.
+
+    The methods of ``BaseUserManager`` that hash or verify a password are
+    overridden to await ``async_password_helper`` instead of calling the
+    synchronous ``password_helper``.
+    """
+
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    def __init__(self, user_db: CachedUserDatabase):
+        super().__init__(user_db, password_helper)
+        self.hasher = async_password_helper
+
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Request | None = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await self.hasher.hash(password)
+        user_dict["id"] = uuid.uuid4()
+        add_event(
+            self.user_db.session,
+            Topic.USER_REGISTERED,
+            user_id=user_dict["id"],
+            email=user_dict["email"],
+        )
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> User | None:
+        """Check the credentials and upgrade an outdated password hash.
+
+        The hash is upgraded when it was made by another algorithm or
+        with other cost parameters than the configured ones.
+        """
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Hash anyway so a missing user takes as long as a wrong password.
+            await self.hasher.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await self.hasher.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(
+                user, {"hashed_password": updated_password_hash}
+            )
+            await get_user_cache().invalidate(user.id)
+        return user
+
+    async def forgot_password(
+        self, user: User, request: Request | None = None
+    ) -> None:
+        if not user.is_active:
+            raise exceptions.UserInactive()
+
+        token_data = {
+            "sub": str(user.id),
+            "password_fgpt": await self.hasher.hash(user.hashed_password),
+            "aud": self.reset_password_token_audience,
+        }
+        token = generate_jwt(
+            token_data,
+            self.reset_password_token_secret,
+            self.reset_password_token_lifetime_seconds,
+        )
+        await self.on_after_forgot_password(user, token, request)
+
+    async def reset_password(
+        self, token: str, password: str, request: Request | None = None
+    ) -> User:
+        try:
+            data = decode_jwt(
+                token,
+                self.reset_password_token_secret,
+                [self.reset_password_token_audience],
+            )
+            user_id = data["sub"]
+            password_fingerprint = data["password_fgpt"]
+            parsed_id = self.parse_id(user_id)
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID) as exc:
+            raise exceptions.InvalidResetPasswordToken() from exc
+
+        # The fingerprint is checked against the hash, which the user
+        # cache does not hold.
+        user = await self.user_db.get_stored(parsed_id)
+        if user is None:
+            raise exceptions.UserNotExists()
+
+        valid_fingerprint, _ = await self.hasher.verify_and_update(
+            user.hashed_password, password_fingerprint
+        )
+        if not valid_fingerprint:
+            raise exceptions.InvalidResetPasswordToken()
+
+        if not user.is_active:
+            raise exceptions.UserInactive()
+
+        updated_user = await self._update(user, {"password": password})
+        await self.on_after_reset_password(user, request)
+        return updated_user
+
+    async def _update(self, user: User, update_dict: dict[str, Any]) -> User:
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {
+                key: value
+                for key, value in update_dict.items()
+                if key != "password"
+            }
+            update_dict["hashed_password"] = await self.hasher.hash(password)
+        event = None
+        if update_dict.get("is_verified") and not user.is_verified:
+            event = add_event(
+                self.user_db.session,
+                Topic.USER_VERIFIED,
+                user_id=user.id,
+                email=user.email,
+            )
+        try:
+            return await super()._update(user, update_dict)
+        except Exception:
+            # Nothing was written, the event must not go out with the
+            # next commit of this session.
+            if event is not None:
+                self.user_db.session.expunge(event)
+            raise
+
+    async def _send_email(self, user: User, token: str, kind: str) -> None:
+        add_event(
+            self.user_db.session,
+            Topic.EMAIL,
+            email=user.email,
+            token=token,
+            kind=kind,
+        )
+        await self.user_db.session.commit()
+
     async def on_after_register(
         self, user: User, request: Request | None = None
     ):
-        print(f"User {user.id} has registered.")
+        logger.info("User registered", extra={"user_id": str(user.id)})
+
+    async def on_after_update(
+        self,
+        user: User,
+        update_dict: dict[str, Any],
+        request: Request | None = None,
+    ):
+        await get_user_cache().invalidate(user.id)
+        await invalidate_profiles(get_redis(), user.id)
+
+    async def on_after_verify(
+        self, user: User, request: Request | None = None
+    ):
+        await get_user_cache().invalidate(user.id)
+
+    async def on_after_reset_password(
+        self, user: User, request: Request | None = None
+    ):
+        await get_user_cache().invalidate(user.id)
+        await get_auth_strategy().destroy_all(user.id)
+
+    async def on_after_delete(
+        self, user: User, request: Request | None = None
+    ):
+        await get_user_cache().invalidate(user.id)
+        await get_auth_strategy().destroy_all(user.id)
+        await invalidate_profiles(get_redis(), user.id)
 
     async def on_after_forgot_password(
         self, user: User, token: str, request: Request | None = None
     ):
-        print(
-            f"""User {user.id} hasforgot their
-              password.Reset token: {token}"""
+        # Never log the token, it grants a password change.
+        logger.info(
+            "Password reset requested", extra={"user_id": str(user.id)}
         )
-        send_forgot_password_email_task.delay(user.email, token)
+        await self._send_email(user, token, FORGOT_PASSWORD_EMAIL)
 
     async def on_after_request_verify(
         self, user: User, token: str, request: Request | None = None
     ):
-        print(
-            f"""Verification requested for user {user.id}.
-              Verification token: {token}"""
-        )
-        send_verification_email_task.delay(user.email, token)
+        logger.info("Verification requested", extra={"user_id": str(user.id)})
+        await self._send_email(user, token, VERIFY_EMAIL)
 
 
 async def get_user_manager(
-    user_db: SQLAlchemyUserDatabase = Depends(get_user_db),  # noqa: B008
+    user_db: CachedUserDatabase = Depends(get_user_db),  # noqa: B008
 ):
     yield UserManager(user_db)
 
 
-cookie_transport = CookieTransport(
-    cookie_max_age=3600, cookie_name="fastapi_users"
-)
+@cache
+def get_session_strategy() -> SessionStrategy:
+    return SessionStrategy(
+        get_auth_redis(),
+        config.SESSION_LIFETIME,
+        config.SESSION_MAX_AGE,
+        LRUCache(
+            config.SESSION_CACHE_LOCAL_SIZE,
+            config.SESSION_CACHE_LOCAL_TTL,
+        ),
+    )
+
 
+cookie_transport: CookieTransport
+if config.AUTH_MODE == "jwt":
+    cookie_transport = TokenPairTransport(
+        refresh_cookie_name=REFRESH_COOKIE_NAME,
+        refresh_cookie_max_age=config.SESSION_MAX_AGE,
+        refresh_cookie_path="/auth",
+        cookie_max_age=config.ACCESS_TOKEN_LIFETIME,
+        cookie_name="fastapi_users",
+    )
+else:
+    # The session decides when it ends, the cookie only has to outlive it.
+    cookie_transport = CookieTransport(
+        cookie_max_age=config.SESSION_MAX_AGE,
+        cookie_name="fastapi_users",
+    )
 
-def get_redis_strategy() -> RedisStrategy:
-    return RedisStrategy(redis_connection, lifetime_seconds=3600)
+
+@cache
+def get_auth_strategy() -> SessionStrategy | JwtStrategy:
+    if config.AUTH_MODE == "jwt":
+        return JwtStrategy(
+            get_session_strategy(),
+            get_revocation_list(),
+            config.ACCESS_TOKEN_SECRETS,
+            config.ACCESS_TOKEN_LIFETIME,
+        )
+    return get_session_strategy()
 
 
 auth_backend = AuthenticationBackend(
-    name="jwt", transport=cookie_transport, get_strategy=get_redis_strategy
+    name=config.AUTH_MODE,
+    transport=cookie_transport,
+    get_strategy=get_auth_strategy,
 )
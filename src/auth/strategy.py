@@ -0,0 +1,382 @@
+import hashlib
+import secrets
+import time
+import uuid
+
+import jwt
+from fastapi import Response, status
+from fastapi_users import BaseUserManager, exceptions
+from fastapi_users.authentication import CookieTransport
+from fastapi_users.authentication.strategy import Strategy
+from redis.asyncio import Redis
+
+from src.auth.constant import (
+    ACCESS_TOKEN_ALGORITHM,
+    ACCESS_TOKEN_AUDIENCE,
+    SESSION_INDEX_KEY,
+    SESSION_KEY,
+    SESSION_REFRESH_SHARE,
+    TOKEN_PAIR_SEPARATOR,
+)
+from src.auth.revocation import RevocationList
+from src.cache import LRUCache
+from src.models import User
+
+# Deletes every session listed in the index KEYS[1] and the index, keys
+# of sessions are ARGV[1] followed by the token. DEL takes the keys in
+# chunks to stay below Lua's unpack limit. Returns the sessions listed.
+DESTROY_ALL = """
+local tokens = redis.call("ZRANGE", KEYS[1], 0, -1)
+for i, token in ipairs(tokens) do
+    tokens[i] = ARGV[1] .. token
+end
+for i = 1, #tokens, 1000 do
+    redis.call("DEL", unpack(tokens, i, math.min(i + 999, #tokens)))
+end
+redis.call("DEL", KEYS[1])
+return #tokens
+"""
+_SESSION_PREFIX = SESSION_KEY.format("")
+
+
+def _dump(user_id: str, expires_at: int, max_age_at: int) -> str:
+    return f"{user_id}|{expires_at}|{max_age_at}"
+
+
+def _load(raw: str) -> tuple[str, int, int]:
+    user_id, expires_at, max_age_at = raw.split("|")
+    return user_id, int(expires_at), int(max_age_at)
+
+
+class SessionStrategy(Strategy[User, uuid.UUID]):
+    """Opaque session tokens in Redis with sliding expiry.
+
+    A session holds ``user_id|expires_at|max_age_at`` and ends after
+    ``lifetime`` seconds without a request, ``max_age`` seconds after
+    login at the latest. Reading a token is one ``GET``. It is written
+    back only once less than ``SESSION_REFRESH_SHARE`` of its lifetime
+    is left, so a busy session costs one write per half lifetime, not
+    one per request.
+
+    Tokens of a user are also kept in an index scored by the end of
+    their max age, which lets ``destroy_all`` log the user out
+    everywhere without ``SCAN``. Tokens past their max age are pruned
+    from it on login.
+
+    With ``local.ttl`` above 0 sessions are also cached in process, and
+    a hot token costs no Redis command at all. Other workers keep a
+    destroyed token for up to that long, so it is off by default.
+    """
+
+    def __init__(
+        self, redis: Redis, lifetime: int, max_age: int, local: LRUCache
+    ):
+        self.redis = redis
+        self.lifetime = lifetime
+        self.max_age = max_age
+        self.local = local
+        self._destroy_all = redis.register_script(DESTROY_ALL)
+        self.local_hits = 0
+        self.reads = 0
+        self.refreshes = 0
+
+    async def read_token(
+        self,
+        token: str | None,
+        user_manager: BaseUserManager[User, uuid.UUID],
+    ) -> User | None:
+        if token is None:
+            return None
+        user_id = await self.user_id(token)
+        if user_id is None:
+            return None
+        try:
+            return await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+    async def user_id(self, token: str) -> str | None:
+        """Id of the user owning a live session, extending it if due."""
+        now = int(time.time())
+        session = self.local.get(token) if self.local.ttl else None
+        if session is not None and session[1] > now:
+            self.local_hits += 1
+            return session[0]
+
+        self.reads += 1
+        raw = await self.redis.get(SESSION_KEY.format(token))
+        if raw is None:
+            return None
+        user_id, expires_at, max_age_at = _load(raw)
+        refreshed_at = min(now + self.lifetime, max_age_at)
+        if (
+            expires_at - now < self.lifetime * SESSION_REFRESH_SHARE
+            and refreshed_at > expires_at
+        ):
+            self.refreshes += 1
+            # A session deleted since the GET must stay deleted.
+            await self.redis.set(
+                SESSION_KEY.format(token),
+                _dump(user_id, refreshed_at, max_age_at),
+                ex=refreshed_at - now,
+                xx=True,
+            )
+            expires_at = refreshed_at
+        if self.local.ttl:
+            self.local.set(token, (user_id, expires_at))
+        return user_id
+
+    async def write_token(self, user: User) -> str:
+        token = secrets.token_urlsafe()
+        await self.create(user.id, token)
+        return token
+
+    async def create(self, user_id: uuid.UUID, token: str) -> None:
+        now = int(time.time())
+        max_age_at = now + self.max_age
+        index = SESSION_INDEX_KEY.format(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(
+                SESSION_KEY.format(token),
+                _dump(str(user_id), now + self.lifetime, max_age_at),
+                ex=self.lifetime,
+            )
+            pipe.zremrangebyscore(index, "-inf", now)
+            pipe.zadd(index, {token: max_age_at})
+            # The newest token is the one that lives longest.
+            pipe.expireat(index, max_age_at)
+            await pipe.execute()
+
+    async def rotate(self, token: str, new_token: str) -> str | None:
+        """Move a live session to ``new_token``, return its user's id.
+
+        The old token stops working at once, so of concurrent rotations
+        of one token only the first succeeds. The session keeps the max
+        age it got at login.
+        """
+        raw = await self.redis.getdel(SESSION_KEY.format(token))
+        if raw is None:
+            return None
+        self.local.pop(token)
+        user_id, _, max_age_at = _load(raw)
+        now = int(time.time())
+        expires_at = min(now + self.lifetime, max_age_at)
+        if expires_at <= now:
+            return None
+        index = SESSION_INDEX_KEY.format(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(
+                SESSION_KEY.format(new_token),
+                _dump(user_id, expires_at, max_age_at),
+                ex=expires_at - now,
+            )
+            pipe.zrem(index, token)
+            pipe.zadd(index, {new_token: max_age_at})
+            await pipe.execute()
+        return user_id
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        await self.destroy(user.id, token)
+
+    async def destroy(self, user_id: uuid.UUID, token: str) -> None:
+        self.local.pop(token)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(SESSION_KEY.format(token))
+            pipe.zrem(SESSION_INDEX_KEY.format(user_id), token)
+            await pipe.execute()
+
+    async def destroy_all(self, user_id: uuid.UUID) -> int:
+        """End every session of a user, return how many were listed."""
+        # Tokens of other users cached here can not be told apart.
+        self.local.clear()
+        return await self._destroy_all(
+            keys=[SESSION_INDEX_KEY.format(user_id)], args=[_SESSION_PREFIX]
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "local_size": len(self.local),
+            "local_hits": self.local_hits,
+            "reads": self.reads,
+            "refreshes": self.refreshes,
+        }
+
+
+def _key_id(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()[:8]
+
+
+def _session_id(refresh_token: str) -> str:
+    # Sessions are stored under a digest, a leaked access token names
+    # its session without giving away the refresh token.
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+class JwtStrategy(Strategy[User, uuid.UUID]):
+    """Signed access tokens checked in process, refreshed from Redis.
+
+    Logging in returns a short-lived access token and a refresh token
+    joined by ``TOKEN_PAIR_SEPARATOR``, ``TokenPairTransport`` puts them
+    in two cookies. The access token is checked against ``keys`` and
+    the in-process ``RevocationList``, so reading it needs no I/O
+    beyond loading the user, which the user cache mostly serves from
+    process memory. The refresh token is a session of ``sessions`` and
+    trades for a new pair at ``POST /auth/refresh``. Each refresh token
+    works once, a stolen one is only good until its owner refreshes.
+
+    The first key signs, every one verifies, so a key can be rotated
+    out without logging anybody out.
+    """
+
+    def __init__(
+        self,
+        sessions: SessionStrategy,
+        revocations: RevocationList,
+        keys: list[str],
+        lifetime: int,
+    ):
+        self.sessions = sessions
+        self.revocations = revocations
+        self.lifetime = lifetime
+        self.keys = {_key_id(key): key for key in keys}
+        self.signing_key_id = _key_id(keys[0])
+
+    def access_token(self, user_id: uuid.UUID | str, session_id: str) -> str:
+        now = time.time()
+        claims = {
+            "sub": str(user_id),
+            "sid": session_id,
+            "jti": secrets.token_urlsafe(12),
+            "aud": ACCESS_TOKEN_AUDIENCE,
+            # Fractional, so a login right after "log out everywhere" is
+            # not taken for one before it.
+            "iat": now,
+            "exp": int(now) + self.lifetime,
+        }
+        return jwt.encode(
+            claims,
+            self.keys[self.signing_key_id],
+            ACCESS_TOKEN_ALGORITHM,
+            headers={"kid": self.signing_key_id},
+        )
+
+    def decode(self, token: str) -> dict:
+        """Claims of a valid access token, raises ``jwt.PyJWTError``."""
+        key = self.keys.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise jwt.InvalidKeyError("Unknown key id")
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[ACCESS_TOKEN_ALGORITHM],
+            audience=ACCESS_TOKEN_AUDIENCE,
+            options={"require": ["sub", "sid", "jti", "iat", "exp"]},
+        )
+
+    async def read_token(
+        self,
+        token: str | None,
+        user_manager: BaseUserManager[User, uuid.UUID],
+    ) -> User | None:
+        if token is None:
+            return None
+        try:
+            claims = self.decode(token)
+        except jwt.PyJWTError:
+            return None
+        if await self.revocations.is_revoked(
+            claims["jti"], claims["sub"], claims["iat"]
+        ):
+            return None
+        try:
+            return await user_manager.get(user_manager.parse_id(claims["sub"]))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+    async def write_token(self, user: User) -> str:
+        refresh_token = secrets.token_urlsafe()
+        session_id = _session_id(refresh_token)
+        await self.sessions.create(user.id, session_id)
+        return self._pair(user.id, session_id, refresh_token)
+
+    async def refresh(self, refresh_token: str) -> tuple[str, str] | None:
+        """Id of the session's user and a new token pair for it.
+
+        The session moves to the new refresh token, the one passed in
+        can not be used again.
+        """
+        new_refresh_token = secrets.token_urlsafe()
+        session_id = _session_id(new_refresh_token)
+        user_id = await self.sessions.rotate(
+            _session_id(refresh_token), session_id
+        )
+        if user_id is None:
+            return None
+        return user_id, self._pair(user_id, session_id, new_refresh_token)
+
+    def _pair(
+        self, user_id: uuid.UUID | str, session_id: str, refresh_token: str
+    ) -> str:
+        access_token = self.access_token(user_id, session_id)
+        return f"{access_token}{TOKEN_PAIR_SEPARATOR}{refresh_token}"
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        try:
+            claims = self.decode(token)
+        except jwt.PyJWTError:
+            return
+        await self.revocations.revoke_token(claims["jti"])
+        await self.sessions.destroy(user.id, claims["sid"])
+
+    async def destroy_all(self, user_id: uuid.UUID) -> int:
+        await self.revocations.revoke_user(user_id)
+        return await self.sessions.destroy_all(user_id)
+
+
+class TokenPairTransport(CookieTransport):
+    """Access token cookie plus a refresh token cookie.
+
+    The refresh cookie lives as long as the session and is only sent
+    below ``refresh_cookie_path``, the access cookie only as long as
+    the token it holds.
+    """
+
+    def __init__(
+        self,
+        refresh_cookie_name: str,
+        refresh_cookie_max_age: int,
+        refresh_cookie_path: str,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.refresh_cookie_name = refresh_cookie_name
+        self.refresh_cookie_max_age = refresh_cookie_max_age
+        self.refresh_cookie_path = refresh_cookie_path
+
+    async def get_login_response(self, token: str) -> Response:
+        access_token, refresh_token = token.split(TOKEN_PAIR_SEPARATOR)
+        response = Response(status_code=status.HTTP_204_NO_CONTENT)
+        self._set_login_cookie(response, access_token)
+        self._set_refresh_cookie(
+            response, refresh_token, self.refresh_cookie_max_age
+        )
+        return response
+
+    async def get_logout_response(self) -> Response:
+        response = await super().get_logout_response()
+        self._set_refresh_cookie(response, "", 0)
+        return response
+
+    def _set_refresh_cookie(
+        self, response: Response, token: str, max_age: int
+    ) -> None:
+        response.set_cookie(
+            self.refresh_cookie_name,
+            token,
+            max_age=max_age,
+            path=self.refresh_cookie_path,
+            domain=self.cookie_domain,
+            secure=self.cookie_secure,
+            httponly=True,
+            samesite=self.cookie_samesite,
+        )
@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from functools import cache
+from typing import Any
+
+from redis.asyncio import BlockingConnectionPool
+
+from src.config import get_settings
+from src.metrics import InstrumentedRedis
+
+# Clients are built on first use, importing a module that uses one reads
+# no setting and opens nothing.
+
+
+@cache
+def get_redis() -> InstrumentedRedis:
+    return InstrumentedRedis.from_url(
+        get_settings().REDIS_URL, decode_responses=True
+    )
+
+
+@cache
+def get_binary_redis() -> InstrumentedRedis:
+    """Client for packed binary values (adjacency lists, counters)."""
+    return InstrumentedRedis.from_url(get_settings().REDIS_URL)
+
+
+@cache
+def get_auth_redis() -> InstrumentedRedis:
+    """Client for sessions, read by every authenticated request.
+
+    A bounded pool makes a burst wait for a free connection instead of
+    opening one per request.
+    """
+    config = get_settings()
+    return InstrumentedRedis(
+        connection_pool=BlockingConnectionPool.from_url(
+            config.REDIS_URL,
+            max_connections=config.REDIS_AUTH_MAX_CONNECTIONS,
+            timeout=config.REDIS_AUTH_POOL_TIMEOUT,
+            decode_responses=True,
+        )
+    )
+
+
+async def close_redis() -> None:
+    for get_client in (get_redis, get_binary_redis, get_auth_redis):
+        if get_client.cache_info().currsize:
+            await get_client().aclose()
+
+
+class LRUCache:
+    """In-process LRU cache whose entries expire ``ttl`` seconds after set.
+
+    Not shared between workers, so keep ``ttl`` short for anything that
+    can be changed by another process.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
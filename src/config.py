@@ -1,31 +1,155 @@
 import os
+from functools import cache
+from pathlib import Path
+from typing import Annotated, Any
 
-from dotenv import load_dotenv
+from pydantic import Field, field_validator, model_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
-load_dotenv("./.env")
+ROOT = Path(__file__).resolve().parent.parent
+# Later files win, variables set in the environment win over all of them.
+ENV_FILES = (
+    ROOT / ".env",
+    ROOT / "src/auth/.auth.env",
+    ROOT / "src/email_celery/.email.env",
+    ROOT / "src/email_celery/.celery.env",
+)
 
 
-class Config:
-    def __init__(self):
-        self.POSTGRES_DB = os.environ.get("POSTGRES_DB")
-        self.POSTGRES_USER = os.environ.get("POSTGRES_USER")
-        self.POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD")
-        self.POSTGRES_HOST = os.environ.get("POSTGRES_HOST")
-        self.POSTGRES_PORT = os.environ.get("POSTGRES_PORT")
-        self.POSTGRES_URL = f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+class Settings(BaseSettings):
+    """Settings of the web app, the relay and the Celery workers."""
 
-        self.REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD")
-        self.REDIS_USER = os.environ.get("REDIS_USER")
-        self.REDIS_PORT = os.environ.get("REDIS_PORT")
-        self.REDIS_HOST = os.environ.get("REDIS_HOST")
-        self.REDIS_URL = f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
+    model_config = SettingsConfigDict(env_file=ENV_FILES, extra="ignore")
 
-        self.RABBITMQ_USER = os.environ.get("RABBITMQ_USER")
-        self.RABBITMQ_PASSWORD = os.environ.get("RABBITMQ_PASSWORD")
-        self.RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST")
-        self.RABBITMQ_PORT = os.environ.get("RABBITMQ_PORT")
-        self.RABBITMQ_HOSTNAME = os.environ.get("RABBITMQ_HOSTNAME")
-        self.RABBITMQ_URL = f"amqp://{self.RABBITMQ_USER}:{self.RABBITMQ_PASSWORD}@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/{self.RABBITMQ_HOSTNAME}"
+    POSTGRES_DB: str | None = None
+    POSTGRES_USER: str | None = None
+    POSTGRES_PASSWORD: str | None = None
+    POSTGRES_HOST: str | None = None
+    POSTGRES_PORT: str | None = None
+    POSTGRES_REPLICA_HOST: str | None = None
+    POSTGRES_REPLICA_PORT: str | None = None
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 20
+    POSTGRES_POOL_TIMEOUT: float = 30
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 100
 
+    REDIS_PASSWORD: str | None = None
+    REDIS_USER: str | None = None
+    REDIS_PORT: str | None = None
+    REDIS_HOST: str | None = None
+    REDIS_AUTH_MAX_CONNECTIONS: int = 50
+    REDIS_AUTH_POOL_TIMEOUT: float = 5
 
-config = Config()
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_LEASE_TTL: float = 1
+    RATE_LIMIT_API_PER_MINUTE: int = 1200
+
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+
+    RABBITMQ_USER: str | None = None
+    RABBITMQ_PASSWORD: str | None = None
+    RABBITMQ_HOST: str | None = None
+    RABBITMQ_PORT: str | None = None
+    RABBITMQ_HOSTNAME: str | None = None
+
+    SECRET_TOKEN_FOR_AUTH: str | None = None
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_LOCAL_TTL: float = 5
+    USER_CACHE_LOCAL_SIZE: int = 10000
+
+    # "session" keeps every login in Redis, "jwt" hands out signed
+    # access tokens checked in process and Redis refresh sessions.
+    AUTH_MODE: str = "session"
+    ACCESS_TOKEN_LIFETIME: int = 300
+    # Comma separated, the first one signs. Keep a retired secret
+    # listed for one ACCESS_TOKEN_LIFETIME after rotating it out.
+    # Defaults to SECRET_TOKEN_FOR_AUTH.
+    ACCESS_TOKEN_SECRETS: Annotated[list[str], NoDecode] = []
+    REVOCATION_SYNC_INTERVAL: float = 1
+    REVOCATION_FILTER_BITS: int = 1 << 20
+    REVOCATION_FILTER_HASHES: int = 7
+
+    # Sessions end after SESSION_LIFETIME seconds without a request
+    # and SESSION_MAX_AGE seconds after login at the latest.
+    SESSION_LIFETIME: int = 3600
+    SESSION_MAX_AGE: int = 7 * 24 * 3600
+    # 0 turns the in-process token cache off, see SessionStrategy.
+    SESSION_CACHE_LOCAL_TTL: float = 0
+    SESSION_CACHE_LOCAL_SIZE: int = 10000
+
+    # "thread" or "process"
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = Field(
+        default_factory=lambda: os.cpu_count() or 1
+    )
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+
+    SMTP_PASSWORD: str | None = None
+    SMTP_HOST: str | None = None
+    SMTP_PORT: str | None = None
+    SMTP_USER: str | None = None
+    SMTP_USE_SSL: bool = True
+    SMTP_IDLE_TIMEOUT: float = 60
+    APP_BASE_URL: str = "http://127.0.0.1:8000"
+
+    ENABLE_UTC: bool = False
+    # Wait for the broker to ack each publish so a queued email is not
+    # lost silently.
+    CONFIRM_PUBLISH: bool = True
+
+    @field_validator("ACCESS_TOKEN_SECRETS", mode="before")
+    @classmethod
+    def _split(cls, value: Any) -> Any:
+        return value.split(",") if isinstance(value, str) else value
+
+    @model_validator(mode="after")
+    def _defaults(self) -> "Settings":
+        secrets = self.ACCESS_TOKEN_SECRETS or [self.SECRET_TOKEN_FOR_AUTH]
+        self.ACCESS_TOKEN_SECRETS = [secret for secret in secrets if secret]
+        # HS256 takes an empty key, anyone could sign access tokens.
+        if self.AUTH_MODE == "jwt" and not self.ACCESS_TOKEN_SECRETS:
+            raise ValueError(
+                "AUTH_MODE=jwt needs ACCESS_TOKEN_SECRETS or "
+                "SECRET_TOKEN_FOR_AUTH"
+            )
+        if self.POSTGRES_REPLICA_PORT is None:
+            self.POSTGRES_REPLICA_PORT = self.POSTGRES_PORT
+        return self
+
+    @property
+    def POSTGRES_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def POSTGRES_REPLICA_URL(self) -> str | None:
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_HOST}:{self.POSTGRES_REPLICA_PORT}/{self.POSTGRES_DB}"
+            if self.POSTGRES_REPLICA_HOST
+            else None
+        )
+
+    @property
+    def REDIS_URL(self) -> str:
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
+
+    @property
+    def RABBITMQ_URL(self) -> str:
+        return f"amqp://{self.RABBITMQ_USER}:{self.RABBITMQ_PASSWORD}@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/{self.RABBITMQ_HOSTNAME}"
+
+
+@cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+# Read once, when the first module importing this one is loaded. Every
+# field has a default, the clients built from them (engines, Redis) are
+# only created on first use.
+config = get_settings()
@@ -1,18 +1,151 @@
+import time
+from bisect import bisect_left
 from collections.abc import AsyncGenerator
+from functools import cache
+from typing import Any
 
-from fastapi import Depends
-from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy.exc import TimeoutError
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from src.config import config
-from src.models import User
+from src.config import get_settings
+from src.metrics import instrument_engine
 
-engine = create_async_engine(config.POSTGRES_URL, future=True)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+# Upper bounds, in seconds, of the connection wait time histogram.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.waiting = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_sum += seconds
+        self.wait_buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _exhausted(self) -> bool:
+        # A negative max_overflow lets the pool grow without bound.
+        return self._max_overflow >= 0 and (
+            self.checkedout() >= self.size() + self._max_overflow
+        )
+
+    def _do_get(self):
+        # Only a caller finding every connection checked out waits.
+        waiting = self._exhausted()
+        if waiting:
+            self.metrics.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            if waiting:
+                self.metrics.waiting -= 1
+            self.metrics.observe_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    config = get_settings()
+    engine = create_async_engine(
+        url,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.POSTGRES_POOL_SIZE,
+        max_overflow=config.POSTGRES_MAX_OVERFLOW,
+        pool_timeout=config.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=config.POSTGRES_POOL_RECYCLE,
+        pool_pre_ping=config.POSTGRES_POOL_PRE_PING,
+        connect_args={
+            "prepared_statement_cache_size": (
+                config.POSTGRES_STATEMENT_CACHE_SIZE
+            ),
+        },
+    )
+    instrument_engine(engine, name)
+    return engine
+
+
+# Nothing connects to the database before the first session is opened,
+# and importing this module does not even read the settings.
+@cache
+def get_engine() -> AsyncEngine:
+    return _create_engine(get_settings().POSTGRES_URL, "primary")
+
+
+@cache
+def get_replica_engine() -> AsyncEngine:
+    """The replica engine, the primary one without a configured replica."""
+    url = get_settings().POSTGRES_REPLICA_URL
+    return _create_engine(url, "replica") if url else get_engine()
+
+
+@cache
+def _session_maker(read: bool) -> async_sessionmaker[AsyncSession]:
+    engine = get_replica_engine() if read else get_engine()
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def async_session_maker() -> AsyncSession:
+    """A new session on the primary."""
+    return _session_maker(False)()
+
+
+def async_read_session_maker() -> AsyncSession:
+    """A new session on the replica, reads only."""
+    return _session_maker(True)()
+
+
+async def dispose_engines() -> None:
+    # Only the engines that were built, the replica may be the primary.
+    engines = {
+        get()
+        for get in (get_engine, get_replica_engine)
+        if get.cache_info().currsize
+    }
+    for engine in engines:
+        await engine.dispose()
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    metrics = pool.metrics
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "waiting": metrics.waiting,
+        "timeouts": metrics.timeouts,
+        "wait_count": metrics.wait_count,
+        "wait_sum": metrics.wait_sum,
+        "wait_buckets": dict(
+            zip(map(str, WAIT_BUCKETS), metrics.wait_buckets, strict=True)
+        ),
+    }
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -20,5 +153,6 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-async def get_user_db(session: AsyncSession = Depends(get_session)):  # noqa: B008
-    yield SQLAlchemyUserDatabase(session, User)
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_read_session_maker() as session:
+        yield session
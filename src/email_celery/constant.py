@@ -1,7 +1,18 @@
-html_verify_msg = ""
-with open("src/email_celery/template/confirm_email.html") as f:
-    html_verify_msg = f.read()
-
-html_forgot_password_msg = ""
-with open("src/email_celery/template/reset_password.html") as f:
-    html_forgot_password_msg = f.read()
+VERIFY_EMAIL = "verify"
+FORGOT_PASSWORD_EMAIL = "forgot_password"
+# Kind of email to the template name, looked up as ``<name>.<locale>.html``
+# (and ``.txt``) before falling back to ``<name>.html``.
+EMAIL_TEMPLATES = {
+    VERIFY_EMAIL: "confirm_email",
+    FORGOT_PASSWORD_EMAIL: "reset_password",
+}
+DEFAULT_LOCALE = "en"
+# Outbox keys of sent emails, a redelivered key is not sent twice.
+EMAIL_SENT_KEY = "email:sent:{}"
+EMAIL_SENT_TTL = 24 * 3600
+# Failed sends are retried this many times, ``EMAIL_RETRY_BACKOFF``
+# seconds after the first failure and twice as long after each next
+# one, up to ``EMAIL_RETRY_BACKOFF_MAX``.
+EMAIL_MAX_RETRIES = 5
+EMAIL_RETRY_BACKOFF = 10
+EMAIL_RETRY_BACKOFF_MAX = 600
@@ -0,0 +1,136 @@
+import uuid
+from email import quoprimime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import escape
+
+from src.config import config
+from src.email_celery.constant import DEFAULT_LOCALE, EMAIL_TEMPLATES
+
+TEMPLATE_DIR = Path(__file__).parent / "template"
+# Longest quoted-printable line allowed by RFC 2045, soft break included.
+QP_LINE = 76
+_QP_SAFE = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.~+/"
+)
+
+
+def _qp(value: str) -> str:
+    """Quoted-printable encode ``value`` so a soft break can follow it."""
+    # Every line, the last one too, leaves room for a trailing "=".
+    width = QP_LINE - 1
+    if _QP_SAFE.issuperset(value):
+        return "=\n".join(
+            value[i : i + width] for i in range(0, len(value), width)
+        )
+    return quoprimime.body_encode(
+        value.encode().decode("latin-1"), maxlinelen=width
+    )
+
+
+def _qp_html(value: str) -> str:
+    return _qp(str(escape(value)))
+
+
+def _raw(value: str) -> str:
+    return value
+
+
+class CompiledEmail:
+    """A fully serialised email with holes for per-recipient fields.
+
+    Everything that does not depend on the recipient (template output,
+    MIME headers, boundaries, transfer encoding of the static text) is
+    computed once. Rendering joins the cached chunks with the encoded
+    field values.
+    """
+
+    def __init__(self, chunks: list):
+        self.chunks = chunks
+
+    def render(self, **fields: str) -> str:
+        return "".join(
+            chunk if isinstance(chunk, str) else chunk[1](fields[chunk[0]])
+            for chunk in self.chunks
+        )
+
+
+class EmailRenderer:
+    def __init__(self, directory: Path, static_context: dict[str, str]):
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html"]),
+        )
+        self.static_context = static_context
+        self.compiled = lru_cache(maxsize=None)(self._compile)
+
+    def _template(self, name: str, locale: str, suffix: str):
+        return self.env.select_template(
+            [f"{name}.{locale}.{suffix}", f"{name}.{suffix}"]
+        )
+
+    def _body(self, name: str, locale: str, suffix: str, encoder):
+        """Render a body with field markers and encode the static parts."""
+        template = self._template(name, locale, suffix)
+        marker = f"@@{uuid.uuid4().hex}@@"
+        rendered = template.render(**self.static_context, token=marker)
+        chunks = []
+        for i, static in enumerate(rendered.split(marker)):
+            if i:
+                chunks.append(("token", encoder))
+                chunks.append("=\n")
+            chunks.append(_qp(static))
+            chunks.append("=\n")
+        return chunks, template
+
+    def _compile(self, kind: str, locale: str) -> CompiledEmail:
+        name = EMAIL_TEMPLATES[kind]
+        plain, _ = self._body(name, locale, "txt", _qp)
+        html, template = self._body(name, locale, "html", _qp_html)
+
+        markers = {
+            key: f"@@{uuid.uuid4().hex}@@" for key in ("to", "plain", "html")
+        }
+        # Short enough to keep the Content-Type header on one line.
+        msg = MIMEMultipart("alternative", boundary=uuid.uuid4().hex[:24])
+        msg["Subject"] = template.module.subject
+        msg["To"] = markers["to"]
+        for subtype in ("plain", "html"):
+            part = MIMEText(markers[subtype], subtype, "us-ascii")
+            part.replace_header(
+                "Content-Type", f'text/{subtype}; charset="utf-8"'
+            )
+            part.replace_header(
+                "Content-Transfer-Encoding", "quoted-printable"
+            )
+            msg.attach(part)
+
+        chunks = []
+        skeleton = msg.as_string()
+        for key, body in (
+            ("to", [("to", _raw)]),
+            ("plain", plain),
+            ("html", html),
+        ):
+            static, skeleton = skeleton.split(markers[key])
+            chunks.append(static)
+            chunks.extend(body)
+        chunks.append(skeleton)
+        return CompiledEmail(chunks)
+
+    def render(
+        self,
+        kind: str,
+        user_email: str,
+        token: str,
+        locale: str | None = None,
+    ) -> str:
+        compiled = self.compiled(kind, locale or DEFAULT_LOCALE)
+        return compiled.render(to=user_email, token=token)
+
+
+renderer = EmailRenderer(TEMPLATE_DIR, {"base_url": config.APP_BASE_URL})
@@ -1,33 +1,128 @@
+import logging
 import smtplib
+from functools import cache
 
+import redis
 from celery import Celery  # type: ignore
+from celery.signals import worker_process_shutdown  # type: ignore
+from celery.utils.time import get_exponential_backoff_interval
 
+from src.config import config
 from src.email_celery.celery_config import config as celery_config
-from src.email_celery.config import config
-from src.email_celery.constant import html_forgot_password_msg, html_verify_msg
-from src.email_celery.util import generate_email
+from src.email_celery.constant import (
+    EMAIL_MAX_RETRIES,
+    EMAIL_RETRY_BACKOFF,
+    EMAIL_RETRY_BACKOFF_MAX,
+    EMAIL_SENT_KEY,
+    EMAIL_SENT_TTL,
+    FORGOT_PASSWORD_EMAIL,
+    VERIFY_EMAIL,
+)
+from src.email_celery.renderer import renderer
+from src.email_celery.util import SMTPConnection
+
+logger = logging.getLogger(__name__)
+
+# Worth sending again later. A refused recipient is refused for good.
+RETRY_ERRORS = (smtplib.SMTPException, OSError)
+# Acked once done, so a worker dying mid-send leaves the message queued.
+# Emails sent with a key are not sent again on redelivery.
+RETRY_OPTIONS = {
+    "acks_late": True,
+    "autoretry_for": RETRY_ERRORS,
+    "dont_autoretry_for": (smtplib.SMTPRecipientsRefused,),
+    "max_retries": EMAIL_MAX_RETRIES,
+    "retry_backoff": EMAIL_RETRY_BACKOFF,
+    "retry_backoff_max": EMAIL_RETRY_BACKOFF_MAX,
+    "retry_jitter": True,
+}
 
 async_queue = Celery("router")
 async_queue.config_from_object(celery_config)
 
+smtp_connection = SMTPConnection(
+    config.SMTP_HOST,
+    config.SMTP_PORT,
+    config.SMTP_USER,
+    config.SMTP_PASSWORD,
+    use_ssl=config.SMTP_USE_SSL,
+    idle_timeout=config.SMTP_IDLE_TIMEOUT,
+)
+
+
+@cache
+def get_sent_emails() -> redis.Redis:
+    """Keys of the emails already sent, shared by every worker."""
+    return redis.Redis.from_url(config.REDIS_URL)
+
+
+@worker_process_shutdown.connect
+def close_smtp_connection(**kwargs):
+    smtp_connection.close()
 
-@async_queue.task
-def send_verification_email_task(user_email: str, token: str) -> bool:
-    email = generate_email(
-        user_email, token, html_verify_msg, "Verify your email"
-    )
-    with smtplib.SMTP_SSL(config.SMTP_HOST, config.SMTP_PORT) as server:
-        server.login(config.SMTP_USER, config.SMTP_PASSWORD)
-        server.sendmail(config.SMTP_USER, user_email, email.as_string())
+
+def send_email(
+    user_email: str,
+    token: str,
+    kind: str,
+    locale: str | None = None,
+    key: str | None = None,
+) -> None:
+    """Send one email, skipped if ``key`` was already sent."""
+    sent_emails = get_sent_emails()
+    if key is not None and sent_emails.exists(EMAIL_SENT_KEY.format(key)):
+        return
+    email = renderer.render(kind, user_email, token, locale)
+    smtp_connection.send(user_email, email)
+    if key is not None:
+        sent_emails.set(EMAIL_SENT_KEY.format(key), 1, ex=EMAIL_SENT_TTL)
+
+
+@async_queue.task(**RETRY_OPTIONS)
+def send_verification_email_task(
+    user_email: str, token: str, locale: str | None = None
+) -> bool:
+    send_email(user_email, token, VERIFY_EMAIL, locale)
     return True
 
 
-@async_queue.task
-def send_forgot_password_email_task(user_email: str, token: str) -> bool:
-    email = generate_email(
-        user_email, token, html_forgot_password_msg, "Reset your password"
-    )
-    with smtplib.SMTP_SSL(config.SMTP_HOST, config.SMTP_PORT) as server:
-        server.login(config.SMTP_USER, config.SMTP_PASSWORD)
-        server.sendmail(config.SMTP_USER, user_email, email.as_string())
+@async_queue.task(**RETRY_OPTIONS)
+def send_forgot_password_email_task(
+    user_email: str, token: str, locale: str | None = None
+) -> bool:
+    send_email(user_email, token, FORGOT_PASSWORD_EMAIL, locale)
     return True
+
+
+@async_queue.task(bind=True, **RETRY_OPTIONS)
+def send_email_batch_task(self, emails: list[tuple]) -> int:
+    """Send ``(user_email, token, kind[, locale[, key]])`` in one session.
+
+    A refused recipient is skipped. Emails that failed otherwise are
+    retried with backoff once the rest of the batch is sent, and only
+    those. Returns the number of emails sent by this attempt.
+    """
+    sent = 0
+    failed = []
+    error = None
+    for email in emails:
+        try:
+            send_email(*email)
+        except smtplib.SMTPRecipientsRefused:
+            logger.warning("Recipient refused", extra={"kind": email[2]})
+            continue
+        except RETRY_ERRORS as exc:
+            logger.warning("Email not sent: %s", exc, extra={"kind": email[2]})
+            failed.append(email)
+            error = exc
+            continue
+        sent += 1
+    if failed:
+        countdown = get_exponential_backoff_interval(
+            EMAIL_RETRY_BACKOFF,
+            self.request.retries,
+            EMAIL_RETRY_BACKOFF_MAX,
+            full_jitter=True,
+        )
+        raise self.retry(args=(failed,), exc=error, countdown=countdown)
+    return sent
@@ -1,16 +1,63 @@
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-
-
-def generate_email(
-    user_email: str, token: str, html_msg: str, subject_msg: str
-) -> MIMEMultipart:
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject_msg
-    text = f"Hello, please confirm your email\nThis your token: {token}"
-    html_msg = html_msg.replace("|token|", token)
-    plain_msg = MIMEText(text, "plain")
-    html = MIMEText(html_msg, "html")
-    msg.attach(plain_msg)
-    msg.attach(html)
-    return msg
+import smtplib
+import time
+
+# Errors after which the session is reopened and the message resent.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+class SMTPConnection:
+    """A logged in SMTP session kept open between messages.
+
+    The session is opened on first use, so each worker process gets its
+    own. It is reopened when the server drops it or after
+    ``idle_timeout`` seconds without traffic.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int | str,
+        user: str | None,
+        password: str | None,
+        use_ssl: bool = True,
+        idle_timeout: float = 60,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.idle_timeout = idle_timeout
+        self._server: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        server = smtp(self.host, self.port)
+        if self.user:
+            server.login(self.user, self.password)
+        self._server = server
+        return server
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+    def send(self, to_addr: str, msg: str) -> None:
+        server = self._server
+        if server is None or (
+            time.monotonic() - self._last_used > self.idle_timeout
+        ):
+            self.close()
+            server = self._connect()
+        try:
+            server.sendmail(self.user, to_addr, msg)
+        except RECONNECT_ERRORS:
+            self.close()
+            self._connect().sendmail(self.user, to_addr, msg)
+        self._last_used = time.monotonic()
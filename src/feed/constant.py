@@ -0,0 +1,24 @@
+from enum import StrEnum
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+POST_MAX_LENGTH = 5000
+
+# Sorted set of post ids scored by id, one per reader.
+TIMELINE_KEY = "timeline:{}"
+# Newest posts kept per timeline, older pages are read from the database.
+TIMELINE_SIZE = 800
+# Refreshed on read only: timelines of idle readers expire and stop
+# receiving pushes.
+TIMELINE_TTL = 2 * 24 * 3600
+# Authors with more friends than this are not pushed on write, readers
+# merge their recent posts in instead.
+FANOUT_LIMIT = 1000
+# Set of the ids of such authors.
+PULL_AUTHORS_KEY = "feed:pull-authors"
+POST_CACHE_KEY = "post:{}"
+POST_CACHE_TTL = 24 * 3600
+
+
+class ErrorCode(StrEnum):
+    INVALID_CURSOR = "INVALID_CURSOR"
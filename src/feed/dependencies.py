@@ -0,0 +1,21 @@
+from fastapi import Depends
+
+from src.cache import get_binary_redis
+from src.feed.repository import PostRepository
+from src.feed.service import Feed
+from src.user.dependencies import get_friend_graph, get_unit_of_work
+from src.user.graph import FriendGraph
+from src.user.unit_of_work import UnitOfWork
+
+
+async def get_post_repository(
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+):
+    yield PostRepository(uow.session, uow.read_session)
+
+
+async def get_feed(
+    repository: PostRepository = Depends(get_post_repository),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+):
+    yield Feed(repository, graph, get_binary_redis())
@@ -0,0 +1,84 @@
+from collections.abc import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.feed.schema import Post, post_list
+from src.models import Post as PostTable
+from src.outbox.constant import Topic
+from src.outbox.service import add_event
+
+
+class PostRepository:
+    """Posts keyed by a growing id, newest first everywhere.
+
+    Writes are left for the caller to commit. Reads go to
+    ``read_session``, which may be bound to a replica.
+    """
+
+    def __init__(
+        self, session: AsyncSession, read_session: AsyncSession | None = None
+    ):
+        self.session = session
+        self.read_session = read_session or session
+
+    async def add(self, author_id: UUID, body: str) -> Post:
+        stmt = (
+            insert(PostTable)
+            .values(author_id=author_id, body=body)
+            .returning(PostTable)
+        )
+        post = Post.model_validate(await self.session.scalar(stmt))
+        add_event(
+            self.session,
+            Topic.POST_CREATED,
+            post_id=post.id,
+            author_id=author_id,
+        )
+        return post
+
+    async def get_many(self, post_ids: Iterable[int]) -> list[Post]:
+        """Posts of ``post_ids`` in any order, deleted ones are skipped."""
+        stmt = select(PostTable).where(PostTable.id.in_(set(post_ids)))
+        res = await self.read_session.scalars(stmt)
+        return post_list.validate_python(res.all(), from_attributes=True)
+
+    async def recent_ids(
+        self,
+        author_ids: Sequence[UUID],
+        before: int | None,
+        limit: int,
+        primary: bool = False,
+    ) -> list[int]:
+        """Ids of the newest posts of ``author_ids`` older than ``before``.
+
+        Pass ``primary`` when the result is cached, a lagging replica
+        would pin a timeline without the latest posts.
+        """
+        session = self.session if primary else self.read_session
+        if not author_ids:
+            return []
+        stmt = (
+            select(PostTable.id)
+            .where(PostTable.author_id.in_(author_ids))
+            .order_by(PostTable.id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            stmt = stmt.where(PostTable.id < before)
+        return list(await session.scalars(stmt))
+
+    async def by_author(
+        self, author_id: UUID, before: int | None, limit: int
+    ) -> list[Post]:
+        stmt = (
+            select(PostTable)
+            .where(PostTable.author_id == author_id)
+            .order_by(PostTable.id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            stmt = stmt.where(PostTable.id < before)
+        res = await self.read_session.scalars(stmt)
+        return post_list.validate_python(res.all(), from_attributes=True)
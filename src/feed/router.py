@@ -0,0 +1,80 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
+
+from src.auth.dependencies import current_active_user
+from src.feed.constant import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ErrorCode
+from src.feed.dependencies import get_feed, get_post_repository
+from src.feed.exception import InvalidCursor
+from src.feed.repository import PostRepository
+from src.feed.schema import Post, PostCreate, PostPage
+from src.feed.service import Feed
+from src.feed.util import decode_cursor, encode_cursor
+from src.models import User
+from src.user.dependencies import get_unit_of_work
+from src.user.unit_of_work import UnitOfWork
+
+router = APIRouter()
+
+
+def _before(cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorCode.INVALID_CURSOR,
+        ) from exc
+
+
+@router.post(
+    "/posts",
+    response_model=Post,
+    status_code=status.HTTP_201_CREATED,
+    name="feed:create-post",
+)
+async def create_post(
+    body: PostCreate,
+    user: User = Depends(current_active_user),  # noqa: B008
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+    repository: PostRepository = Depends(get_post_repository),  # noqa: B008
+    feed: Feed = Depends(get_feed),  # noqa: B008
+):
+    post = await repository.add(user.id, body.body)
+    await uow.commit()
+    await feed.publish(post)
+    return post
+
+
+@router.get("", response_model=PostPage, name="feed:home")
+async def home_feed(
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user: User = Depends(current_active_user),  # noqa: B008
+    feed: Feed = Depends(get_feed),  # noqa: B008
+):
+    """Posts of the user and their friends, newest first."""
+    page = await feed.read(user.id, limit, _before(cursor))
+    # Assembled from cached JSON, sent as is.
+    return Response(page, media_type="application/json")
+
+
+@router.get(
+    "/users/{user_id}/posts", response_model=PostPage, name="feed:user-posts"
+)
+async def user_posts(
+    user_id: UUID,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user: User = Depends(current_active_user),  # noqa: B008
+    repository: PostRepository = Depends(get_post_repository),  # noqa: B008
+):
+    posts = await repository.by_author(user_id, _before(cursor), limit + 1)
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1].id)
+    return PostPage(items=posts, next_cursor=next_cursor)
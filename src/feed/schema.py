@@ -0,0 +1,27 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+from src.feed.constant import POST_MAX_LENGTH
+
+
+class PostCreate(BaseModel):
+    body: str = Field(min_length=1, max_length=POST_MAX_LENGTH)
+
+
+class Post(BaseModel):
+    id: int
+    author_id: UUID
+    body: str
+    created_at: datetime
+
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+
+class PostPage(BaseModel):
+    items: list[Post]
+    next_cursor: str | None = None
+
+
+post_list = TypeAdapter(list[Post])
@@ -0,0 +1,183 @@
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.feed.constant import (
+    FANOUT_LIMIT,
+    POST_CACHE_KEY,
+    POST_CACHE_TTL,
+    PULL_AUTHORS_KEY,
+    TIMELINE_KEY,
+    TIMELINE_SIZE,
+    TIMELINE_TTL,
+)
+from src.feed.repository import PostRepository
+from src.feed.schema import Post
+from src.feed.util import encode_cursor, page_json
+from src.metrics import FEED_FANOUT
+from src.user.graph import FriendGraph
+from src.user.util import intersect_sorted
+
+# Adds post ARGV[1] to every timeline in KEYS that exists and trims it
+# to ARGV[2] posts. A missing timeline is rebuilt by its next read, so
+# a push never creates a partial one. Returns the timelines written.
+PUSH = """
+local trim = -(tonumber(ARGV[2]) + 1)
+local pushed = 0
+for _, key in ipairs(KEYS) do
+    if redis.call("EXISTS", key) == 1 then
+        redis.call("ZADD", key, ARGV[1], ARGV[1])
+        redis.call("ZREMRANGEBYRANK", key, 1, trim)
+        pushed = pushed + 1
+    end
+end
+return pushed
+"""
+# Member scored 0 in every timeline so an empty one still exists, post
+# ids start at 1.
+SENTINEL = 0
+
+
+class Feed:
+    """Home timelines of friends' and own posts, newest first.
+
+    A post is pushed on write into the Redis timeline of its author and
+    of each friend, unless the author has more than ``FANOUT_LIMIT``
+    friends. Such authors are remembered in a set, until they post with
+    fewer friends, and their posts are merged in on read from the
+    database. Pages older than a full
+    timeline also come from the database. Post bodies are cached as
+    JSON, so a page without such authors costs no query.
+    """
+
+    def __init__(
+        self, repository: PostRepository, graph: FriendGraph, redis: Redis
+    ):
+        self.repository = repository
+        self.graph = graph
+        self.redis = redis
+        self._push = redis.register_script(PUSH)
+
+    async def publish(self, post: Post) -> int:
+        """Cache a committed post and push it, return the timelines hit."""
+        readers = [post.author_id]
+        friend_ids = await self.graph.friend_ids(post.author_id)
+        pull = len(friend_ids) > FANOUT_LIMIT
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(
+                POST_CACHE_KEY.format(post.id),
+                post.model_dump_json(),
+                ex=POST_CACHE_TTL,
+            )
+            if pull:
+                pipe.sadd(PULL_AUTHORS_KEY, post.author_id.bytes)
+            else:
+                pipe.srem(PULL_AUTHORS_KEY, post.author_id.bytes)
+                readers += friend_ids
+            await self._push(
+                keys=[TIMELINE_KEY.format(id) for id in readers],
+                args=[post.id, TIMELINE_SIZE],
+                client=pipe,
+            )
+            _, changed, pushed = await pipe.execute()
+        if not pull and changed and friend_ids:
+            # Back under the limit, the timelines of friends lack the
+            # posts they used to pull and are rebuilt on their next read.
+            await self.redis.unlink(
+                *(TIMELINE_KEY.format(id) for id in friend_ids)
+            )
+        FEED_FANOUT.observe(pushed)
+        return pushed
+
+    async def read(
+        self, user_id: UUID, limit: int, before: int | None
+    ) -> bytes:
+        """A ``PostPage`` of posts older than ``before``, as JSON."""
+        key = TIMELINE_KEY.format(user_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrangebyscore(
+                key,
+                f"({before}" if before else "+inf",
+                f"({SENTINEL}",
+                start=0,
+                num=limit + 1,
+            )
+            pipe.zcard(key)
+            pipe.expire(key, TIMELINE_TTL)
+            pipe.smembers(PULL_AUTHORS_KEY)
+            pushed, size, exists, pull = await pipe.execute()
+        friend_ids = await self.graph.friend_ids(user_id)
+        if exists:
+            timeline = [int(id) for id in pushed]
+            full = size > TIMELINE_SIZE
+        else:
+            rebuilt = await self._rebuild(key, [*friend_ids, user_id])
+            timeline = [id for id in rebuilt if not before or id < before]
+            timeline = timeline[: limit + 1]
+            full = len(rebuilt) >= TIMELINE_SIZE
+
+        ids = set(timeline)
+        pull_ids = intersect_sorted(
+            sorted(pull), [id.bytes for id in friend_ids]
+        )
+        if pull_ids:
+            ids.update(
+                await self.repository.recent_ids(
+                    [UUID(bytes=id) for id in pull_ids], before, limit + 1
+                )
+            )
+        if len(timeline) <= limit and full:
+            # Past the oldest post kept in the timeline.
+            ids.update(
+                await self.repository.recent_ids(
+                    [*friend_ids, user_id],
+                    min(timeline, default=before),
+                    limit + 1 - len(timeline),
+                )
+            )
+
+        page = sorted(ids, reverse=True)
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1])
+        return page_json(await self.posts(page), next_cursor)
+
+    async def _rebuild(self, key: str, author_ids: list[UUID]) -> list[int]:
+        ids = await self.repository.recent_ids(
+            author_ids, None, TIMELINE_SIZE, primary=True
+        )
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {SENTINEL: SENTINEL} | {id: id for id in ids})
+            pipe.expire(key, TIMELINE_TTL)
+            await pipe.execute()
+        return ids
+
+    async def posts(self, post_ids: list[int]) -> list[bytes]:
+        """JSON of ``post_ids`` in order, deleted posts are left out."""
+        if not post_ids:
+            return []
+        posts = await self.redis.mget(
+            [POST_CACHE_KEY.format(id) for id in post_ids]
+        )
+        missing = [
+            id
+            for id, post in zip(post_ids, posts, strict=True)
+            if post is None
+        ]
+        if missing:
+            loaded = {
+                post.id: post.model_dump_json().encode()
+                for post in await self.repository.get_many(missing)
+            }
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for id, post in loaded.items():
+                    pipe.set(
+                        POST_CACHE_KEY.format(id), post, ex=POST_CACHE_TTL
+                    )
+                await pipe.execute()
+            posts = [
+                loaded.get(id) if post is None else post
+                for id, post in zip(post_ids, posts, strict=True)
+            ]
+        return [post for post in posts if post is not None]
@@ -0,0 +1,30 @@
+import json
+
+from src.feed.exception import InvalidCursor
+
+
+def encode_cursor(post_id: int) -> str:
+    return str(post_id)
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        post_id = int(cursor)
+    except ValueError as exc:
+        raise InvalidCursor(f"Invalid cursor {cursor=}") from exc
+    if post_id <= 0:
+        raise InvalidCursor(f"Invalid cursor {cursor=}")
+    return post_id
+
+
+def page_json(items: list[bytes], next_cursor: str | None) -> bytes:
+    """A ``PostPage`` body built from posts already in JSON."""
+    return b"".join(
+        (
+            b'{"items":[',
+            b",".join(items),
+            b'],"next_cursor":',
+            json.dumps(next_cursor).encode(),
+            b"}",
+        )
+    )
@@ -0,0 +1,78 @@
+"""Structured logging that does not block the event loop.
+
+The root logger only puts records on a queue. A listener thread formats
+them and writes them out, so a slow stderr or log shipper cannot stall
+request handling. Fields passed with ``extra=`` become JSON keys.
+"""
+
+import copy
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+_RECORD_FIELDS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """``QueueHandler`` that leaves the traceback out of the message.
+
+    The stock one formats the record and drops ``exc_info`` and
+    ``stack_info``, the formatter of the listener could not put them in
+    their own keys.
+    """
+
+    _formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._formatter.formatException(record.exc_info)
+        # Tracebacks hold every frame alive while the record is queued.
+        record.exc_info = None
+        return record
+
+
+def setup_logging(level: str, as_json: bool = True) -> QueueListener:
+    """Route the root logger through a queue, return the started listener."""
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(
+        JsonFormatter()
+        if as_json
+        else logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s %(message)s"
+        )
+    )
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [_QueueHandler(records)]
+    root.setLevel(level)
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
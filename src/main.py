@@ -1,14 +1,123 @@
-import uvicorn
-from fastapi import FastAPI
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from src.auth.cache import get_user_cache
+from src.auth.dependencies import current_active_superuser
+from src.auth.exceptions import PasswordHasherBusy
+from src.auth.password import async_password_helper
+from src.auth.revocation import get_revocation_list
 from src.auth.router import router as auth_router
+from src.auth.service import get_session_strategy
+from src.cache import close_redis
+from src.config import config
+from src.database import (
+    dispose_engines,
+    get_engine,
+    get_replica_engine,
+    pool_stats,
+)
+from src.feed.router import router as feed_router
+from src.log import setup_logging
+from src.message.partition import maintain_partitions
+from src.message.router import router as message_router
+from src.message.writer import get_message_writer
+from src.metrics import MetricsMiddleware, StatsCollector, render
+from src.models import User
+from src.notification.router import router as notification_router
+from src.notification.service import get_hub
+from src.rate_limit import Policy, RateLimit, client_ip, get_rate_limiter
 from src.user.router import router as user_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    log_listener = setup_logging(config.LOG_LEVEL, config.LOG_JSON)
+    partitions = asyncio.create_task(maintain_partitions(get_engine()))
+    yield
+    partitions.cancel()
+    await asyncio.to_thread(async_password_helper.shutdown)
+    await get_hub().close()
+    await get_message_writer().close()
+    await get_revocation_list().close()
+    await close_redis()
+    await dispose_engines()
+    log_listener.stop()
+
+
+# Catch-all per client and route, leased so most requests skip Redis.
+api_rate_limit = RateLimit(
+    Policy("api:ip", config.RATE_LIMIT_API_PER_MINUTE, 60, lease=20),
+    client_ip,
+)
+
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(api_rate_limit)])
+app.add_middleware(MetricsMiddleware)
 origins = ["*", "https://play.google.com/"]
+# Counters kept by this process, reported next to the histograms.
+stats_collectors = [
+    StatsCollector("db_pool_primary", lambda: pool_stats(get_engine())),
+    StatsCollector("rate_limit", lambda: get_rate_limiter().stats()),
+    StatsCollector("user_cache", lambda: get_user_cache().stats()),
+    StatsCollector("session", lambda: get_session_strategy().stats()),
+    StatsCollector("revocation", lambda: get_revocation_list().stats()),
+    StatsCollector("password_hasher", async_password_helper.stats),
+    StatsCollector("message_writer", lambda: get_message_writer().stats()),
+]
+if config.POSTGRES_REPLICA_URL:
+    stats_collectors.append(
+        StatsCollector(
+            "db_pool_replica", lambda: pool_stats(get_replica_engine())
+        )
+    )
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(
+    request: Request, exc: PasswordHasherBusy
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "PASSWORD_HASHER_BUSY"},
+        headers={"Retry-After": "1"},
+    )
+
 
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(user_router, prefix="/user", tags=["user"])
+app.include_router(notification_router, prefix="/ws", tags=["notification"])
+app.include_router(feed_router, prefix="/feed", tags=["feed"])
+app.include_router(message_router, prefix="/messages", tags=["message"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(render(*stats_collectors), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/stats/pool", tags=["stats"])
+async def database_pool_stats(
+    user: User = Depends(current_active_superuser),  # noqa: B008
+) -> dict[str, Any]:
+    stats = {"primary": pool_stats(get_engine())}
+    if get_replica_engine() is not get_engine():
+        stats["replica"] = pool_stats(get_replica_engine())
+    return stats
+
+
+@app.get("/stats/rate-limit", tags=["stats"])
+async def rate_limit_stats(
+    user: User = Depends(current_active_superuser),  # noqa: B008
+) -> dict[str, int]:
+    return get_rate_limiter().stats()
+
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,30 @@
+from enum import StrEnum
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MESSAGE_MAX_LENGTH = 4000
+
+# One range partition of the message table per month.
+PARTITION_NAME = "message_{:%Y_%m}"
+PARTITION_PATTERN = r"message_\d{4}_\d{2}"
+# Months created ahead of the current one.
+PARTITIONS_AHEAD = 3
+# Seconds between two checks of a long running process, far below the
+# PARTITIONS_AHEAD months a missed check can afford.
+PARTITION_CHECK_INTERVAL = 6 * 3600
+# Advisory lock taken while creating partitions, workers start at once.
+PARTITION_LOCK_ID = 7312004
+
+# Messages waiting to be written per worker, senders past that wait.
+WRITE_QUEUE_SIZE = 10000
+WRITE_BATCH_SIZE = 500
+# Seconds a short batch waits for more messages before it is written.
+WRITE_LINGER = 0.005
+
+# Hash of sender id to the number of unread messages from them.
+UNREAD_KEY = "unread:{}"
+
+
+class ErrorCode(StrEnum):
+    NOT_FRIEND = "NOT_FRIEND"
+    INVALID_CURSOR = "INVALID_CURSOR"
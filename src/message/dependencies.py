@@ -0,0 +1,11 @@
+from fastapi import Depends
+
+from src.message.repository import MessageRepository
+from src.user.dependencies import get_unit_of_work
+from src.user.unit_of_work import UnitOfWork
+
+
+async def get_message_repository(
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+):
+    yield MessageRepository(uow.read_session)
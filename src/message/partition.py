@@ -0,0 +1,84 @@
+"""Monthly partitions of the ``message`` table.
+
+The migration creates the first months. Every API process creates the
+next ``PARTITIONS_AHEAD`` ones at startup and checks again every
+``PARTITION_CHECK_INTERVAL`` seconds, so a long running process never
+reaches a month without one, where inserting a message fails. Run this
+from a deploy step or cron to create more at once:
+
+    python -m src.message.partition --months 12
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.message.constant import (
+    PARTITION_CHECK_INTERVAL,
+    PARTITION_LOCK_ID,
+    PARTITION_NAME,
+    PARTITIONS_AHEAD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _month(day: date, offset: int) -> date:
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_ddl(day: date) -> str:
+    """CREATE TABLE of the partition holding the month of ``day``."""
+    start, end = _month(day, 0), _month(day, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {PARTITION_NAME.format(start)} "
+        "PARTITION OF message FOR VALUES "
+        f"FROM ('{start} 00:00+00') TO ('{end} 00:00+00')"
+    )
+
+
+async def ensure_partitions(
+    engine: AsyncEngine, months: int = PARTITIONS_AHEAD
+) -> None:
+    """Create the current month and ``months`` more if missing."""
+    today = datetime.now(UTC).date()
+    async with engine.begin() as connection:
+        await connection.execute(
+            text("SELECT pg_advisory_xact_lock(:id)"),
+            {"id": PARTITION_LOCK_ID},
+        )
+        for offset in range(months + 1):
+            await connection.execute(
+                text(partition_ddl(_month(today, offset)))
+            )
+
+
+async def maintain_partitions(
+    engine: AsyncEngine, interval: float = PARTITION_CHECK_INTERVAL
+) -> None:
+    """Run ``ensure_partitions`` now and every ``interval`` seconds."""
+    while True:
+        try:
+            await ensure_partitions(engine)
+        except (SQLAlchemyError, OSError):
+            logger.exception("Could not create message partitions")
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    from src.database import get_engine
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--months", type=int, default=PARTITIONS_AHEAD)
+    args = parser.parse_args()
+    asyncio.run(ensure_partitions(get_engine(), args.months))
+
+
+if __name__ == "__main__":
+    main()
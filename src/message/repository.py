@@ -0,0 +1,55 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.message.schema import Message, MessagePage, message_list
+from src.message.util import conversation_id
+from src.models import Message as MessageTable
+from src.user.util import encode_cursor
+
+_message_columns = tuple(
+    getattr(MessageTable, name) for name in Message.model_fields
+)
+
+
+class MessageRepository:
+    """History of one-to-one conversations, newest first."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def history(
+        self,
+        user_id: UUID,
+        other_id: UUID,
+        limit: int,
+        before: tuple[datetime, UUID] | None = None,
+    ) -> MessagePage:
+        key = (MessageTable.created_at, MessageTable.id)
+        stmt = (
+            select(*_message_columns)
+            .where(
+                MessageTable.conversation_id
+                == conversation_id(user_id, other_id)
+            )
+            .order_by(*(column.desc() for column in key))
+            .limit(limit + 1)
+        )
+        if before is not None:
+            stmt = stmt.where(
+                tuple_(*key) < tuple_(*before),
+                # Plain bound the planner prunes later months with.
+                MessageTable.created_at <= before[0],
+            )
+        res = await self.session.execute(stmt)
+        rows = res.all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return MessagePage(
+            items=message_list.validate_python(rows, from_attributes=True),
+            next_cursor=next_cursor,
+        )
@@ -0,0 +1,87 @@
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from src.auth.dependencies import current_active_user
+from src.cache import get_redis
+from src.message.constant import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ErrorCode
+from src.message.dependencies import get_message_repository
+from src.message.repository import MessageRepository
+from src.message.schema import Message, MessageCreate, MessagePage
+from src.message.service import mark_read, unread_counts
+from src.message.writer import get_message_writer
+from src.models import User
+from src.user.dependencies import get_friend_graph
+from src.user.exception import InvalidCursor
+from src.user.graph import FriendGraph
+from src.user.util import decode_cursor
+
+router = APIRouter()
+
+
+@router.get("/unread", response_model=dict[UUID, int], name="message:unread")
+async def unread(
+    user: User = Depends(current_active_user),  # noqa: B008
+):
+    """Unread messages by sender, senders without any are left out."""
+    return await unread_counts(get_redis(), user.id)
+
+
+@router.post(
+    "/{user_id}",
+    response_model=Message,
+    status_code=status.HTTP_201_CREATED,
+    name="message:send",
+)
+async def send_message(
+    user_id: UUID,
+    body: MessageCreate,
+    user: User = Depends(current_active_user),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+):
+    if not await graph.is_friend(user.id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ErrorCode.NOT_FRIEND,
+        )
+    message = Message(
+        id=uuid4(),
+        sender_id=user.id,
+        recipient_id=user_id,
+        body=body.body,
+        created_at=datetime.now(UTC),
+    )
+    await get_message_writer().write(message)
+    return message
+
+
+@router.get("/{user_id}", response_model=MessagePage, name="message:history")
+async def history(
+    user_id: UUID,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user: User = Depends(current_active_user),  # noqa: B008
+    repository: MessageRepository = Depends(get_message_repository),  # noqa: B008
+):
+    """Messages exchanged with ``user_id``, newest first."""
+    try:
+        before = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorCode.INVALID_CURSOR,
+        ) from exc
+    return await repository.history(user.id, user_id, limit, before)
+
+
+@router.post(
+    "/{user_id}/read",
+    status_code=status.HTTP_204_NO_CONTENT,
+    name="message:read",
+)
+async def read_messages(
+    user_id: UUID,
+    user: User = Depends(current_active_user),  # noqa: B008
+):
+    await mark_read(get_redis(), user.id, user_id)
@@ -0,0 +1,36 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+from src.message.constant import MESSAGE_MAX_LENGTH
+from src.notification.constant import NotificationType
+
+
+class MessageCreate(BaseModel):
+    body: str = Field(min_length=1, max_length=MESSAGE_MAX_LENGTH)
+
+
+class Message(BaseModel):
+    id: UUID
+    sender_id: UUID
+    recipient_id: UUID
+    body: str
+    created_at: datetime
+
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+
+class MessagePage(BaseModel):
+    items: list[Message]
+    next_cursor: str | None = None
+
+
+message_list = TypeAdapter(list[Message])
+
+
+class MessageEvent(BaseModel):
+    """Sent on the notification socket of the recipient."""
+
+    type: NotificationType = NotificationType.MESSAGE
+    message: Message
@@ -0,0 +1,15 @@
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.message.constant import UNREAD_KEY
+
+
+async def unread_counts(redis: Redis, user_id: UUID) -> dict[UUID, int]:
+    """Unread messages of ``user_id`` by sender."""
+    raw = await redis.hgetall(UNREAD_KEY.format(user_id))
+    return {UUID(sender): int(count) for sender, count in raw.items()}
+
+
+async def mark_read(redis: Redis, user_id: UUID, sender_id: UUID) -> None:
+    await redis.hdel(UNREAD_KEY.format(user_id), str(sender_id))
@@ -0,0 +1,10 @@
+from uuid import UUID, uuid5
+
+# Fixed namespace, changing it would split every conversation.
+_CONVERSATION_NAMESPACE = UUID("5f0e6a43-3c1d-4f0b-9a55-2d5c7e0b1a68")
+
+
+def conversation_id(user_id: UUID, other_id: UUID) -> UUID:
+    """The same id for both participants of a one-to-one conversation."""
+    low, high = sorted((user_id, other_id))
+    return uuid5(_CONVERSATION_NAMESPACE, f"{low}{high}")
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from functools import cache
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.cache import get_redis
+from src.database import get_engine
+from src.message.constant import (
+    UNREAD_KEY,
+    WRITE_BATCH_SIZE,
+    WRITE_LINGER,
+    WRITE_QUEUE_SIZE,
+)
+from src.message.schema import Message, MessageEvent
+from src.message.util import conversation_id
+from src.models import Message as MessageTable
+from src.notification.constant import NOTIFY_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriter:
+    """Writes the messages of this worker in batches.
+
+    A sender waits until the batch holding its message is committed.
+    At most ``queue_size`` messages wait to be written, senders past
+    that wait for room, so memory stays bounded under any load. After a
+    batch commits its messages are published to the recipients' sockets
+    and counted as unread in one Redis round trip.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        redis: Redis,
+        queue_size: int,
+        batch_size: int,
+        linger: float,
+    ):
+        self.engine = engine
+        self.redis = redis
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue: asyncio.Queue[tuple[Message, asyncio.Future]] = (
+            asyncio.Queue(queue_size)
+        )
+        self._task: asyncio.Task | None = None
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+
+    async def write(self, message: Message) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(self._stopped)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future))
+        await future
+
+    def _stopped(self, task: asyncio.Task) -> None:
+        # The next write starts a new task, messages still queued are
+        # picked up by it.
+        if self._task is task:
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                if self._queue.qsize() < self.batch_size - 1:
+                    await asyncio.sleep(self.linger)
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                await self._write(batch)
+            except Exception as exc:
+                self.errors += 1
+                logger.exception("Message batch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            except BaseException:
+                # Cancelled, nobody is left to answer these senders.
+                for _, future in batch:
+                    future.cancel()
+                raise
+
+    async def _write(
+        self, batch: list[tuple[Message, asyncio.Future]]
+    ) -> None:
+        messages = [message for message, _ in batch]
+        await self._insert(messages)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+        await self._deliver(messages)
+
+    async def _insert(self, messages: list[Message]) -> None:
+        rows = [
+            {
+                **message.model_dump(),
+                "conversation_id": conversation_id(
+                    message.sender_id, message.recipient_id
+                ),
+            }
+            for message in messages
+        ]
+        async with self.engine.begin() as connection:
+            await connection.execute(insert(MessageTable), rows)
+        self.written += len(rows)
+        self.batches += 1
+
+    async def _deliver(self, messages: list[Message]) -> None:
+        # Stored already: a Redis failure only delays delivery until
+        # the recipient loads the history.
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for message in messages:
+                    recipient = message.recipient_id
+                    pipe.publish(
+                        NOTIFY_CHANNEL.format(recipient),
+                        MessageEvent(message=message).model_dump_json(),
+                    )
+                    pipe.hincrby(
+                        UNREAD_KEY.format(recipient), str(message.sender_id)
+                    )
+                await pipe.execute()
+        except RedisError:
+            logger.exception("Message delivery failed")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "written": self.written,
+            "batches": self.batches,
+            "errors": self.errors,
+            "queued": self._queue.qsize(),
+        }
+
+
+@cache
+def get_message_writer() -> MessageWriter:
+    return MessageWriter(
+        get_engine(),
+        get_redis(),
+        WRITE_QUEUE_SIZE,
+        WRITE_BATCH_SIZE,
+        WRITE_LINGER,
+    )
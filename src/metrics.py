@@ -0,0 +1,229 @@
+"""Prometheus metrics and per-request timing.
+
+Request latency is recorded per route template. Database and Redis
+time spent while serving a request is summed in a context variable and
+returned in the ``Server-Timing`` header, so a slow response can be
+told apart from a slow query in the browser or in access logs.
+
+With several worker processes set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty directory shared by the workers.
+"""
+
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from prometheus_client import (
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, by route template.",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run while serving a request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Time from sending a statement to its result, by engine.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+)
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Round trip of a Redis command or pipeline.",
+    ["command"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1),
+)
+BROKER_PUBLISH_LATENCY = Histogram(
+    "broker_publish_duration_seconds",
+    "Time to publish a message to the broker, by topic.",
+    ["topic"],
+)
+FEED_FANOUT = Histogram(
+    "feed_fanout_timelines",
+    "Timelines a new post was pushed to.",
+    buckets=(0, 1, 10, 50, 100, 250, 500, 1000, 2500),
+)
+
+
+@dataclass(slots=True)
+class RequestTimings:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    redis_commands: int = 0
+    redis_seconds: float = 0.0
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries}",'
+            f" redis;dur={self.redis_seconds * 1000:.2f}"
+            f';desc="{self.redis_commands}",'
+            f" total;dur={total * 1000:.2f}"
+        )
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Time every statement run by ``engine``."""
+    histogram = DB_QUERY_LATENCY.labels(name)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, *args):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, *args):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        histogram.observe(seconds)
+        timings = request_timings.get()
+        if timings is not None:
+            timings.db_queries += 1
+            timings.db_seconds += seconds
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection is not None and context.connection.info
+        if starts and starts.get("query_start"):
+            starts["query_start"].pop()
+
+
+def _observe_redis(command: str, seconds: float) -> None:
+    REDIS_LATENCY.labels(command).observe(seconds)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.redis_commands += 1
+        timings.redis_seconds += seconds
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            _observe_redis("PIPELINE", time.perf_counter() - start)
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that times every command and pipeline."""
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            _observe_redis(str(args[0]).upper(), time.perf_counter() - start)
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: str | None = None
+    ) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+        )
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Newer FastAPI reports routes of an included router without its
+    # prefix, take the missing leading segments from the request path.
+    parts = scope["path"].split("/")
+    extra = len(parts) - len(route.path.split("/"))
+    if extra <= 0:
+        return route.path
+    return "/".join(parts[: extra + 1]) + route.path
+
+
+class MetricsMiddleware:
+    """Record request latency and add a ``Server-Timing`` header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = timings.server_timing(time.perf_counter() - start)
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", ()),
+                        (b"server-timing", header.encode()),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            route = _route_template(scope)
+            REQUEST_LATENCY.labels(scope["method"], route, status).observe(
+                time.perf_counter() - start
+            )
+            REQUEST_QUERIES.labels(route).observe(timings.db_queries)
+
+
+class StatsCollector(Collector):
+    """Expose the numeric fields of a ``stats()`` dict as gauges.
+
+    Reported by the process that serves the scrape only.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], dict[str, Any]]):
+        self.prefix = prefix
+        self.stats = stats
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        for key, value in self.stats().items():
+            if isinstance(value, int | float) and not isinstance(value, bool):
+                yield GaugeMetricFamily(
+                    f"{self.prefix}_{key}", f"{self.prefix} {key}", value
+                )
+
+
+def render(*collectors: Collector) -> bytes:
+    """Text exposition of all metrics and of ``collectors``."""
+    registry = CollectorRegistry()
+    for collector in collectors:
+        registry.register(collector)
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest() + generate_latest(registry)
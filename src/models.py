@@ -1,9 +1,21 @@
 from datetime import datetime
 from typing import Annotated, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from fastapi_users.db import SQLAlchemyBaseUserTableUUID
-from sqlalchemy import TIMESTAMP, ForeignKey, text
+from sqlalchemy import (
+    TIMESTAMP,
+    BigInteger,
+    Boolean,
+    ForeignKey,
+    Identity,
+    Index,
+    String,
+    Uuid,
+    func,
+    literal_column,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 created_at = Annotated[
@@ -37,15 +49,148 @@ class Base(DeclarativeBase):
         return f"<{self.__class__.__name__} {', '.join(cols)}>"
 
 
-class User(SQLAlchemyBaseUserTableUUID, Base):
+class User(Base):
+    """The columns of fastapi-users' ``SQLAlchemyBaseUserTableUUID``.
+
+    Declared here, subclassing it imports fastapi-users and with it
+    FastAPI into the relay and the migrations.
+    """
+
+    __tablename__ = "user"
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
     first_name: Mapped[str]
     last_name: Mapped[str]
     created_at: Mapped[created_at]
     update_at: Mapped[updated_at]
-    friend: Mapped[set["Friend"]] = relationship()
+    # Kept up to date by ``FriendRepository`` in the transaction of each
+    # graph change, so profiles never count relationship rows.
+    friend_count: Mapped[int] = mapped_column(server_default=text("0"))
+    incoming_request_count: Mapped[int] = mapped_column(
+        server_default=text("0")
+    )
+    outgoing_request_count: Mapped[int] = mapped_column(
+        server_default=text("0")
+    )
+    friend: Mapped[set["Friend"]] = relationship(
+        foreign_keys="Friend.user_id", passive_deletes=True
+    )
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
+    email: Mapped[str] = mapped_column(
+        String(length=320), unique=True, index=True
+    )
+    hashed_password: Mapped[str] = mapped_column(String(length=1024))
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
+_space = literal_column("' '")
+# What user search matches against. Spaces are inlined, not bound, so
+# queries use the same expression as the trigram index.
+user_search_text = func.lower(
+    User.first_name + _space + User.last_name + _space + User.email
+)
+Index(
+    "ix_user_search_trgm",
+    user_search_text.label("search_text"),
+    postgresql_using="gist",
+    postgresql_ops={"search_text": "gist_trgm_ops"},
+)
 
 
 class Friend(Base):
+    """Friendship edge, stored once per direction.
+
+    The primary key serves "is A a friend of B" and "friends of A",
+    the reverse index serves lookups by ``friend_id``.
+    """
+
     __tablename__ = "friend"
-    user_id: Mapped[UUID] = mapped_column(primary_key=True)
-    friend_id: Mapped[UUID] = mapped_column(ForeignKey("user.id"))
+    __table_args__ = (
+        Index("ix_friend_friend_id_user_id", "friend_id", "user_id"),
+        Index(
+            "ix_friend_user_id_created_at_friend_id",
+            "user_id",
+            "created_at",
+            "friend_id",
+        ),
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    friend_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at: Mapped[created_at]
+
+
+class FriendRequest(Base):
+    __tablename__ = "friend_request"
+    __table_args__ = (
+        Index(
+            "ix_friend_request_receiver_id_sender_id",
+            "receiver_id",
+            "sender_id",
+        ),
+    )
+    sender_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    receiver_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    msg: Mapped[str | None]
+    created_at: Mapped[created_at]
+
+
+class Post(Base):
+    """Immutable post, ids increase with creation and order timelines."""
+
+    __tablename__ = "post"
+    __table_args__ = (Index("ix_post_author_id_id", "author_id", "id"),)
+    id: Mapped[int] = mapped_column(
+        BigInteger, Identity(always=True), primary_key=True
+    )
+    author_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE")
+    )
+    body: Mapped[str]
+    created_at: Mapped[created_at]
+
+
+class Message(Base):
+    """Direct message, partitioned by month of ``created_at``.
+
+    The primary key serves a conversation's history newest first, and
+    ``created_at`` in it lets queries skip whole months. There are no
+    foreign keys to ``user``: deleting a user would scan every month.
+    """
+
+    __tablename__ = "message"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+    conversation_id: Mapped[UUID] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), primary_key=True
+    )
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    sender_id: Mapped[UUID]
+    recipient_id: Mapped[UUID]
+    body: Mapped[str]
+
+
+class Outbox(Base):
+    """Event written in the transaction of the change it describes.
+
+    Rows are published and deleted by ``src.outbox.relay`` in ``id``
+    order. ``key`` travels with the event so consumers can drop
+    redeliveries.
+    """
+
+    __tablename__ = "outbox"
+    id: Mapped[int] = mapped_column(
+        BigInteger, Identity(always=True), primary_key=True
+    )
+    key: Mapped[UUID] = mapped_column(unique=True, default=uuid4)
+    topic: Mapped[str]
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    created_at: Mapped[created_at]
@@ -0,0 +1,28 @@
+from enum import StrEnum
+
+NOTIFY_CHANNEL = "notify:{}"
+# Hash of user id to the number of open sockets over all workers.
+PRESENCE_CONNECTIONS_KEY = "presence:connections"
+# Sorted set of user id scored by the last heartbeat of any socket.
+PRESENCE_SEEN_KEY = "presence:seen"
+
+HEARTBEAT_INTERVAL = 25
+# A socket that said nothing for this long is closed, a user not
+# heartbeated for this long is offline.
+STALE_AFTER = 2 * HEARTBEAT_INTERVAL + 5
+# Messages a slow socket may fall behind by before it is closed.
+SEND_QUEUE_SIZE = 100
+PRESENCE_QUERY_LIMIT = 500
+HEARTBEAT_BATCH_SIZE = 10000
+
+
+class NotificationType(StrEnum):
+    FRIEND_REQUEST = "friend_request"
+    FRIEND_ACCEPT = "friend_accept"
+    FRIEND_REMOVE = "friend_remove"
+    MESSAGE = "message"
+    ONLINE = "online"
+    OFFLINE = "offline"
+    PRESENCE = "presence"
+    PING = "ping"
+    PONG = "pong"
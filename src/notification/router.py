@@ -0,0 +1,65 @@
+import asyncio
+import time
+from uuid import UUID
+
+from fastapi import APIRouter, WebSocket, status
+from pydantic import ValidationError
+
+from src.auth.dependencies import websocket_user
+from src.cache import get_binary_redis
+from src.database import async_session_maker
+from src.notification.constant import NotificationType
+from src.notification.schema import ClientMessage, Notification, Presence
+from src.notification.service import Connection, get_hub, publish
+from src.user.graph import FriendGraph
+from src.user.repositry import FriendRepository
+
+router = APIRouter()
+
+
+async def _notify_friends(user_id: UUID, type: NotificationType) -> None:
+    async with async_session_maker() as session:
+        graph = FriendGraph(FriendRepository(session), get_binary_redis())
+        friend_ids = await graph.friend_ids(user_id)
+    await publish(friend_ids, Notification(type=type, user_id=user_id))
+
+
+async def _receive(websocket: WebSocket, connection: Connection) -> None:
+    """Answer presence queries, any message counts as a sign of life."""
+    async for text in websocket.iter_text():
+        connection.last_seen = time.monotonic()
+        try:
+            message = ClientMessage.model_validate_json(text)
+        except ValidationError:
+            continue
+        if message.type == NotificationType.PRESENCE:
+            presence = Presence(online=await get_hub().online(message.ids))
+            connection.push(presence.model_dump_json())
+
+
+@router.websocket("/notifications", name="notification:socket")
+async def notifications(websocket: WebSocket):
+    """Push friend request and presence events to the current user.
+
+    The client answers ``ping`` with ``pong`` and may send
+    ``{"type": "presence", "ids": [...]}`` to ask who is online.
+    """
+    user = await websocket_user(websocket)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    hub = get_hub()
+    connection, came_online = await hub.connect(user.id, websocket)
+    receiver = asyncio.create_task(_receive(websocket, connection))
+    try:
+        if came_online:
+            await _notify_friends(user.id, NotificationType.ONLINE)
+        await asyncio.wait(
+            (receiver, connection.sender),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        receiver.cancel()
+        if await hub.disconnect(user.id, connection):
+            await _notify_friends(user.id, NotificationType.OFFLINE)
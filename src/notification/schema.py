@@ -0,0 +1,22 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from src.notification.constant import PRESENCE_QUERY_LIMIT, NotificationType
+
+
+class Notification(BaseModel):
+    type: NotificationType
+    # The user whose action caused the notification.
+    user_id: UUID | None = None
+    msg: str | None = None
+
+
+class ClientMessage(BaseModel):
+    type: NotificationType
+    ids: list[UUID] = Field(default=[], max_length=PRESENCE_QUERY_LIMIT)
+
+
+class Presence(BaseModel):
+    type: NotificationType = NotificationType.PRESENCE
+    online: dict[UUID, bool]
@@ -0,0 +1,214 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Iterable
+from functools import cache
+from uuid import UUID
+
+from fastapi import WebSocket, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache import get_redis
+from src.notification.constant import (
+    HEARTBEAT_BATCH_SIZE,
+    HEARTBEAT_INTERVAL,
+    NOTIFY_CHANNEL,
+    PRESENCE_CONNECTIONS_KEY,
+    PRESENCE_SEEN_KEY,
+    SEND_QUEUE_SIZE,
+    STALE_AFTER,
+    NotificationType,
+)
+from src.notification.schema import Notification
+
+logger = logging.getLogger(__name__)
+
+PING = Notification(type=NotificationType.PING).model_dump_json(
+    exclude_none=True
+)
+
+# Drop a socket from the connection count, and the user from presence
+# once their last socket anywhere is gone.
+_RELEASE = """
+local left = redis.call("HINCRBY", KEYS[1], ARGV[1], -1)
+if left <= 0 then
+    redis.call("HDEL", KEYS[1], ARGV[1])
+    redis.call("ZREM", KEYS[2], ARGV[1])
+end
+return left
+"""
+
+
+async def publish(
+    user_ids: Iterable[UUID], notification: Notification
+) -> None:
+    """Deliver ``notification`` to every socket of ``user_ids``."""
+    message = notification.model_dump_json(exclude_none=True)
+    async with get_redis().pipeline(transaction=False) as pipe:
+        for user_id in user_ids:
+            pipe.publish(NOTIFY_CHANNEL.format(user_id), message)
+        await pipe.execute()
+
+
+class Connection:
+    """One socket and its bounded queue of outgoing messages."""
+
+    __slots__ = ("websocket", "queue", "last_seen", "overflowed", "sender")
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(queue_size)
+        self.last_seen = time.monotonic()
+        self.overflowed = False
+        self.sender: asyncio.Task | None = None
+
+    def push(self, message: str) -> None:
+        """Queue ``message``, a socket that can not keep up is dropped."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.stop()
+
+    async def _send(self) -> None:
+        while True:
+            await self.websocket.send_text(await self.queue.get())
+
+    def start(self) -> None:
+        self.sender = asyncio.create_task(self._send())
+
+    def stop(self) -> None:
+        if self.sender is not None:
+            self.sender.cancel()
+
+    async def close(self) -> None:
+        self.stop()
+        code = (
+            status.WS_1013_TRY_AGAIN_LATER
+            if self.overflowed
+            else status.WS_1000_NORMAL_CLOSURE
+        )
+        with contextlib.suppress(Exception):
+            await self.websocket.close(code=code)
+
+
+class NotificationHub:
+    """Sockets of one worker, fed from Redis pub/sub.
+
+    A worker subscribes to the channel of each user with a socket on it,
+    so an event published by any worker reaches every socket of its
+    user. One task per worker pings every socket and refreshes the
+    presence of every connected user in a single pass.
+    """
+
+    def __init__(self, redis: Redis, queue_size: int, interval: float):
+        self.redis = redis
+        self.queue_size = queue_size
+        self.interval = interval
+        self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        self._release = redis.register_script(_RELEASE)
+        self._connections: dict[UUID, set[Connection]] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return sum(len(local) for local in self._connections.values())
+
+    async def connect(
+        self, user_id: UUID, websocket: WebSocket
+    ) -> tuple[Connection, bool]:
+        """Register a socket, also return whether the user came online."""
+        connection = Connection(websocket, self.queue_size)
+        local = self._connections.setdefault(user_id, set())
+        local.add(connection)
+        if len(local) == 1:
+            await self._pubsub.subscribe(NOTIFY_CHANNEL.format(user_id))
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._listen()),
+                asyncio.create_task(self._heartbeat()),
+            ]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(PRESENCE_CONNECTIONS_KEY, str(user_id), 1)
+            pipe.zadd(PRESENCE_SEEN_KEY, {str(user_id): time.time()})
+            opened, _ = await pipe.execute()
+        connection.start()
+        return connection, opened == 1
+
+    async def disconnect(self, user_id: UUID, connection: Connection) -> bool:
+        """Unregister a socket, return whether the user went offline."""
+        await connection.close()
+        local = self._connections.get(user_id, set())
+        local.discard(connection)
+        if not local:
+            self._connections.pop(user_id, None)
+            await self._pubsub.unsubscribe(NOTIFY_CHANNEL.format(user_id))
+        left = await self._release(
+            keys=[PRESENCE_CONNECTIONS_KEY, PRESENCE_SEEN_KEY],
+            args=[str(user_id)],
+        )
+        return left <= 0
+
+    async def online(self, user_ids: list[UUID]) -> dict[UUID, bool]:
+        if not user_ids:
+            return {}
+        seen = await self.redis.zmscore(
+            PRESENCE_SEEN_KEY, [str(user_id) for user_id in user_ids]
+        )
+        since = time.time() - STALE_AFTER
+        return {
+            user_id: score is not None and score > since
+            for user_id, score in zip(user_ids, seen, strict=True)
+        }
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=None)
+            except RedisError:
+                logger.exception("Notification subscription failed")
+                await asyncio.sleep(1)
+                continue
+            if message is None:
+                continue
+            user_id = UUID(message["channel"].rsplit(":", 1)[1])
+            for connection in self._connections.get(user_id, ()):
+                connection.push(message["data"])
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            stale_before = time.monotonic() - STALE_AFTER
+            for local in self._connections.values():
+                for connection in local:
+                    if connection.last_seen < stale_before:
+                        connection.stop()
+                    else:
+                        connection.push(PING)
+            now = time.time()
+            user_ids = [str(user_id) for user_id in self._connections]
+            try:
+                for i in range(0, len(user_ids), HEARTBEAT_BATCH_SIZE):
+                    batch = user_ids[i : i + HEARTBEAT_BATCH_SIZE]
+                    await self.redis.zadd(
+                        PRESENCE_SEEN_KEY, dict.fromkeys(batch, now)
+                    )
+            except RedisError:
+                logger.exception("Presence heartbeat failed")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for local in list(self._connections.values()):
+            for connection in list(local):
+                await connection.close()
+        await self._pubsub.aclose()
+
+
+@cache
+def get_hub() -> NotificationHub:
+    return NotificationHub(get_redis(), SEND_QUEUE_SIZE, HEARTBEAT_INTERVAL)
@@ -0,0 +1,19 @@
+from enum import StrEnum
+
+# RabbitMQ topic exchange carrying every event but emails, routed by topic.
+EVENTS_EXCHANGE = "events"
+BATCH_SIZE = 500
+# Seconds to sleep after a batch smaller than BATCH_SIZE.
+POLL_INTERVAL = 0.2
+
+
+class Topic(StrEnum):
+    USER_REGISTERED = "user.registered"
+    USER_VERIFIED = "user.verified"
+    FRIEND_REQUESTED = "friend.requested"
+    FRIEND_ACCEPTED = "friend.accepted"
+    FRIEND_REJECTED = "friend.rejected"
+    FRIEND_REMOVED = "friend.removed"
+    POST_CREATED = "post.created"
+    # Handed to the email worker instead of the events exchange.
+    EMAIL = "email"
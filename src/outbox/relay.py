@@ -0,0 +1,135 @@
+"""Publish the outbox to RabbitMQ.
+
+    python -m src.outbox.relay
+
+Rows are locked with ``FOR UPDATE SKIP LOCKED``, published with broker
+confirms and deleted in the same transaction, so several relays can run
+side by side. A relay that dies after publishing and before committing
+publishes the batch again: delivery is at least once and consumers
+deduplicate on the event key.
+"""
+
+import argparse
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from celery import Celery  # type: ignore
+from kombu import Exchange
+from prometheus_client import start_http_server
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import config
+from src.database import async_session_maker
+from src.email_celery.router import async_queue, send_email_batch_task
+from src.log import setup_logging
+from src.metrics import BROKER_PUBLISH_LATENCY
+from src.models import Outbox
+from src.outbox.constant import (
+    BATCH_SIZE,
+    EVENTS_EXCHANGE,
+    POLL_INTERVAL,
+    Topic,
+)
+
+logger = logging.getLogger(__name__)
+
+events_exchange = Exchange(EVENTS_EXCHANGE, type="topic", durable=True)
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncSession],
+        app: Celery,
+        batch_size: int,
+        poll_interval: float,
+    ):
+        self.session_maker = session_maker
+        self.app = app
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+    def _publish(self, events: list[tuple[str, str, dict[str, Any]]]) -> None:
+        emails = []
+        with self.app.producer_or_acquire() as producer:
+            for key, topic, payload in events:
+                if topic == Topic.EMAIL:
+                    emails.append(
+                        (
+                            payload["email"],
+                            payload["token"],
+                            payload["kind"],
+                            payload.get("locale"),
+                            key,
+                        )
+                    )
+                    continue
+                with BROKER_PUBLISH_LATENCY.labels(topic).time():
+                    producer.publish(
+                        payload,
+                        exchange=events_exchange,
+                        routing_key=topic,
+                        message_id=key,
+                        headers={"topic": topic},
+                        serializer="json",
+                        delivery_mode="persistent",
+                        declare=[events_exchange],
+                        retry=True,
+                    )
+            if emails:
+                with BROKER_PUBLISH_LATENCY.labels(Topic.EMAIL).time():
+                    send_email_batch_task.apply_async(
+                        (emails,), producer=producer, ignore_result=True
+                    )
+
+    async def relay_once(self) -> int:
+        """Publish and delete one batch, return its size."""
+        async with self.session_maker() as session, session.begin():
+            stmt = (
+                select(Outbox.id, Outbox.key, Outbox.topic, Outbox.payload)
+                .order_by(Outbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return 0
+            await asyncio.to_thread(
+                self._publish,
+                [
+                    (str(key), topic, payload)
+                    for _, key, topic, payload in rows
+                ],
+            )
+            await session.execute(
+                delete(Outbox).where(Outbox.id.in_([row.id for row in rows]))
+            )
+        return len(rows)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                published = await self.relay_once()
+            except Exception:
+                logger.exception("Outbox relay failed, retrying")
+                published = 0
+            if published < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--metrics-port", type=int)
+    args = parser.parse_args()
+    setup_logging(config.LOG_LEVEL, config.LOG_JSON)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    relay = OutboxRelay(
+        async_session_maker, async_queue, args.batch_size, args.poll_interval
+    )
+    asyncio.run(relay.run())
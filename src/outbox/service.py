@@ -0,0 +1,22 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Outbox
+from src.outbox.constant import Topic
+
+
+def add_event(session: AsyncSession, topic: Topic, **payload: Any) -> Outbox:
+    """Stage an event, it is published only if ``session`` commits."""
+    event = Outbox(
+        topic=topic,
+        payload={key: _json(value) for key, value in payload.items()},
+    )
+    session.add(event)
+    return event
+
+
+def _json(value: Any) -> Any:
+    if value is None or isinstance(value, str | int | float | bool):
+        return value
+    return str(value)
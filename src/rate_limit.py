@@ -0,0 +1,204 @@
+import json
+import math
+import time
+from collections.abc import Awaitable, Callable
+from functools import cache
+
+from fastapi import HTTPException, Request, WebSocketException, status
+from fastapi.requests import HTTPConnection
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache import LRUCache, get_redis
+from src.config import config
+
+RATE_LIMIT_KEY = "ratelimit:{}:{}:{}"
+
+# Token bucket refilled continuously at ``rate`` tokens per millisecond.
+# Takes up to ARGV[3] tokens at once and returns how many were granted
+# and, when none were, how many milliseconds until the next one.
+TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local wanted = tonumber(ARGV[3])
+local time = redis.call("TIME")
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = math.min(wanted, math.floor(tokens))
+tokens = tokens - granted
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+local ttl = math.ceil((capacity - tokens) / rate)
+redis.call("PEXPIRE", KEYS[1], math.max(1, ttl))
+if granted > 0 then
+    return {granted, 0}
+end
+return {0, math.ceil((1 - tokens) / rate)}
+"""
+
+
+class Policy:
+    """``limit`` requests per ``period`` seconds for one identity.
+
+    With ``lease`` above one, a worker takes that many tokens from Redis
+    at once and spends them locally, trading a little fairness between
+    workers for fewer round trips on high-volume policies.
+    """
+
+    def __init__(self, name: str, limit: int, period: float, lease: int = 1):
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.lease = lease
+        self.rate = limit / (period * 1000)
+
+
+class RateLimiter:
+    """Token buckets in Redis with an in-process pre-filter.
+
+    Identities that were refused are refused locally until their next
+    token is due, and leased tokens are spent without asking Redis, so
+    neither floods nor steady traffic cost a round trip per request.
+    When Redis is unreachable requests are let through.
+    """
+
+    def __init__(self, redis: Redis, max_keys: int, lease_ttl: float):
+        self._script = redis.register_script(TOKEN_BUCKET)
+        self._blocked = LRUCache(max_keys, math.inf)
+        self._leases = LRUCache(max_keys, lease_ttl)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.denied = 0
+        self.errors = 0
+
+    async def hit(self, policy: Policy, scope: str, identity: str) -> float:
+        """Take a token, return 0 or the seconds to wait before retrying."""
+        key = RATE_LIMIT_KEY.format(policy.name, scope, identity)
+        until = self._blocked.get(key)
+        if until is not None:
+            wait = until - time.monotonic()
+            if wait > 0:
+                self.local_hits += 1
+                self.denied += 1
+                return wait
+            self._blocked.pop(key)
+        lease = self._leases.get(key)
+        if lease:
+            # Spend in place so the lease keeps its original expiry.
+            lease[0] -= 1
+            if not lease[0]:
+                self._leases.pop(key)
+            self.local_hits += 1
+            return 0
+
+        self.redis_hits += 1
+        try:
+            granted, retry_ms = await self._script(
+                keys=[key], args=[policy.limit, policy.rate, policy.lease]
+            )
+        except RedisError:
+            self.errors += 1
+            return 0
+        if granted:
+            if granted > 1:
+                self._leases.set(key, [granted - 1])
+            return 0
+        self.denied += 1
+        wait = retry_ms / 1000
+        self._blocked.set(key, time.monotonic() + wait)
+        return wait
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "denied": self.denied,
+            "errors": self.errors,
+            "blocked_keys": len(self._blocked),
+        }
+
+
+@cache
+def get_rate_limiter() -> RateLimiter:
+    return RateLimiter(
+        get_redis(), config.RATE_LIMIT_MAX_KEYS, config.RATE_LIMIT_LEASE_TTL
+    )
+
+
+async def client_ip(connection: HTTPConnection) -> str | None:
+    return connection.client.host if connection.client else None
+
+
+async def form_username(connection: HTTPConnection) -> str | None:
+    """The ``username`` of a login form, lower-cased."""
+    if not isinstance(connection, Request):
+        return None
+    if "form" not in connection.headers.get("content-type", ""):
+        return None
+    username = (await connection.form()).get("username")
+    return username.lower() if isinstance(username, str) else None
+
+
+async def form_username_and_ip(connection: HTTPConnection) -> str | None:
+    """The ``username`` of a login form together with the client address.
+
+    Guessing from one address does not lock the account out for the
+    owner logging in from another.
+    """
+    username = await form_username(connection)
+    if username is None:
+        return None
+    return f"{username}|{await client_ip(connection)}"
+
+
+async def body_email(connection: HTTPConnection) -> str | None:
+    """The ``email`` of a JSON body, lower-cased."""
+    if not isinstance(connection, Request):
+        return None
+    try:
+        email = json.loads(await connection.body()).get("email")
+    except (ValueError, AttributeError):
+        return None
+    return email.lower() if isinstance(email, str) else None
+
+
+class RateLimit:
+    """Dependency applying ``policy`` per identity and per route.
+
+    ``identity`` extracts who is making the request, returning ``None``
+    skips the policy. Each route gets its own buckets, so one policy can
+    be attached to a whole router, or to the app, WebSocket routes
+    included. A refused handshake is closed with policy violation.
+    """
+
+    def __init__(
+        self,
+        policy: Policy,
+        identity: Callable[[HTTPConnection], Awaitable[str | None]],
+    ):
+        self.policy = policy
+        self.identity = identity
+
+    async def __call__(self, connection: HTTPConnection) -> None:
+        if not config.RATE_LIMIT_ENABLED:
+            return
+        identity = await self.identity(connection)
+        if identity is None:
+            return
+        route = connection.scope.get("route")
+        scope = getattr(route, "path", connection.url.path)
+        wait = await get_rate_limiter().hit(self.policy, scope, identity)
+        if not wait:
+            return
+        if connection.scope["type"] == "websocket":
+            raise WebSocketException(
+                code=status.WS_1008_POLICY_VIOLATION,
+                reason="TOO_MANY_REQUESTS",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="TOO_MANY_REQUESTS",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
@@ -0,0 +1,239 @@
+"""Bulk import and export of user accounts.
+
+    python -m src.user.bulk import users.csv
+    python -m src.user.bulk export users.ndjson
+
+Files are CSV with a header row or NDJSON, chosen by extension. Plain
+passwords are hashed in a process pool while the previous batch is
+copied into a staging table with ``COPY`` and moved into ``user`` with
+``INSERT ... ON CONFLICT DO NOTHING``, so existing accounts are skipped.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.auth.password import password_helper
+from src.config import config
+from src.database import get_engine, get_replica_engine
+from src.log import setup_logging
+from src.user.constant import (
+    IMPORT_BATCH_SIZE,
+    STREAM_BATCH_SIZE,
+    USER_EXPORT_FIELDS,
+)
+from src.user.schema import UserImport
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+STAGING_TABLE = "user_import"
+_COLUMNS = ", ".join(USER_EXPORT_FIELDS)
+_CREATE_STAGING = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+    f'ON COMMIT DELETE ROWS AS SELECT {_COLUMNS} FROM "user" WITH NO DATA'
+)
+_MOVE_STAGED = (
+    f'INSERT INTO "user" ({_COLUMNS}) '
+    f"SELECT {', '.join(USER_EXPORT_FIELDS[:-1])}, "
+    "COALESCE(created_at, TIMEZONE('utc', now())) "
+    f"FROM {STAGING_TABLE} ON CONFLICT DO NOTHING"
+)
+# ISO 8601 timestamps, the "+00" offset of the text output does not parse.
+_EXPORT_QUERY = (
+    f"SELECT {', '.join(USER_EXPORT_FIELDS[:-1])}, "
+    "to_json(created_at) #>> '{}' AS created_at "
+    'FROM "user" ORDER BY "user".created_at, id'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _format(path: Path) -> str:
+    try:
+        return FORMATS[path.suffix]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported file {path.name}, expected one of {list(FORMATS)}"
+        ) from None
+
+
+def read_rows(path: Path) -> Iterator[dict[str, Any]]:
+    """Rows of a CSV or NDJSON file, empty CSV cells left out."""
+    with path.open(newline="") as file:
+        if _format(path) == "csv":
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value}
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _hash_passwords(passwords: list[str]) -> list[str]:
+    return [password_helper.hash(password) for password in passwords]
+
+
+async def _hash(
+    executor: ProcessPoolExecutor, users: list[UserImport], workers: int
+) -> list[tuple]:
+    """Hash the plain passwords of ``users`` and build COPY records."""
+    plain = [user for user in users if user.hashed_password is None]
+    if plain:
+        loop = asyncio.get_running_loop()
+        size = -(-len(plain) // workers)
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    _hash_passwords,
+                    [user.password for user in plain[i : i + size]],
+                )
+                for i in range(0, len(plain), size)
+            )
+        )
+        hashes = (hashed for chunk in chunks for hashed in chunk)
+        for user in plain:
+            user.hashed_password = next(hashes)
+    return [
+        (
+            user.id or uuid4(),
+            user.email,
+            user.hashed_password,
+            user.is_active,
+            user.is_superuser,
+            user.is_verified,
+            user.first_name,
+            user.last_name,
+            user.created_at,
+        )
+        for user in users
+    ]
+
+
+async def _insert(connection, records: list[tuple]) -> int:
+    async with connection.transaction():
+        await connection.copy_records_to_table(
+            STAGING_TABLE, records=records, columns=USER_EXPORT_FIELDS
+        )
+        status = await connection.execute(_MOVE_STAGED)
+    return int(status.rsplit(" ", 1)[1])
+
+
+async def _driver_connection(connection):
+    return (await connection.get_raw_connection()).driver_connection
+
+
+async def import_users(
+    path: Path,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    workers: int | None = None,
+    db: AsyncEngine | None = None,
+) -> dict[str, int]:
+    """Import the accounts in ``path``.
+
+    Returns how many rows were read, rejected as invalid and inserted.
+    Rows neither invalid nor inserted clashed with an existing account.
+    """
+    stats = {"read": 0, "invalid": 0, "inserted": 0}
+    db = db or get_engine()
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        async with db.connect() as sa_connection:
+            connection = await _driver_connection(sa_connection)
+            await connection.execute(_CREATE_STAGING)
+            pending: asyncio.Task | None = None
+            for batch in _batches(read_rows(path), batch_size):
+                users = []
+                for row in batch:
+                    stats["read"] += 1
+                    try:
+                        users.append(UserImport.model_validate(row))
+                    except ValidationError as exc:
+                        stats["invalid"] += 1
+                        logger.warning("Row %d: %s", stats["read"], exc)
+                hashing = asyncio.ensure_future(
+                    _hash(executor, users, workers)
+                )
+                if pending is not None:
+                    stats["inserted"] += await _insert(
+                        connection, await pending
+                    )
+                pending = hashing
+            if pending is not None:
+                stats["inserted"] += await _insert(connection, await pending)
+    return stats
+
+
+async def export_users(path: Path, db: AsyncEngine | None = None) -> int:
+    """Write every account, password hashes included, to ``path``."""
+    db = db or get_replica_engine()
+    async with db.connect() as sa_connection:
+        connection = await _driver_connection(sa_connection)
+        if _format(path) == "csv":
+            status = await connection.copy_from_query(
+                _EXPORT_QUERY, output=str(path), format="csv", header=True
+            )
+            return int(status.rsplit(" ", 1)[1])
+        count = 0
+        with path.open("w") as file:
+            async with connection.transaction():
+                async for row in connection.cursor(
+                    _EXPORT_QUERY, prefetch=STREAM_BATCH_SIZE
+                ):
+                    file.write(json.dumps(dict(row), default=str) + "\n")
+                    count += 1
+        return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("import", help="import users from a file")
+    load.add_argument("path", type=Path)
+    load.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    load.add_argument("--workers", type=int, default=None)
+    dump = commands.add_parser("export", help="export users to a file")
+    dump.add_argument("path", type=Path)
+    args = parser.parse_args()
+    log_listener = setup_logging(config.LOG_LEVEL, config.LOG_JSON)
+
+    if args.command == "import":
+        try:
+            stats = asyncio.run(
+                import_users(args.path, args.batch_size, args.workers)
+            )
+        finally:
+            # Rejected rows are logged before the summary is printed.
+            log_listener.stop()
+        skipped = stats["read"] - stats["invalid"] - stats["inserted"]
+        print(
+            f"Read {stats['read']}, inserted {stats['inserted']}, "
+            f"invalid {stats['invalid']}, already existing {skipped}"
+        )
+    else:
+        try:
+            count = asyncio.run(export_users(args.path))
+        finally:
+            log_listener.stop()
+        print(f"Exported {count} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from enum import StrEnum
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 5000
+# Columns written by the bulk import and export, in file order.
+USER_EXPORT_FIELDS = (
+    "id",
+    "email",
+    "hashed_password",
+    "is_active",
+    "is_superuser",
+    "is_verified",
+    "first_name",
+    "last_name",
+    "created_at",
+)
+
+FRIENDS_CACHE_KEY = "friends:{}"
+FRIENDS_CACHE_TTL = 3600
+SUGGESTIONS_CACHE_KEY = "suggestions:{}"
+SUGGESTIONS_CACHE_TTL = 600
+SUGGESTIONS_LIMIT = 20
+# Only the most recent friends are walked to find suggestions, mutual
+# friend counts still cover every friend.
+SUGGESTIONS_FANOUT = 200
+
+PROFILE_CACHE_KEY = "profile:{}"
+PROFILE_CACHE_TTL = 3600
+
+SEARCH_MIN_LENGTH = 2
+SEARCH_MAX_LENGTH = 64
+# Repeated keystrokes of a typeahead hit the in-process cache.
+SEARCH_CACHE_SIZE = 10000
+SEARCH_CACHE_TTL = 30
+
+
+class ErrorCode(StrEnum):
+    FRIEND_ALREADY_FRIEND = "FRIEND_ALREADY_FRIEND"
+    FRIEND_REQUEST_ALREADY_SENT = "FRIEND_REQUEST_ALREADY_SENT"
+    FRIEND_REQUEST_NOT_FOUND = "FRIEND_REQUEST_NOT_FOUND"
+    FRIEND_NOT_FOUND = "FRIEND_NOT_FOUND"
+    FRIEND_REQUEST_TO_SELF = "FRIEND_REQUEST_TO_SELF"
+    INVALID_CURSOR = "INVALID_CURSOR"
+    USER_NOT_FOUND = "USER_NOT_FOUND"
+    ACCESS_DENIED = "ACCESS_DENIED"
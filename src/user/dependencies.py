@@ -0,0 +1,44 @@
+from fastapi import Depends
+
+from src.cache import get_binary_redis
+from src.user.graph import FriendGraph
+from src.user.profile import ProfileCache
+from src.user.repositry import FriendRepository, UserReadRepository
+from src.user.search import UserSearch, search_cache
+from src.user.unit_of_work import UnitOfWork
+
+
+async def get_unit_of_work():
+    async with UnitOfWork() as uow:
+        yield uow
+
+
+async def get_friend_repository(
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+):
+    yield uow.friends
+
+
+async def get_user_read_repository(
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+):
+    yield uow.reads
+
+
+async def get_friend_graph(
+    repository: FriendRepository = Depends(get_friend_repository),  # noqa: B008
+):
+    yield FriendGraph(repository, get_binary_redis())
+
+
+async def get_profile_cache(
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+):
+    yield ProfileCache(uow.users, get_binary_redis())
+
+
+async def get_user_search(
+    repository: UserReadRepository = Depends(get_user_read_repository),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+):
+    yield UserSearch(repository, graph, search_cache)
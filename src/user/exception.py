@@ -16,3 +16,7 @@ class AccessDenied(Exception):
 class NotFound(Exception):
     def __ini__(self, msg: str):
         msg = msg
+
+
+class InvalidCursor(Exception):
+    pass
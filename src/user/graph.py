@@ -0,0 +1,101 @@
+import struct
+from bisect import bisect_left
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.feed.constant import TIMELINE_KEY
+from src.user.constant import (
+    FRIENDS_CACHE_KEY,
+    FRIENDS_CACHE_TTL,
+    SUGGESTIONS_CACHE_KEY,
+    SUGGESTIONS_CACHE_TTL,
+    SUGGESTIONS_FANOUT,
+    SUGGESTIONS_LIMIT,
+)
+from src.user.repositry import AbstractFriendRepository
+from src.user.schema import MutualFriends, Suggestion
+from src.user.util import intersect_sorted, pack_ids, unpack_ids
+
+# 16 byte user id followed by the mutual friend count.
+_suggestion = struct.Struct(">16sI")
+
+
+class FriendGraph:
+    """Read side of the friend graph cached in Redis.
+
+    Each user's friends are kept as a sorted array of packed ids, so
+    mutual friends are a sorted-set intersection of two cache values.
+    Suggestions and their mutual counts are computed in the database
+    and cached per user.
+    Writes to the graph must call :meth:`edge_changed`.
+    """
+
+    def __init__(self, repository: AbstractFriendRepository, redis: Redis):
+        self.repository = repository
+        self.redis = redis
+
+    async def _adjacency(
+        self, user_id: UUID, store: bool = True
+    ) -> list[bytes]:
+        key = FRIENDS_CACHE_KEY.format(user_id)
+        blob = await self.redis.get(key)
+        if blob is None:
+            blob = pack_ids(await self.repository.friend_ids(user_id))
+            if store:
+                await self.redis.set(key, blob, ex=FRIENDS_CACHE_TTL)
+        return unpack_ids(blob)
+
+    async def friend_ids(self, user_id: UUID) -> list[UUID]:
+        return [UUID(bytes=id) for id in await self._adjacency(user_id)]
+
+    async def is_friend(self, user_id: UUID, other_id: UUID) -> bool:
+        friends = await self._adjacency(user_id)
+        i = bisect_left(friends, other_id.bytes)
+        return i < len(friends) and friends[i] == other_id.bytes
+
+    async def mutual(
+        self, user_id: UUID, other_id: UUID, limit: int
+    ) -> MutualFriends:
+        ids = intersect_sorted(
+            await self._adjacency(user_id), await self._adjacency(other_id)
+        )
+        return MutualFriends(
+            count=len(ids), ids=[UUID(bytes=id) for id in ids[:limit]]
+        )
+
+    async def suggestions(
+        self, user_id: UUID, limit: int = SUGGESTIONS_LIMIT
+    ) -> list[Suggestion]:
+        key = SUGGESTIONS_CACHE_KEY.format(user_id)
+        blob = await self.redis.get(key)
+        if blob is None:
+            rows = await self.repository.suggest(
+                user_id, SUGGESTIONS_LIMIT, SUGGESTIONS_FANOUT
+            )
+            blob = b"".join(
+                _suggestion.pack(id.bytes, count) for id, count in rows
+            )
+            await self.redis.set(key, blob, ex=SUGGESTIONS_CACHE_TTL)
+        return [
+            Suggestion(user_id=UUID(bytes=id), mutual_count=count)
+            for id, count in _suggestion.iter_unpack(blob)
+        ][:limit]
+
+    async def edge_changed(self, user_id: UUID, other_id: UUID) -> None:
+        """Drop what an added or removed edge between two users affects.
+
+        That is both adjacency lists and feed timelines, and the
+        suggestions of both users and of everyone adjacent to either of
+        them.
+        """
+        affected = {user_id.bytes, other_id.bytes}
+        affected.update(await self._adjacency(user_id, store=False))
+        affected.update(await self._adjacency(other_id, store=False))
+        await self.redis.unlink(
+            FRIENDS_CACHE_KEY.format(user_id),
+            FRIENDS_CACHE_KEY.format(other_id),
+            TIMELINE_KEY.format(user_id),
+            TIMELINE_KEY.format(other_id),
+            *(SUGGESTIONS_CACHE_KEY.format(UUID(bytes=id)) for id in affected),
+        )
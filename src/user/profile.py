@@ -0,0 +1,68 @@
+from collections.abc import Iterable
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.user.constant import PROFILE_CACHE_KEY, PROFILE_CACHE_TTL
+from src.user.exception import NotFound
+from src.user.repositry import UserRepository
+
+
+async def invalidate_profiles(redis: Redis, *user_ids: UUID) -> None:
+    await redis.unlink(*(PROFILE_CACHE_KEY.format(id) for id in user_ids))
+
+
+class ProfileCache:
+    """Profile cards kept in Redis as ready to send JSON.
+
+    A card is one ``GET``, a page of them one ``MGET``. Misses are read
+    from the primary in one query and stored for the next reader. Cards
+    are dropped, not rewritten, when a user or their counters change:
+    two writers rewriting after their commits could store the older
+    value last.
+    """
+
+    def __init__(self, repository: UserRepository, redis: Redis):
+        self.repository = repository
+        self.redis = redis
+
+    async def get(self, user_id: UUID) -> bytes:
+        (card,) = await self.get_many([user_id])
+        if card is None:
+            raise NotFound(f"User with {user_id=} does not exist")
+        return card
+
+    async def get_many(self, user_ids: Iterable[UUID]) -> list[bytes | None]:
+        """Cards of ``user_ids`` in order, None for unknown users."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return []
+        cards = await self.redis.mget(
+            [PROFILE_CACHE_KEY.format(id) for id in user_ids]
+        )
+        missing = {
+            id
+            for id, card in zip(user_ids, cards, strict=True)
+            if card is None
+        }
+        if missing:
+            loaded = {
+                summary.id: summary.model_dump_json().encode()
+                for summary in await self.repository.summaries(missing)
+            }
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for id, card in loaded.items():
+                    pipe.set(
+                        PROFILE_CACHE_KEY.format(id),
+                        card,
+                        ex=PROFILE_CACHE_TTL,
+                    )
+                await pipe.execute()
+            cards = [
+                loaded.get(id) if card is None else card
+                for id, card in zip(user_ids, cards, strict=True)
+            ]
+        return cards
+
+    async def invalidate(self, *user_ids: UUID) -> None:
+        await invalidate_profiles(self.redis, *user_ids)
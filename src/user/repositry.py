@@ -1,45 +1,133 @@
 import asyncio
-import functools
+import logging
 from abc import ABC, abstractmethod
-from contextlib import asynccontextmanager
-from uuid import UUID
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Double,
+    Row,
+    Select,
+    Update,
+    and_,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from src.auth.exceptions import UserAlreadyExists, UserNotExists
+from src.auth.password import AsyncPasswordHelper, async_password_helper
 from src.auth.schema import UserCreate, UserRead
-from src.auth.service import get_user_manager
-from src.database import get_session, get_user_db
+from src.models import Friend as FriendTable
+from src.models import FriendRequest as FriendRequestTable
 from src.models import User as UserTable
+from src.models import user_search_text
+from src.outbox.constant import Topic
+from src.outbox.service import add_event
+from src.user import bulk
+from src.user.constant import DEFAULT_PAGE_SIZE, STREAM_BATCH_SIZE
+from src.user.exception import (
+    AccessDenied,
+    AlreadyFriend,
+    AlreadySentRequest,
+    NotFound,
+)
+from src.user.schema import (
+    FriendRequest,
+    ProfileSummary,
+    UserPage,
+    summary_list,
+    user_list,
+)
 from src.user.service import User
+from src.user.util import (
+    decode_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
 
-get_async_session_context = asynccontextmanager(get_session)
-get_user_db_context = asynccontextmanager(get_user_db)
-get_user_manager_context = asynccontextmanager(get_user_manager)
+logger = logging.getLogger(__name__)
 
 
-def async_start(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        return asyncio.run(func(*args, **kwargs))
+def _counters(changes: dict[UUID, dict[str, int]]) -> Update:
+    """One UPDATE adding ``changes[user_id][column]`` to user counters."""
+    columns = {column for deltas in changes.values() for column in deltas}
+    values = {
+        column: getattr(UserTable, column)
+        + case(
+            {
+                user_id: deltas[column]
+                for user_id, deltas in changes.items()
+                if column in deltas
+            },
+            value=UserTable.id,
+            else_=0,
+        )
+        for column in sorted(columns)
+    }
+    return (
+        update(UserTable)
+        .where(UserTable.id.in_(changes))
+        # Counters are not profile edits, keep ``update_at`` as it is.
+        .values({**values, "update_at": UserTable.update_at})
+        .execution_options(synchronize_session=False)
+    )
 
-    return wrapper
 
+def _keyset(
+    stmt: Select, columns: tuple, after: tuple[datetime, UUID] | None
+) -> Select:
+    """Order by ``columns`` and start right after the ``after`` key."""
+    if after is not None:
+        stmt = stmt.where(tuple_(*columns) > tuple_(*after))
+    return stmt.order_by(*columns)
 
-@asynccontextmanager
-async def _get_async_session():
-    async with get_async_session_context() as session:
-        yield session
 
+# Read endpoints select plain columns: rows validate straight into
+# ``UserRead`` without building, tracking and expiring ORM objects.
+_user_columns = tuple(
+    getattr(UserTable, name) for name in UserRead.model_fields
+)
 
-@asynccontextmanager
-async def _get_user_manager(self):
-    session = _get_async_session()
-    async with (
-        get_user_db_context(session) as user_db,
-        get_user_manager_context(user_db) as user_manager,
-    ):
-        yield user_manager
+
+_summary_columns = tuple(
+    getattr(UserTable, name) for name in ProfileSummary.model_fields
+)
+
+
+def _page(rows: Sequence[Row], limit: int) -> UserPage:
+    """Page of rows ending in a ``key`` column, the first cursor field."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].key, rows[-1].id)
+    return UserPage(
+        items=user_list.validate_python(rows, from_attributes=True),
+        next_cursor=next_cursor,
+    )
+
+
+async def _stream(
+    session: AsyncSession, stmt: Select
+) -> AsyncIterator[list[UserRead]]:
+    """Read ``stmt`` through a server-side cursor, one batch at a time."""
+    res = await session.stream(
+        stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    async for rows in res.partitions():
+        yield user_list.validate_python(rows, from_attributes=True)
 
 
 class AbstractRepository(ABC):
@@ -57,80 +145,588 @@ class AbstractRepository(ABC):
 
 
 class UserRepository(AbstractRepository):
-    async def get_by_id(self, user_id: UUID):
-        try:
-            async with get_user_manager() as user_manager:
-                user = await user_manager.get(user_id)
-                print(f"User {user}")
-        except UserNotExists:
-            print(f"User {user_id} does not exist")
-
-    @async_start
-    async def get_by_email(self, email: str):
-        try:
-            async with get_user_manager() as user_manager:
-                user = await user_manager.get_by_email(email)
-                print(f"User {user}")
-        except UserNotExists:
-            print(f"User {email} does not exist")
-
-    @async_start
-    async def add(
+    """Accounts read and written through one session.
+
+    Nothing here commits: the caller, usually a ``UnitOfWork``, decides
+    when the transaction ends, so several calls can share it.
+    """
+
+    def __init__(
         self,
-        first_name: str,
-        last_name: str,
-        email: str,
-        password: str,
-        is_superuser: bool = False,
+        session: AsyncSession,
+        hasher: AsyncPasswordHelper = async_password_helper,
     ):
-        try:
-            async with get_user_manager() as user_manager:
-                user = await user_manager.create(
-                    UserCreate(
-                        first_name=first_name,
-                        last_name=last_name,
-                        email=email,
-                        password=password,
-                        is_superuser=is_superuser,
-                    )
+        self.session = session
+        self.hasher = hasher
+
+    async def get_by_id(self, user_id: UUID) -> UserTable:
+        user = await self.session.get(UserTable, user_id)
+        if user is None:
+            raise UserNotExists(f"User with {user_id=} does not exist")
+        return user
+
+    async def get_by_email(self, email: str) -> UserTable:
+        stmt = select(UserTable).where(
+            func.lower(UserTable.email) == func.lower(email)
+        )
+        user = await self.session.scalar(stmt)
+        if user is None:
+            raise UserNotExists(f"User with {email=} does not exist")
+        return user
+
+    async def get_many(self, user_ids: Iterable[UUID]) -> list[UserTable]:
+        """Users of ``user_ids`` in one query, missing ids are skipped."""
+        stmt = select(UserTable).where(UserTable.id.in_(set(user_ids)))
+        return list(await self.session.scalars(stmt))
+
+    async def summaries(
+        self, user_ids: Iterable[UUID]
+    ) -> list[ProfileSummary]:
+        """Profile cards of ``user_ids``, missing ids are skipped."""
+        stmt = select(*_summary_columns).where(UserTable.id.in_(set(user_ids)))
+        res = await self.session.execute(stmt)
+        return summary_list.validate_python(res.all(), from_attributes=True)
+
+    async def add(self, user: UserCreate) -> UserTable:
+        created = await self.add_many([user])
+        if not created:
+            raise UserAlreadyExists(f"User with {user.email=} already exists")
+        return created[0]
+
+    async def add_many(self, users: Sequence[UserCreate]) -> list[UserTable]:
+        """Create ``users`` with one INSERT, skipping taken emails.
+
+        Passwords are hashed concurrently, at most ``max_pending`` of
+        the hasher at a time. Returns the users actually created.
+        """
+        hashes: list[str] = []
+        step = self.hasher.max_pending
+        for i in range(0, len(users), step):
+            hashes += await asyncio.gather(
+                *(
+                    self.hasher.hash(user.password)
+                    for user in users[i : i + step]
                 )
-                print(f"User created {user}")
-        except UserAlreadyExists:
-            print(f"User {email} already exists")
-
-    @async_start
-    async def list(self):
-        stmt = select(UserTable)
-        async with _get_async_session() as session:
-            res = await session.execute(stmt)
-        return [
-            UserRead.model_validate(user, from_attributes=True)
-            for user in res.scalars().all()
+            )
+        values = [
+            {
+                **user.create_update_dict_superuser(),
+                "id": uuid4(),
+                "hashed_password": hashed,
+            }
+            for user, hashed in zip(users, hashes, strict=True)
         ]
+        for value in values:
+            del value["password"]
+        if not values:
+            return []
+        stmt = (
+            insert(UserTable)
+            .on_conflict_do_nothing(index_elements=[UserTable.email])
+            .returning(UserTable)
+        )
+        created = list(await self.session.scalars(stmt, values))
+        for user in created:
+            add_event(
+                self.session,
+                Topic.USER_REGISTERED,
+                user_id=user.id,
+                email=user.email,
+            )
+        logger.info("Users created", extra={"count": len(created)})
+        return created
+
+    async def list(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None
+    ) -> UserPage:
+        after = decode_cursor(cursor) if cursor else None
+        return await UserReadRepository(self.session).list(limit, after)
+
+    async def import_users(self, path: str) -> dict[str, int]:
+        """Bulk insert the accounts of a CSV or NDJSON file.
+
+        COPY runs on connections of its own, outside this session.
+        """
+        return await bulk.import_users(Path(path))
+
+    async def export_users(self, path: str) -> int:
+        return await bulk.export_users(Path(path))
+
+
+class UserReadRepository:
+    """Keyset-paginated listing of users ordered by (created_at, id)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _list_stmt(self, after: tuple[datetime, UUID] | None) -> Select:
+        return _keyset(
+            select(*_user_columns, UserTable.created_at.label("key")),
+            (UserTable.created_at, UserTable.id),
+            after,
+        )
+
+    def stream(
+        self, after: tuple[datetime, UUID] | None = None
+    ) -> AsyncIterator[list[UserRead]]:
+        return _stream(self.session, self._list_stmt(after))
+
+    async def list(
+        self, limit: int, after: tuple[datetime, UUID] | None = None
+    ) -> UserPage:
+        res = await self.session.execute(
+            self._list_stmt(after).limit(limit + 1)
+        )
+        return _page(res.all(), limit)
+
+    async def search(
+        self,
+        user_id: UUID,
+        query: str,
+        friend_ids: Sequence[UUID],
+        limit: int,
+        after: tuple[int, float, UUID] | None = None,
+    ) -> UserPage:
+        """Users whose name or email is word-similar to ``query``.
+
+        Friends come first, then friends of friends, then everyone
+        else, each tier nearest first. The last tier is read off the
+        trigram index in distance order, so a page costs ``limit``
+        index probes however many users match.
+        """
+        distance = literal(query).op("<<->", return_type=Double)(
+            user_search_text
+        )
+        matches = literal(query).op("<%", is_comparison=True)(user_search_text)
+        known = [*friend_ids, user_id]
+        friend_of_friend = exists().where(
+            FriendTable.friend_id == UserTable.id,
+            FriendTable.user_id.in_(friend_ids),
+        )
+        tiers = [
+            UserTable.id.in_(friend_ids),
+            and_(UserTable.id.not_in(known), friend_of_friend),
+            and_(UserTable.id.not_in(known), ~friend_of_friend),
+        ]
+        if not friend_ids:
+            tiers[2] = UserTable.id != user_id
+        start = after[0] if after else 0
+
+        rows: list[tuple[int, Row]] = []
+        for tier in range(start, len(tiers)):
+            if tier < 2 and not friend_ids:
+                continue
+            stmt = (
+                select(*_user_columns, cast(distance, Double).label("key"))
+                .where(matches, tiers[tier])
+                .order_by(distance, UserTable.id)
+                .limit(limit + 1 - len(rows))
+            )
+            if after and tier == start:
+                stmt = stmt.where(
+                    tuple_(cast(distance, Double), UserTable.id)
+                    > tuple_(*after[1:])
+                )
+            res = await self.session.execute(stmt)
+            rows.extend((tier, row) for row in res)
+            if len(rows) > limit:
+                break
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            tier, row = rows[-1]
+            next_cursor = encode_search_cursor(tier, row.key, row.id)
+        return UserPage(
+            items=user_list.validate_python(
+                [row for _, row in rows], from_attributes=True
+            ),
+            next_cursor=next_cursor,
+        )
 
 
 class FakeUserRepository(AbstractRepository):
-    def __init__(self, list_user: list[User]):
-        self.list_user = list_user
+    """In-memory repository indexed by id and by email."""
+
+    def __init__(self, list_user: Iterable[User] = ()):
+        self._by_id: dict[UUID, User] = {}
+        self._by_email: dict[str, User] = {}
+        self.add_many(list_user)
 
     def get_by_id(self, user_id: UUID) -> User | None:
-        for user in self.list_user:
-            if user.id == user_id:
-                return user
-        print(f"User {user_id=} does not exist")
-        raise UserNotExists(f"User with {user_id=} does not exist")
+        user = self._by_id.get(user_id)
+        if user is None:
+            raise UserNotExists(f"User with {user_id=} does not exist")
+        return user
 
     def get_by_email(self, email: str) -> User | None:
-        for user in self.list_user:
-            if user.email == email:
-                return user
-        raise UserNotExists(f"User with {email=} does not exist")
+        user = self._by_email.get(email)
+        if user is None:
+            raise UserNotExists(f"User with {email=} does not exist")
+        return user
 
     def add(self, user: User):
-        if user.email not in [user.email for user in self.list_user]:
-            self.list_user.append(user)
-        else:
+        if user.email in self._by_email:
             raise UserAlreadyExists(f"User with {user.email=} already exists")
+        self._by_email[user.email] = user
+        self._by_id[user.id] = user
+
+    def add_many(self, users: Iterable[User]) -> None:
+        """Add all ``users``, or none of them if an email is taken."""
+        by_email = {}
+        for user in users:
+            if user.email in by_email or user.email in self._by_email:
+                raise UserAlreadyExists(
+                    f"User with {user.email=} already exists"
+                )
+            by_email[user.email] = user
+        self._by_email.update(by_email)
+        self._by_id.update((user.id, user) for user in by_email.values())
 
     def list(self):
-        return self.list_user
+        return list(self._by_id.values())
+
+
+class AbstractFriendRepository(ABC):
+    @abstractmethod
+    async def are_friends(self, user_id: UUID, other_id: UUID) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_incoming(self, user_id: UUID) -> list[FriendRequest]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_outgoing(self, user_id: UUID) -> list[FriendRequest]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def send_request(
+        self, sender_id: UUID, receiver_id: UUID, msg: str | None = None
+    ) -> FriendRequest:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def accept_request(
+        self, sender_id: UUID, receiver_id: UUID
+    ) -> FriendRequest:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reject_request(
+        self, sender_id: UUID, receiver_id: UUID
+    ) -> FriendRequest:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def remove_friend(self, user_id: UUID, friend_id: UUID) -> None:
+        raise NotImplementedError
+
+
+class FriendRepository(AbstractFriendRepository):
+    """Friend graph stored in the ``friend`` / ``friend_request`` tables.
+
+    Every lookup is answered by a primary key or the reverse index, and
+    every write is a single statement. Writes are left for the caller to
+    commit, so they join its unit of work. Listings go to
+    ``read_session``, which may be bound to a replica.
+    """
+
+    def __init__(
+        self, session: AsyncSession, read_session: AsyncSession | None = None
+    ):
+        self.session = session
+        self.read_session = read_session or session
+
+    def _friends_stmt(
+        self, user_id: UUID, after: tuple[datetime, UUID] | None
+    ) -> Select:
+        stmt = (
+            select(*_user_columns, FriendTable.created_at.label("key"))
+            .join(FriendTable, FriendTable.friend_id == UserTable.id)
+            .where(FriendTable.user_id == user_id)
+        )
+        return _keyset(
+            stmt, (FriendTable.created_at, FriendTable.friend_id), after
+        )
+
+    async def list_friends(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage:
+        """Friends of ``user_id`` in the order the friendships were made."""
+        stmt = self._friends_stmt(user_id, after).limit(limit + 1)
+        res = await self.read_session.execute(stmt)
+        return _page(res.all(), limit)
+
+    def stream_friends(
+        self, user_id: UUID, after: tuple[datetime, UUID] | None = None
+    ) -> AsyncIterator[list[UserRead]]:
+        return _stream(self.read_session, self._friends_stmt(user_id, after))
+
+    async def friend_ids(self, user_id: UUID) -> list[UUID]:
+        """Friend ids ordered by id, read from the primary key alone.
+
+        Always read from the primary: the result is cached right after
+        the graph changes and a lagging replica would pin a stale list.
+        """
+        stmt = (
+            select(FriendTable.friend_id)
+            .where(FriendTable.user_id == user_id)
+            .order_by(FriendTable.friend_id)
+        )
+        return list(await self.session.scalars(stmt))
+
+    async def suggest(
+        self, user_id: UUID, limit: int, fanout: int
+    ) -> list[tuple[UUID, int]]:
+        """Friends of friends with their exact mutual friend counts.
+
+        Candidates are picked among the friends of the ``fanout`` newest
+        friends, their mutual friends are then counted over every friend
+        of both users.
+        """
+        direct = (
+            select(FriendTable.friend_id)
+            .where(FriendTable.user_id == user_id)
+            .order_by(FriendTable.created_at.desc())
+            .limit(fanout)
+            .cte("direct")
+        )
+        fof = aliased(FriendTable)
+        candidates = (
+            select(fof.friend_id.label("id"))
+            .select_from(direct)
+            .join(fof, fof.user_id == direct.c.friend_id)
+            .where(
+                fof.friend_id != user_id,
+                ~exists().where(
+                    FriendTable.user_id == user_id,
+                    FriendTable.friend_id == fof.friend_id,
+                ),
+            )
+            .group_by(fof.friend_id)
+            .order_by(func.count().desc(), fof.friend_id)
+            .limit(limit)
+            .cte("candidates")
+        )
+        theirs = aliased(FriendTable)
+        mutual = (
+            select(func.count())
+            .select_from(FriendTable)
+            .join(
+                theirs,
+                and_(
+                    theirs.user_id == candidates.c.id,
+                    theirs.friend_id == FriendTable.friend_id,
+                ),
+            )
+            .where(FriendTable.user_id == user_id)
+            .scalar_subquery()
+            .label("mutual")
+        )
+        stmt = select(candidates.c.id, mutual).order_by(
+            mutual.desc(), candidates.c.id
+        )
+        res = await self.read_session.execute(stmt)
+        return [tuple(row) for row in res]
+
+    async def are_friends(self, user_id: UUID, other_id: UUID) -> bool:
+        stmt = select(
+            exists().where(
+                FriendTable.user_id == user_id,
+                FriendTable.friend_id == other_id,
+            )
+        )
+        return bool(await self.session.scalar(stmt))
+
+    async def list_incoming(self, user_id: UUID) -> list[FriendRequest]:
+        stmt = select(FriendRequestTable).where(
+            FriendRequestTable.receiver_id == user_id
+        )
+        res = await self.read_session.scalars(stmt)
+        return [FriendRequest.model_validate(row) for row in res]
+
+    async def list_outgoing(self, user_id: UUID) -> list[FriendRequest]:
+        stmt = select(FriendRequestTable).where(
+            FriendRequestTable.sender_id == user_id
+        )
+        res = await self.read_session.scalars(stmt)
+        return [FriendRequest.model_validate(row) for row in res]
+
+    async def send_request(
+        self, sender_id: UUID, receiver_id: UUID, msg: str | None = None
+    ) -> FriendRequest:
+        """Send a request, or accept the one going the other way.
+
+        Raises ``NotFound`` when the receiver does not exist.
+        """
+        if sender_id == receiver_id:
+            raise AccessDenied("You can not send a friend request to yourself")
+        if await self.are_friends(sender_id, receiver_id):
+            raise AlreadyFriend(f"User {receiver_id=} already in friend list")
+        try:
+            return await self.accept_request(receiver_id, sender_id)
+        except NotFound:
+            pass
+        # Checked first, the foreign key would fail the whole transaction.
+        receiver = select(exists().where(UserTable.id == receiver_id))
+        if not await self.session.scalar(receiver):
+            raise NotFound(f"User {receiver_id=} does not exist")
+
+        stmt = (
+            insert(FriendRequestTable)
+            .values(sender_id=sender_id, receiver_id=receiver_id, msg=msg)
+            .on_conflict_do_nothing()
+            .returning(FriendRequestTable)
+        )
+        row = await self.session.scalar(stmt)
+        if row is None:
+            raise AlreadySentRequest("You have already sent a friend request")
+        await self.session.execute(
+            _counters(
+                {
+                    sender_id: {"outgoing_request_count": 1},
+                    receiver_id: {"incoming_request_count": 1},
+                }
+            )
+        )
+        add_event(
+            self.session,
+            Topic.FRIEND_REQUESTED,
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+            msg=msg,
+        )
+        return FriendRequest.model_validate(row)
+
+    async def accept_request(
+        self, sender_id: UUID, receiver_id: UUID
+    ) -> FriendRequest:
+        """Move a pending request into the friend table in one statement."""
+        accepted = (
+            delete(FriendRequestTable)
+            .where(
+                FriendRequestTable.sender_id == sender_id,
+                FriendRequestTable.receiver_id == receiver_id,
+            )
+            .returning(
+                FriendRequestTable.sender_id,
+                FriendRequestTable.receiver_id,
+                FriendRequestTable.msg,
+            )
+            .cte("accepted")
+        )
+        edges = union_all(
+            select(accepted.c.sender_id, accepted.c.receiver_id),
+            select(accepted.c.receiver_id, accepted.c.sender_id),
+        )
+        inserted = (
+            insert(FriendTable)
+            .from_select(["user_id", "friend_id"], edges)
+            .on_conflict_do_nothing()
+            .cte("inserted")
+        )
+        stmt = select(accepted).add_cte(inserted)
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            raise NotFound(f"Request from {sender_id=} not found")
+        await self.session.execute(
+            _counters(
+                {
+                    sender_id: {
+                        "outgoing_request_count": -1,
+                        "friend_count": 1,
+                    },
+                    receiver_id: {
+                        "incoming_request_count": -1,
+                        "friend_count": 1,
+                    },
+                }
+            )
+        )
+        add_event(
+            self.session,
+            Topic.FRIEND_ACCEPTED,
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+        )
+        return FriendRequest.model_validate(row)
+
+    async def reject_request(
+        self, sender_id: UUID, receiver_id: UUID
+    ) -> FriendRequest:
+        stmt = (
+            delete(FriendRequestTable)
+            .where(
+                FriendRequestTable.sender_id == sender_id,
+                FriendRequestTable.receiver_id == receiver_id,
+            )
+            .returning(FriendRequestTable)
+        )
+        row = await self.session.scalar(stmt)
+        if row is None:
+            raise NotFound(f"Request from {sender_id=} not found")
+        await self.session.execute(
+            _counters(
+                {
+                    sender_id: {"outgoing_request_count": -1},
+                    receiver_id: {"incoming_request_count": -1},
+                }
+            )
+        )
+        add_event(
+            self.session,
+            Topic.FRIEND_REJECTED,
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+        )
+        return FriendRequest.model_validate(row)
+
+    async def remove_friend(self, user_id: UUID, friend_id: UUID) -> None:
+        """Drop both edges, the former friend keeps a pending request."""
+        removed = (
+            delete(FriendTable)
+            .where(
+                tuple_(FriendTable.user_id, FriendTable.friend_id).in_(
+                    [(user_id, friend_id), (friend_id, user_id)]
+                )
+            )
+            .returning(FriendTable.user_id, FriendTable.friend_id)
+            .cte("removed")
+        )
+        stmt = (
+            insert(FriendRequestTable)
+            .from_select(
+                ["sender_id", "receiver_id"],
+                select(removed.c.friend_id, removed.c.user_id).where(
+                    removed.c.user_id == user_id
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(FriendRequestTable.sender_id)
+        )
+        if await self.session.scalar(stmt) is None:
+            raise NotFound(f"User {friend_id=} not in friend list")
+        await self.session.execute(
+            _counters(
+                {
+                    user_id: {
+                        "friend_count": -1,
+                        "incoming_request_count": 1,
+                    },
+                    friend_id: {
+                        "friend_count": -1,
+                        "outgoing_request_count": 1,
+                    },
+                }
+            )
+        )
+        add_event(
+            self.session,
+            Topic.FRIEND_REMOVED,
+            user_id=user_id,
+            friend_id=friend_id,
+        )
@@ -1,10 +1,361 @@
-from fastapi import APIRouter
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from uuid import UUID
 
-from src.auth.dependencies import fastapi_users
-from src.auth.schema import UserRead, UserUpdate
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.cache import get_user_cache
+from src.auth.dependencies import current_active_user, fastapi_users
+from src.auth.schema import StoredUserRead, UserRead, UserUpdate
+from src.database import async_read_session_maker
+from src.models import User
+from src.notification.constant import NotificationType
+from src.notification.schema import Notification
+from src.notification.service import publish
+from src.user.constant import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    SEARCH_MAX_LENGTH,
+    SEARCH_MIN_LENGTH,
+    SUGGESTIONS_LIMIT,
+    ErrorCode,
+)
+from src.user.dependencies import (
+    get_friend_graph,
+    get_friend_repository,
+    get_profile_cache,
+    get_unit_of_work,
+    get_user_read_repository,
+    get_user_search,
+)
+from src.user.exception import (
+    AccessDenied,
+    AlreadyFriend,
+    AlreadySentRequest,
+    InvalidCursor,
+    NotFound,
+)
+from src.user.graph import FriendGraph
+from src.user.profile import ProfileCache
+from src.user.repositry import FriendRepository, UserReadRepository
+from src.user.schema import (
+    FriendRequest,
+    FriendRequestCreate,
+    MutualFriends,
+    ProfileSummary,
+    Suggestion,
+    UserPage,
+)
+from src.user.search import UserSearch
+from src.user.unit_of_work import UnitOfWork
+from src.user.util import decode_cursor
 
 router = APIRouter()
 
+
+def _after(cursor: str | None) -> tuple[datetime, UUID] | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorCode.INVALID_CURSOR,
+        ) from exc
+
+
+def _ndjson(
+    batches: Callable[[AsyncSession], AsyncIterator[list[UserRead]]],
+) -> StreamingResponse:
+    # The stream outlives the request scoped session, so it opens its own.
+    async def content():
+        async with async_read_session_maker() as session:
+            async for batch in batches(session):
+                yield "".join(user.model_dump_json() + "\n" for user in batch)
+
+    return StreamingResponse(content(), media_type="application/x-ndjson")
+
+
+@router.get("", response_model=UserPage, name="users:list")
+async def list_users(
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    user: User = Depends(current_active_user),  # noqa: B008
+    repository: UserReadRepository = Depends(get_user_read_repository),  # noqa: B008
+):
+    after = _after(cursor)
+    if stream:
+        return _ndjson(
+            lambda session: UserReadRepository(session).stream(after)
+        )
+    return await repository.list(limit, after)
+
+
+@router.get("/search", response_model=UserPage, name="users:search")
+async def search_users(
+    q: str = Query(min_length=SEARCH_MIN_LENGTH, max_length=SEARCH_MAX_LENGTH),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user: User = Depends(current_active_user),  # noqa: B008
+    search: UserSearch = Depends(get_user_search),  # noqa: B008
+):
+    """Users whose name or email resembles ``q``.
+
+    Friends are listed first, then friends of friends, then everyone
+    else, each group most similar first.
+    """
+    try:
+        return await search.search(user.id, q, limit, cursor)
+    except InvalidCursor as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorCode.INVALID_CURSOR,
+        ) from exc
+
+
+# Included after the fixed paths above so "/{id}" does not shadow them.
 router.include_router(
-    fastapi_users.get_users_router(UserRead, UserUpdate),
+    fastapi_users.get_users_router(StoredUserRead, UserUpdate),
+)
+
+
+@router.get(
+    "/{user_id}/profile", response_model=ProfileSummary, name="users:profile"
+)
+async def profile(
+    user_id: UUID,
+    user: User = Depends(current_active_user),  # noqa: B008
+    profiles: ProfileCache = Depends(get_profile_cache),  # noqa: B008
+):
+    """Name and friend counters of a user, from one cache lookup."""
+    try:
+        card = await profiles.get(user_id)
+    except NotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorCode.USER_NOT_FOUND,
+        ) from exc
+    # Cached as JSON already, sent as is.
+    return Response(card, media_type="application/json")
+
+
+@router.get("/{user_id}/friends", response_model=UserPage, name="friend:list")
+async def list_friends(
+    user_id: UUID,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    user: User = Depends(current_active_user),  # noqa: B008
+    repository: FriendRepository = Depends(get_friend_repository),  # noqa: B008
+):
+    after = _after(cursor)
+    if stream:
+        return _ndjson(
+            lambda session: FriendRepository(session).stream_friends(
+                user_id, after
+            )
+        )
+    return await repository.list_friends(user_id, limit, after)
+
+
+@router.get(
+    "/me/requests",
+    response_model=list[FriendRequest],
+    name="friend:incoming-requests",
+)
+async def incoming_requests(
+    user: User = Depends(current_active_user),  # noqa: B008
+    repository: FriendRepository = Depends(get_friend_repository),  # noqa: B008
+):
+    return await repository.list_incoming(user.id)
+
+
+@router.get(
+    "/me/requests/sent",
+    response_model=list[FriendRequest],
+    name="friend:outgoing-requests",
+)
+async def outgoing_requests(
+    user: User = Depends(current_active_user),  # noqa: B008
+    repository: FriendRepository = Depends(get_friend_repository),  # noqa: B008
+):
+    return await repository.list_outgoing(user.id)
+
+
+@router.post(
+    "/{user_id}/friend-request",
+    response_model=FriendRequest,
+    status_code=status.HTTP_201_CREATED,
+    name="friend:send-request",
+)
+async def send_friend_request(
+    user_id: UUID,
+    body: FriendRequestCreate | None = None,
+    user: User = Depends(current_active_user),  # noqa: B008
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+    profiles: ProfileCache = Depends(get_profile_cache),  # noqa: B008
+):
+    try:
+        request = await uow.friends.send_request(
+            user.id, user_id, body.msg if body else None
+        )
+    except AccessDenied as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorCode.FRIEND_REQUEST_TO_SELF,
+        ) from exc
+    except AlreadyFriend as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorCode.FRIEND_ALREADY_FRIEND,
+        ) from exc
+    except AlreadySentRequest as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorCode.FRIEND_REQUEST_ALREADY_SENT,
+        ) from exc
+    except NotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorCode.USER_NOT_FOUND,
+        ) from exc
+    # Commit before touching caches, a refill must see the new edge.
+    await uow.commit()
+    await profiles.invalidate(user.id, user_id)
+    await get_user_cache().invalidate(user.id, user_id)
+    # A pending request the other way was accepted instead.
+    if request.sender_id == user_id:
+        await graph.edge_changed(user.id, user_id)
+        notification = Notification(
+            type=NotificationType.FRIEND_ACCEPT, user_id=user.id
+        )
+    else:
+        notification = Notification(
+            type=NotificationType.FRIEND_REQUEST,
+            user_id=user.id,
+            msg=request.msg,
+        )
+    await publish([user_id], notification)
+    return request
+
+
+@router.post(
+    "/me/requests/{sender_id}/accept",
+    response_model=FriendRequest,
+    name="friend:accept-request",
+)
+async def accept_friend_request(
+    sender_id: UUID,
+    user: User = Depends(current_active_user),  # noqa: B008
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+    profiles: ProfileCache = Depends(get_profile_cache),  # noqa: B008
+):
+    try:
+        request = await uow.friends.accept_request(sender_id, user.id)
+    except NotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorCode.FRIEND_REQUEST_NOT_FOUND,
+        ) from exc
+    await uow.commit()
+    await profiles.invalidate(user.id, sender_id)
+    await get_user_cache().invalidate(user.id, sender_id)
+    await graph.edge_changed(user.id, sender_id)
+    await publish(
+        [sender_id],
+        Notification(type=NotificationType.FRIEND_ACCEPT, user_id=user.id),
+    )
+    return request
+
+
+@router.delete(
+    "/me/requests/{sender_id}",
+    response_model=FriendRequest,
+    name="friend:reject-request",
+)
+async def reject_friend_request(
+    sender_id: UUID,
+    user: User = Depends(current_active_user),  # noqa: B008
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+    profiles: ProfileCache = Depends(get_profile_cache),  # noqa: B008
+):
+    try:
+        request = await uow.friends.reject_request(sender_id, user.id)
+    except NotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorCode.FRIEND_REQUEST_NOT_FOUND,
+        ) from exc
+    await uow.commit()
+    await profiles.invalidate(user.id, sender_id)
+    await get_user_cache().invalidate(user.id, sender_id)
+    return request
+
+
+@router.delete(
+    "/me/friends/{friend_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    name="friend:remove",
+)
+async def remove_friend(
+    friend_id: UUID,
+    user: User = Depends(current_active_user),  # noqa: B008
+    uow: UnitOfWork = Depends(get_unit_of_work),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+    profiles: ProfileCache = Depends(get_profile_cache),  # noqa: B008
+):
+    try:
+        await uow.friends.remove_friend(user.id, friend_id)
+    except NotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorCode.FRIEND_NOT_FOUND,
+        ) from exc
+    await uow.commit()
+    await profiles.invalidate(user.id, friend_id)
+    await get_user_cache().invalidate(user.id, friend_id)
+    await graph.edge_changed(user.id, friend_id)
+    await publish(
+        [friend_id],
+        Notification(type=NotificationType.FRIEND_REMOVE, user_id=user.id),
+    )
+
+
+@router.get(
+    "/{user_id}/mutual/{other_id}",
+    response_model=MutualFriends,
+    name="friend:mutual",
+)
+async def mutual_friends(
+    user_id: UUID,
+    other_id: UUID,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=0, le=MAX_PAGE_SIZE),
+    user: User = Depends(current_active_user),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+):
+    return await graph.mutual(user_id, other_id, limit)
+
+
+@router.get(
+    "/{user_id}/suggestions",
+    response_model=list[Suggestion],
+    name="friend:suggestions",
 )
+async def friend_suggestions(
+    user_id: UUID,
+    limit: int = Query(SUGGESTIONS_LIMIT, ge=1, le=SUGGESTIONS_LIMIT),
+    user: User = Depends(current_active_user),  # noqa: B008
+    graph: FriendGraph = Depends(get_friend_graph),  # noqa: B008
+):
+    if user_id != user.id and not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ErrorCode.ACCESS_DENIED,
+        )
+    return await graph.suggestions(user_id, limit)
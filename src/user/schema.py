@@ -1,6 +1,22 @@
+from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    TypeAdapter,
+    model_validator,
+)
+
+from src.auth.schema import (
+    StoredUserRead,
+    UserRead,
+    first_name,
+    last_name,
+)
+from src.auth.schema import password as plain_password
 
 
 class FriendRequest(BaseModel):
@@ -8,4 +24,66 @@ class FriendRequest(BaseModel):
     receiver_id: UUID
     msg: str | None = None
 
-    model_config = ConfigDict(frozen=True)
+    model_config = ConfigDict(frozen=True, from_attributes=True)
+
+
+class FriendRequestCreate(BaseModel):
+    msg: str | None = Field(default=None, max_length=255)
+
+
+class UserPage(BaseModel):
+    items: list[UserRead]
+    next_cursor: str | None = None
+
+
+# Validates a whole batch of rows in a single pydantic-core call.
+user_list = TypeAdapter(list[StoredUserRead])
+
+
+class ProfileSummary(BaseModel):
+    """What a profile card shows, cached as one Redis value per user."""
+
+    id: UUID
+    first_name: str
+    last_name: str
+    friend_count: int
+    incoming_request_count: int
+    outgoing_request_count: int
+
+
+summary_list = TypeAdapter(list[ProfileSummary])
+
+
+class MutualFriends(BaseModel):
+    count: int
+    ids: list[UUID]
+
+
+class Suggestion(BaseModel):
+    user_id: UUID
+    mutual_count: int
+
+
+class UserImport(BaseModel):
+    """One account of a bulk import.
+
+    Either a plain ``password`` or an already computed ``hashed_password``
+    (as written by the export) must be given.
+    """
+
+    id: UUID | None = None
+    email: EmailStr
+    password: plain_password | None = None
+    hashed_password: str | None = None
+    first_name: first_name
+    last_name: last_name
+    is_active: bool = True
+    is_superuser: bool = False
+    is_verified: bool = False
+    created_at: datetime | None = None
+
+    @model_validator(mode="after")
+    def check_password(self) -> "UserImport":
+        if self.password is None and self.hashed_password is None:
+            raise ValueError("password or hashed_password is required")
+        return self
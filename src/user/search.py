@@ -0,0 +1,47 @@
+from uuid import UUID
+
+from src.cache import LRUCache
+from src.user.constant import SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+from src.user.graph import FriendGraph
+from src.user.repositry import UserReadRepository
+from src.user.schema import UserPage
+from src.user.util import decode_search_cursor
+
+
+class UserSearch:
+    """Typeahead search over users, ranked by closeness to the searcher.
+
+    Pages are cached in process for a short time keyed by the searcher,
+    so retyping or paging back does not reach the database.
+    """
+
+    def __init__(
+        self,
+        repository: UserReadRepository,
+        graph: FriendGraph,
+        cache: LRUCache,
+    ):
+        self.repository = repository
+        self.graph = graph
+        self.cache = cache
+
+    async def search(
+        self, user_id: UUID, query: str, limit: int, cursor: str | None
+    ) -> UserPage:
+        query = " ".join(query.lower().split())
+        key = (user_id, query, limit, cursor)
+        page = self.cache.get(key)
+        if page is None:
+            after = decode_search_cursor(cursor) if cursor else None
+            page = await self.repository.search(
+                user_id,
+                query,
+                await self.graph.friend_ids(user_id),
+                limit,
+                after,
+            )
+            self.cache.set(key, page)
+        return page
+
+
+search_cache = LRUCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
@@ -13,23 +13,55 @@ from src.user.exception import (
 from src.user.schema import FriendRequest
 
 
+def _get(requests: dict | None, user_id: UUID) -> FriendRequest | None:
+    return requests.get(user_id) if requests else None
+
+
+def _pop(requests: dict | None, user_id: UUID) -> FriendRequest | None:
+    return requests.pop(user_id, None) if requests else None
+
+
 class User:
+    """A user and its friends, kept in memory for tests and simulations.
+
+    Friend and request containers are created on first write, so users
+    that never interacted with anyone stay a single small object. Pass
+    ``validate=False`` for synthetic data that is known to be valid.
+    """
+
+    __slots__ = (
+        "id",
+        "first_name",
+        "last_name",
+        "email",
+        "_friend",
+        "_sent",
+        "_received",
+    )
+
     def __init__(
-        self, id: UUID, first_name: str, last_name: str, email: EmailStr
+        self,
+        id: UUID,
+        first_name: str,
+        last_name: str,
+        email: EmailStr,
+        validate: bool = True,
     ):
-        UserRead(
-            id=id,
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            created_at=datetime.now(),
-        )
+        if validate:
+            UserRead(
+                id=id,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                created_at=datetime.now(),
+            )
         self.id = id
         self.first_name = first_name
         self.last_name = last_name
         self.email = email
-        self._friend: set[User | None] = set()
-        self._request: set[FriendRequest] = set()
+        self._friend: set[User] | None = None
+        self._sent: dict[UUID, FriendRequest] | None = None
+        self._received: dict[UUID, FriendRequest] | None = None
 
     def __eq__(self, other):
         if not isinstance(other, User):
@@ -39,12 +71,19 @@ class User:
     def __hash__(self) -> int:
         return hash(self.id)
 
+    def _is_friend(self, user: "User") -> bool:
+        return self._friend is not None and user in self._friend
+
     def _add_friend(self, user: "User"):
+        if self._friend is None:
+            self._friend = set()
+        if user._friend is None:
+            user._friend = set()
         self._friend.add(user)
         user._friend.add(self)
 
     def remove_from_friend(self, user: "User") -> Union["User", None]:
-        if user in self._friend:
+        if self._is_friend(user):
             self._friend.remove(user)
             user._friend.remove(self)
             user.send_friendrequest(self)
@@ -54,52 +93,48 @@ class User:
     def send_friendrequest(
         self, user: "User", msg: str | None = None
     ) -> FriendRequest | None:
-        if user in self._friend:
+        if self._is_friend(user):
             raise AlreadyFriend(f"User {user=} already in friend list")
-        request = FriendRequest(
-            sender_id=self.id, receiver_id=user.id, msg=msg
-        )
-
-        if request in self.send_request:
+        if _get(self._sent, user.id) is not None:
             raise AlreadySentRequest("You have already sent a friend request")
-        accept_request = FriendRequest(
-            sender_id=user.id, receiver_id=self.id, msg=msg
-        )
 
-        if accept_request in self.receive_request:
-            self._request.remove(accept_request)
+        accept_request = _pop(self._received, user.id)
+        if accept_request is not None:
+            _pop(user._sent, self.id)
             self._add_friend(user)
             return accept_request
-        self._request.add(request)
-        user._request.add(request)
+        request = FriendRequest(
+            sender_id=self.id, receiver_id=user.id, msg=msg
+        )
+        if self._sent is None:
+            self._sent = {}
+        if user._received is None:
+            user._received = {}
+        self._sent[user.id] = request
+        user._received[self.id] = request
         return request
 
     def reject_friendrequest(self, user: "User") -> FriendRequest | None:
-        request = self.get_request(user)
-        if request in self._request:
-            self._request.remove(request)
-            user._request.remove(request)
+        request = _pop(self._received, user.id)
+        if request is not None:
+            _pop(user._sent, self.id)
+            return request
+        request = _pop(self._sent, user.id)
+        if request is not None:
+            _pop(user._received, self.id)
             return request
         raise NotFound(f"Request from {user=} not found")
 
     def get_request(self, user: "User") -> FriendRequest | None:
-        for request in self._request:
-            if request.receiver_id == user.id or request.sender_id == user.id:
-                return request
+        request = _get(self._received, user.id) or _get(self._sent, user.id)
+        if request is not None:
+            return request
         raise NotFound(f"Request from {user=} not found")
 
     @property
     def send_request(self):
-        return [
-            request
-            for request in self._request
-            if request.sender_id == self.id
-        ]
+        return list(self._sent.values()) if self._sent else []
 
     @property
     def receive_request(self):
-        return [
-            request
-            for request in self._request
-            if request.receiver_id == self.id
-        ]
+        return list(self._received.values()) if self._received else []
@@ -0,0 +1,64 @@
+"""One session and transaction shared by the user repositories."""
+
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import async_read_session_maker, async_session_maker
+from src.user.repositry import (
+    FriendRepository,
+    UserReadRepository,
+    UserRepository,
+)
+
+
+class UnitOfWork:
+    """Repositories whose writes commit or roll back together.
+
+        async with UnitOfWork() as uow:
+            users = await uow.users.add_many(user_creates)
+            await uow.friends.send_request(users[0].id, users[1].id)
+            await uow.commit()
+
+    Whatever is not committed when the block exits is rolled back.
+    Listings go to a second session from ``read_session_maker``, which
+    may be bound to a replica; neither session takes a connection
+    before its first query.
+    """
+
+    session: AsyncSession
+    read_session: AsyncSession
+    users: UserRepository
+    friends: FriendRepository
+    reads: UserReadRepository
+
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncSession] = async_session_maker,
+        read_session_maker: Callable[
+            [], AsyncSession
+        ] = async_read_session_maker,
+    ):
+        self.session_maker = session_maker
+        self.read_session_maker = read_session_maker
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.session = self.session_maker()
+        self.read_session = self.read_session_maker()
+        self.users = UserRepository(self.session)
+        self.friends = FriendRepository(self.session, self.read_session)
+        self.reads = UserReadRepository(self.read_session)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Closing a session rolls back its open transaction.
+        try:
+            await self.session.close()
+        finally:
+            await self.read_session.close()
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
@@ -0,0 +1,77 @@
+import base64
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from uuid import UUID
+
+from src.user.exception import InvalidCursor
+
+UUID_SIZE = 16
+# Below this size ratio a linear merge beats binary searching.
+GALLOP_RATIO = 8
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError as exc:
+        raise InvalidCursor(f"Invalid cursor {cursor=}") from exc
+
+
+def encode_search_cursor(tier: int, distance: float, id: UUID) -> str:
+    raw = f"{tier}|{distance!r}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_search_cursor(cursor: str) -> tuple[int, float, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        tier, distance, id = raw.split("|")
+        return int(tier), float(distance), UUID(id)
+    except ValueError as exc:
+        raise InvalidCursor(f"Invalid cursor {cursor=}") from exc
+
+
+def pack_ids(ids: Iterable[UUID]) -> bytes:
+    """Pack ids into a sorted array of 16 byte big-endian UUIDs."""
+    return b"".join(sorted(id.bytes for id in ids))
+
+
+def unpack_ids(blob: bytes) -> list[bytes]:
+    return [blob[i : i + UUID_SIZE] for i in range(0, len(blob), UUID_SIZE)]
+
+
+def intersect_sorted(a: Sequence, b: Sequence) -> list:
+    """Intersection of two sorted sequences without duplicates."""
+    if len(a) > len(b):
+        a, b = b, a
+    res = []
+    if len(a) * GALLOP_RATIO < len(b):
+        lo = 0
+        for item in a:
+            lo = bisect_left(b, item, lo)
+            if lo == len(b):
+                break
+            if b[lo] == item:
+                res.append(item)
+                lo += 1
+        return res
+
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            res.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return res
@@ -0,0 +1,203 @@
+"""App-level fixtures.
+
+Redis is served in memory by fakeredis. The database is the one named
+by ``TEST_DATABASE_URL``, which is migrated and emptied between tests,
+or else a throwaway cluster started from the Postgres binaries found on
+``PATH`` or in ``PG_BIN``. Tests marked ``db`` are skipped when neither
+is available.
+
+Settings are read when ``src`` is imported, so the environment is set
+up here before anything imports the app.
+"""
+
+import os
+import subprocess
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack
+
+import pytest
+
+from benchmarks import standins
+
+os.environ.update(
+    SECRET_TOKEN_FOR_AUTH="test-secret-" + "x" * 32,
+    REDIS_HOST="127.0.0.1",
+    REDIS_PORT="6379",
+    RABBITMQ_HOST="127.0.0.1",
+    ARGON2_TIME_COST="1",
+    ARGON2_MEMORY_COST="1024",
+    ARGON2_PARALLELISM="1",
+    LOG_JSON="false",
+)
+# Enough for the engines to be built when no database can be set up,
+# the tests that would connect are skipped.
+for key, value in {
+    "POSTGRES_HOST": "127.0.0.1",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "",
+    "POSTGRES_DB": "postgres",
+    "RABBITMQ_PORT": "5672",
+}.items():
+    os.environ.setdefault(key, value)
+standins.fake_redis()
+
+_stack = ExitStack()
+_database_error: str | None = None
+if os.environ.get("TEST_DATABASE_URL"):
+    standins.use_database_url(os.environ["TEST_DATABASE_URL"])
+else:
+    try:
+        _stack.enter_context(
+            standins.ephemeral_postgres(os.environ.get("PG_BIN"))
+        )
+    except (RuntimeError, OSError, subprocess.SubprocessError) as exc:
+        _database_error = str(exc)
+if _database_error is None:
+    standins.migrate()
+
+PASSWORD = "correct-horse-battery"
+TABLES = """
+SELECT string_agg(format('%I', tablename), ', ')
+FROM pg_tables
+WHERE schemaname = 'public' AND tablename <> 'alembic_version'
+"""
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    if _database_error is None:
+        return
+    skip = pytest.mark.skip(reason=f"no database: {_database_error}")
+    for item in items:
+        if "db" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_unconfigure() -> None:
+    _stack.close()
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator:
+    from fastapi.testclient import TestClient
+
+    from src.main import app
+
+    # One portal for the whole session, pooled connections stay bound
+    # to the loop that opened them.
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def _clean(request: pytest.FixtureRequest, monkeypatch) -> Iterator[None]:
+    from src.auth.cache import get_user_cache
+    from src.auth.service import get_session_strategy
+    from src.cache import get_redis
+    from src.config import config
+    from src.rate_limit import get_rate_limiter
+    from src.user.search import search_cache
+
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", False)
+    yield
+    rate_limiter = get_rate_limiter()
+    for cache in (
+        get_user_cache().local,
+        get_session_strategy().local,
+        rate_limiter._blocked,
+        rate_limiter._leases,
+        search_cache,
+    ):
+        cache.clear()
+    if "client" not in request.fixturenames:
+        return
+    client = request.getfixturevalue("client")
+    client.portal.call(get_redis().flushall)
+    if "db" in request.keywords:
+        client.portal.call(_truncate)
+
+
+async def _truncate() -> None:
+    from sqlalchemy import text
+
+    from src.database import get_engine
+
+    async with get_engine().begin() as connection:
+        tables = await connection.scalar(text(TABLES))
+        if tables:
+            await connection.execute(
+                text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+            )
+
+
+def _register(client, email: str) -> dict:
+    response = client.post(
+        "/auth/register",
+        json={
+            "email": email,
+            "password": PASSWORD,
+            "first_name": "Test",
+            "last_name": "User",
+        },
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def login(client) -> Callable[[str], dict[str, str]]:
+    """Log in a registered user, return headers sending its cookies.
+
+    The cookies are ``Secure`` and the test client speaks plain HTTP, so
+    they are passed on explicitly instead of through the cookie jar.
+    """
+
+    def login(email: str) -> dict[str, str]:
+        response = client.post(
+            "/auth/login", data={"username": email, "password": PASSWORD}
+        )
+        assert response.status_code == 204, response.text
+        client.cookies.clear()
+        cookies = "; ".join(
+            f"{name}={value}" for name, value in response.cookies.items()
+        )
+        return {"Cookie": cookies}
+
+    return login
+
+
+@pytest.fixture
+def make_user(client, login) -> Callable[[str], dict]:
+    """Register and log in a user.
+
+    Returns the user as read back from the API, with the ``headers`` of
+    its login.
+    """
+
+    def make(email: str) -> dict:
+        return {**_register(client, email), "headers": login(email)}
+
+    return make
+
+
+@pytest.fixture
+def user(make_user) -> dict:
+    return make_user("alice@example.com")
+
+
+@pytest.fixture
+def befriend(client) -> Callable[[dict, dict], None]:
+    """Make two users friends through the friend request endpoints."""
+
+    def befriend(first: dict, second: dict) -> None:
+        response = client.post(
+            f"/user/{second['id']}/friend-request", headers=first["headers"]
+        )
+        assert response.status_code == 201, response.text
+        response = client.post(
+            f"/user/me/requests/{first['id']}/accept",
+            headers=second["headers"],
+        )
+        assert response.status_code == 200, response.text
+
+    return befriend
@@ -0,0 +1,287 @@
+import time
+import uuid
+
+import pytest
+from pwdlib.hashers.bcrypt import BcryptHasher
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+from sqlalchemy import select, update
+
+from src.auth.cache import CachedUserDatabase, get_user_cache
+from src.auth.constant import (
+    SESSION_KEY,
+    TOKEN_PAIR_SEPARATOR,
+    USER_CACHE_KEY,
+)
+from src.auth.password import async_password_helper
+from src.auth.revocation import RevocationList
+from src.auth.service import UserManager
+from src.auth.strategy import JwtStrategy, SessionStrategy
+from src.cache import LRUCache, get_auth_redis, get_redis
+from src.config import Settings
+from src.database import async_session_maker
+from src.models import User
+from tests.conftest import PASSWORD
+
+
+class StubUser:
+    def __init__(self):
+        self.id = uuid.uuid4()
+
+
+class StubUserManager:
+    def __init__(self, *users: StubUser):
+        self.users = {user.id: user for user in users}
+
+    def parse_id(self, value: str) -> uuid.UUID:
+        return uuid.UUID(value)
+
+    async def get(self, id: uuid.UUID) -> StubUser:
+        return self.users[id]
+
+
+@pytest.fixture
+def sessions() -> SessionStrategy:
+    return SessionStrategy(get_auth_redis(), 100, 1000, LRUCache(10, 0))
+
+
+@pytest.fixture
+def jwt(client, sessions):
+    revocations = RevocationList(get_auth_redis(), 300, 0.05, 1 << 16, 7)
+    keys = ["new-" + "k" * 32, "old-" + "k" * 32]
+    yield JwtStrategy(sessions, revocations, keys, 300)
+    client.portal.call(revocations.close)
+
+
+@pytest.mark.db
+def test_logout_ends_the_session(client, user):
+    assert client.get("/user/me", headers=user["headers"]).status_code == 200
+    response = client.post("/auth/logout", headers=user["headers"])
+    assert response.status_code == 204
+    assert client.get("/user/me", headers=user["headers"]).status_code == 401
+
+
+@pytest.mark.db
+def test_logout_all_ends_every_session(client, user, login):
+    other = login("alice@example.com")
+    response = client.post("/auth/logout-all", headers=user["headers"])
+    assert response.status_code == 204
+    assert client.get("/user/me", headers=user["headers"]).status_code == 401
+    assert client.get("/user/me", headers=other).status_code == 401
+    fresh = login("alice@example.com")
+    assert client.get("/user/me", headers=fresh).status_code == 200
+
+
+@pytest.mark.db
+def test_refresh_needs_jwt_mode(client, user):
+    response = client.post("/auth/refresh", headers=user["headers"])
+    assert response.status_code == 404
+
+
+def test_session_slides_until_max_age(client, sessions):
+    user = StubUser()
+    token = client.portal.call(sessions.write_token, user)
+    key = SESSION_KEY.format(token)
+    now = int(time.time())
+
+    # Less than half its lifetime left, reading the token extends it.
+    client.portal.call(
+        get_auth_redis().set, key, f"{user.id}|{now + 10}|{now + 500}"
+    )
+    assert client.portal.call(sessions.user_id, token) == str(user.id)
+    raw = client.portal.call(get_auth_redis().get, key)
+    assert int(raw.split("|")[1]) >= now + 100
+
+    # Never past the max age.
+    client.portal.call(
+        get_auth_redis().set, key, f"{user.id}|{now + 10}|{now + 20}"
+    )
+    client.portal.call(sessions.user_id, token)
+    raw = client.portal.call(get_auth_redis().get, key)
+    assert raw.split("|")[1] == str(now + 20)
+
+    client.portal.call(sessions.destroy, user.id, token)
+    assert client.portal.call(sessions.user_id, token) is None
+
+
+def test_refresh_rotates_the_refresh_token(client, jwt):
+    user = StubUser()
+    manager = StubUserManager(user)
+    access, refresh = client.portal.call(jwt.write_token, user).split(
+        TOKEN_PAIR_SEPARATOR
+    )
+    assert client.portal.call(jwt.read_token, access, manager) is user
+
+    user_id, pair = client.portal.call(jwt.refresh, refresh)
+    assert user_id == str(user.id)
+    new_access, new_refresh = pair.split(TOKEN_PAIR_SEPARATOR)
+    assert new_refresh != refresh
+    assert client.portal.call(jwt.read_token, new_access, manager) is user
+    # A refresh token works once.
+    assert client.portal.call(jwt.refresh, refresh) is None
+    assert client.portal.call(jwt.refresh, new_refresh) is not None
+
+
+def test_logout_revokes_the_access_token(client, jwt):
+    user = StubUser()
+    manager = StubUserManager(user)
+    access, refresh = client.portal.call(jwt.write_token, user).split(
+        TOKEN_PAIR_SEPARATOR
+    )
+    client.portal.call(jwt.destroy_token, access, user)
+    assert client.portal.call(jwt.read_token, access, manager) is None
+    assert client.portal.call(jwt.refresh, refresh) is None
+
+
+def test_logout_everywhere_revokes_older_tokens(client, jwt):
+    user = StubUser()
+    manager = StubUserManager(user)
+    pair = client.portal.call(jwt.write_token, user)
+    access = pair.split(TOKEN_PAIR_SEPARATOR)[0]
+    client.portal.call(jwt.destroy_all, user.id)
+    assert client.portal.call(jwt.read_token, access, manager) is None
+    pair = client.portal.call(jwt.write_token, user)
+    access = pair.split(TOKEN_PAIR_SEPARATOR)[0]
+    assert client.portal.call(jwt.read_token, access, manager) is user
+
+
+def test_revocation_check_fails_closed(client, jwt, monkeypatch):
+    user, other = StubUser(), StubUser()
+    manager = StubUserManager(user, other)
+    access = client.portal.call(jwt.write_token, user).split(
+        TOKEN_PAIR_SEPARATOR
+    )[0]
+    unrelated = client.portal.call(jwt.write_token, other).split(
+        TOKEN_PAIR_SEPARATOR
+    )[0]
+    # Warm up the filter so the sync task is running.
+    client.portal.call(jwt.read_token, access, manager)
+    client.portal.call(jwt.revocations.revoke_user, user.id)
+
+    async def unavailable(*args, **kwargs):
+        raise RedisError("down")
+
+    monkeypatch.setattr(jwt.revocations.redis, "zmscore", unavailable)
+    assert client.portal.call(jwt.read_token, access, manager) is None
+    assert client.portal.call(jwt.read_token, unrelated, manager) is other
+    assert jwt.revocations.stats()["check_errors"] == 1
+
+
+def test_jwt_mode_needs_a_secret():
+    with pytest.raises(ValidationError):
+        Settings(AUTH_MODE="jwt", SECRET_TOKEN_FOR_AUTH="")
+    with pytest.raises(ValidationError):
+        Settings(AUTH_MODE="jwt", ACCESS_TOKEN_SECRETS=",")
+    settings = Settings(AUTH_MODE="jwt", ACCESS_TOKEN_SECRETS="new,,old")
+    assert settings.ACCESS_TOKEN_SECRETS == ["new", "old"]
+
+
+@pytest.mark.db
+def test_cached_user_has_every_column(client, make_user, befriend):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    befriend(alice, bob)
+
+    async def load() -> list[int]:
+        counts = []
+        async with async_session_maker() as session:
+            users = CachedUserDatabase(session, User, get_user_cache())
+            for _ in range(2):
+                user = await users.get(uuid.UUID(alice["id"]))
+                counts.append(user.friend_count)
+        return counts
+
+    # A miss then a hit, both with the counters of the row.
+    assert client.portal.call(load) == [1, 1]
+    assert get_user_cache().stats()["local_hits"] >= 1
+    response = client.delete(
+        f"/user/me/friends/{bob['id']}", headers=alice["headers"]
+    )
+    assert response.status_code == 204
+    assert client.portal.call(load) == [0, 0]
+
+
+@pytest.mark.db
+def test_cached_user_has_no_password_hash(client, user, monkeypatch):
+    tokens = []
+
+    async def on_after_forgot_password(self, user, token, request=None):
+        tokens.append(token)
+
+    monkeypatch.setattr(
+        UserManager, "on_after_forgot_password", on_after_forgot_password
+    )
+    response = client.get("/user/me", headers=user["headers"])
+    assert response.status_code == 200
+    cached = client.portal.call(
+        get_redis().hgetall, USER_CACHE_KEY.format(user["id"])
+    )
+    assert cached
+    assert "hashed_password" not in cached
+
+    # The reset token is checked against the hash read from the database.
+    response = client.post(
+        "/auth/forgot-password", json={"email": user["email"]}
+    )
+    assert response.status_code == 202
+    response = client.post(
+        "/auth/reset-password",
+        json={"token": tokens[0], "password": "a-brand-new-password"},
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/auth/login",
+        data={"username": user["email"], "password": "a-brand-new-password"},
+    )
+    assert response.status_code == 204
+
+
+def _stored_hash(client, email: str) -> str:
+    async def read() -> str:
+        async with async_session_maker() as session:
+            return await session.scalar(
+                select(User.hashed_password).where(User.email == email)
+            )
+
+    return client.portal.call(read)
+
+
+@pytest.mark.db
+def test_login_upgrades_an_outdated_hash(client, user):
+    async def downgrade() -> None:
+        async with async_session_maker() as session:
+            await session.execute(
+                update(User)
+                .where(User.email == user["email"])
+                .values(hashed_password=BcryptHasher().hash(PASSWORD))
+            )
+            await session.commit()
+
+    client.portal.call(downgrade)
+    assert _stored_hash(client, user["email"]).startswith("$2b$")
+
+    response = client.post(
+        "/auth/login", data={"username": user["email"], "password": PASSWORD}
+    )
+    assert response.status_code == 204
+    upgraded = _stored_hash(client, user["email"])
+    assert upgraded.startswith("$argon2id$")
+    # Logging in again verifies against the new hash, unchanged.
+    response = client.post(
+        "/auth/login", data={"username": user["email"], "password": PASSWORD}
+    )
+    assert response.status_code == 204
+    assert _stored_hash(client, user["email"]) == upgraded
+
+
+@pytest.mark.db
+def test_busy_hasher_answers_503(client, user, monkeypatch):
+    monkeypatch.setattr(async_password_helper, "max_pending", 0)
+    rejected = async_password_helper.stats()["rejected"]
+
+    response = client.post(
+        "/auth/login", data={"username": user["email"], "password": PASSWORD}
+    )
+    assert response.status_code == 503
+    assert response.json() == {"detail": "PASSWORD_HASHER_BUSY"}
+    assert response.headers["Retry-After"] == "1"
+    assert async_password_helper.stats()["rejected"] == rejected + 1
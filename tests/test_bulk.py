@@ -0,0 +1,26 @@
+import logging
+
+import pytest
+
+from src.user.bulk import import_users
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.db
+
+CSV = f"""email,password,first_name,last_name
+bob@example.com,{PASSWORD},Bob,Builder
+not-an-email,{PASSWORD},Bad,Row
+alice@example.com,{PASSWORD},Alice,Again
+"""
+
+
+def test_import_users(client, user, login, tmp_path, caplog):
+    path = tmp_path / "users.csv"
+    path.write_text(CSV)
+    with caplog.at_level(logging.WARNING, logger="src.user.bulk"):
+        stats = client.portal.call(import_users, path, 10, 1)
+    assert stats == {"read": 3, "invalid": 1, "inserted": 1}
+    assert [record.args[0] for record in caplog.records] == [2]
+    # Hashed like the app hashes, the imported password logs in.
+    response = client.get("/user/me", headers=login("bob@example.com"))
+    assert response.json()["first_name"] == "Bob"
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config import config
+from src.database import InstrumentedQueuePool, pool_stats
+
+pytestmark = pytest.mark.db
+
+
+def test_pool_counts_only_blocked_callers():
+    async def main():
+        engine = create_async_engine(
+            config.POSTGRES_URL,
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+        )
+        waits = []
+
+        # Opening a connection in a pool with room left is not waiting.
+        @event.listens_for(engine.sync_engine, "connect")
+        def connect(*args):
+            waits.append(pool_stats(engine)["waiting"])
+
+        async with engine.connect():
+            blocked = asyncio.create_task(engine.connect().start())
+            await asyncio.sleep(0.1)
+            waits.append(pool_stats(engine)["waiting"])
+        connection = await blocked
+        waits.append(pool_stats(engine)["waiting"])
+        await connection.close()
+        await engine.dispose()
+        return waits
+
+    assert asyncio.run(main()) == [0, 1, 0]
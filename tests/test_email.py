@@ -0,0 +1,81 @@
+import email
+import smtplib
+
+import pytest
+from markupsafe import escape
+
+from src.email_celery import router
+from src.email_celery.constant import (
+    EMAIL_SENT_KEY,
+    EMAIL_TEMPLATES,
+    VERIFY_EMAIL,
+)
+from src.email_celery.renderer import QP_LINE, renderer
+
+
+@pytest.fixture
+def outbox(monkeypatch) -> list[str]:
+    """Addresses sent to, ``down@`` fails once and ``gone@`` is refused."""
+    sent: list[str] = []
+    failures = {"down@example.com": 1}
+
+    def send(to_addr: str, msg: str) -> None:
+        if to_addr == "gone@example.com":
+            raise smtplib.SMTPRecipientsRefused({to_addr: (550, b"gone")})
+        if failures.get(to_addr):
+            failures[to_addr] -= 1
+            raise smtplib.SMTPServerDisconnected("dropped")
+        sent.append(to_addr)
+
+    monkeypatch.setattr(router.smtp_connection, "send", send)
+    router.get_sent_emails().flushall()
+    return sent
+
+
+def _email(address: str) -> tuple:
+    return (address, "token", VERIFY_EMAIL, None, f"key-{address}")
+
+
+def test_batch_retries_only_unsent_emails(outbox):
+    emails = [
+        _email("a@example.com"),
+        _email("down@example.com"),
+        _email("gone@example.com"),
+        _email("b@example.com"),
+    ]
+    result = router.send_email_batch_task.apply(args=(emails,))
+    assert result.successful()
+    assert outbox == ["a@example.com", "b@example.com", "down@example.com"]
+    assert router.get_sent_emails().exists(
+        EMAIL_SENT_KEY.format("key-a@example.com")
+    )
+
+
+def test_batch_skips_emails_sent_already(outbox):
+    emails = [_email("a@example.com")]
+    router.send_email_batch_task.apply(args=(emails,))
+    router.send_email_batch_task.apply(args=(emails,))
+    assert outbox == ["a@example.com"]
+
+
+def test_single_email_is_retried(outbox):
+    result = router.send_verification_email_task.apply(
+        args=("down@example.com", "token")
+    )
+    assert result.successful()
+    assert outbox == ["down@example.com"]
+
+
+@pytest.mark.parametrize("kind", list(EMAIL_TEMPLATES))
+@pytest.mark.parametrize(
+    "token", ["t" * 200, "tëst=tøken " * 20, "a\tb ", "=" * 77]
+)
+def test_rendered_lines_fit_quoted_printable(kind, token):
+    rendered = renderer.render(kind, "user@example.com", token)
+
+    assert max(map(len, rendered.splitlines())) <= QP_LINE
+    message = email.message_from_string(rendered)
+    for part in message.walk():
+        if part.get_content_maintype() == "text":
+            body = part.get_payload(decode=True).decode("utf-8")
+            assert token in body or str(escape(token)) in body
@@ -0,0 +1,87 @@
+from uuid import UUID
+
+import pytest
+
+from src.cache import get_binary_redis
+from src.feed.constant import PULL_AUTHORS_KEY, TIMELINE_KEY
+
+pytestmark = pytest.mark.db
+
+
+def _post(client, author: dict, body: str) -> int:
+    response = client.post(
+        "/feed/posts", json={"body": body}, headers=author["headers"]
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _feed(client, reader: dict, limit: int = 20) -> list[int]:
+    """Every post of the home feed, walked ``limit`` at a time."""
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit} | ({"cursor": cursor} if cursor else {})
+        response = client.get(
+            "/feed", params=params, headers=reader["headers"]
+        )
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids += [post["id"] for post in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def _pull_authors(client) -> set[UUID]:
+    members = client.portal.call(get_binary_redis().smembers, PULL_AUTHORS_KEY)
+    return {UUID(bytes=member) for member in members}
+
+
+def test_pages_run_past_the_timeline(client, user, monkeypatch):
+    monkeypatch.setattr("src.feed.service.TIMELINE_SIZE", 3)
+    assert _feed(client, user) == []
+    # Pushed into the existing timeline, which keeps the newest three.
+    posts = [_post(client, user, f"post {i}") for i in range(7)]
+
+    assert _feed(client, user, limit=2) == posts[::-1]
+    assert _feed(client, user, limit=5) == posts[::-1]
+
+
+def test_expired_timeline_is_rebuilt(client, make_user, befriend):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    befriend(alice, bob)
+    assert _feed(client, bob) == []
+    first = [_post(client, alice, "first"), _post(client, alice, "second")]
+    assert _feed(client, bob) == first[::-1]
+
+    client.portal.call(
+        get_binary_redis().delete, TIMELINE_KEY.format(bob["id"])
+    )
+    # Not pushed to bob, whose timeline is gone.
+    last = _post(client, alice, "third")
+    assert _feed(client, bob) == [last, *first[::-1]]
+
+
+def test_pull_author_posts_are_merged_in(
+    client, make_user, befriend, monkeypatch
+):
+    monkeypatch.setattr("src.feed.service.FANOUT_LIMIT", 1)
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    carol = make_user("carol@example.com")
+    befriend(alice, bob)
+    befriend(alice, carol)
+    assert _feed(client, bob) == []
+
+    pulled = _post(client, alice, "too many friends")
+    assert _pull_authors(client) == {UUID(alice["id"])}
+    assert _feed(client, bob) == [pulled]
+    assert _feed(client, carol) == [pulled]
+
+    response = client.delete(
+        f"/user/me/friends/{carol['id']}", headers=alice["headers"]
+    )
+    assert response.status_code == 204
+    # Under the limit again: pushed, and no longer pulled.
+    pushed = _post(client, alice, "to one friend")
+    assert _pull_authors(client) == set()
+    assert _feed(client, bob) == [pushed, pulled]
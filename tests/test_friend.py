@@ -0,0 +1,240 @@
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import select
+
+from src.database import async_session_maker
+from src.models import User
+from src.user.constant import ErrorCode
+
+pytestmark = pytest.mark.db
+
+
+def _profile(client, user: dict, viewer: dict) -> dict:
+    response = client.get(
+        f"/user/{user['id']}/profile", headers=viewer["headers"]
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _counts(client, *users: dict) -> list[tuple[int, int, int]]:
+    """Friend, incoming and outgoing request counts, as stored and shown.
+
+    Both must agree, the profile is served from a cache.
+    """
+
+    async def stored() -> dict[UUID, tuple[int, int, int]]:
+        async with async_session_maker() as session:
+            rows = await session.execute(
+                select(
+                    User.id,
+                    User.friend_count,
+                    User.incoming_request_count,
+                    User.outgoing_request_count,
+                ).where(User.id.in_([UUID(user["id"]) for user in users]))
+            )
+            return {id: tuple(counts) for id, *counts in rows}
+
+    rows = client.portal.call(stored)
+    counts = []
+    for user in users:
+        profile = _profile(client, user, user)
+        shown = (
+            profile["friend_count"],
+            profile["incoming_request_count"],
+            profile["outgoing_request_count"],
+        )
+        assert rows[UUID(user["id"])] == shown
+        counts.append(shown)
+    return counts
+
+
+def test_request_then_accept(client, make_user):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    response = client.post(
+        f"/user/{bob['id']}/friend-request",
+        json={"msg": "hi"},
+        headers=alice["headers"],
+    )
+    assert response.status_code == 201
+    assert response.json() == {
+        "sender_id": alice["id"],
+        "receiver_id": bob["id"],
+        "msg": "hi",
+    }
+    incoming = client.get("/user/me/requests", headers=bob["headers"])
+    assert [r["sender_id"] for r in incoming.json()] == [alice["id"]]
+    assert _profile(client, bob, alice)["incoming_request_count"] == 1
+
+    response = client.post(
+        f"/user/me/requests/{alice['id']}/accept", headers=bob["headers"]
+    )
+    assert response.status_code == 200
+    friends = client.get(
+        f"/user/{alice['id']}/friends", headers=bob["headers"]
+    )
+    assert [user["id"] for user in friends.json()["items"]] == [bob["id"]]
+    assert _profile(client, bob, alice)["friend_count"] == 1
+    assert _profile(client, bob, alice)["incoming_request_count"] == 0
+
+
+def test_request_back_accepts(client, make_user):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    client.post(f"/user/{bob['id']}/friend-request", headers=alice["headers"])
+    response = client.post(
+        f"/user/{alice['id']}/friend-request", headers=bob["headers"]
+    )
+    assert response.status_code == 201
+    assert response.json()["sender_id"] == alice["id"]
+    response = client.post(
+        f"/user/{alice['id']}/friend-request", headers=bob["headers"]
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == ErrorCode.FRIEND_ALREADY_FRIEND
+
+
+def test_request_errors(client, make_user):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    url = f"/user/{bob['id']}/friend-request"
+    assert client.post(url, headers=alice["headers"]).status_code == 201
+    response = client.post(url, headers=alice["headers"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == ErrorCode.FRIEND_REQUEST_ALREADY_SENT
+
+    response = client.post(
+        f"/user/{alice['id']}/friend-request", headers=alice["headers"]
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == ErrorCode.FRIEND_REQUEST_TO_SELF
+
+
+def test_request_to_unknown_user(client, user):
+    response = client.post(
+        f"/user/{uuid4()}/friend-request", headers=user["headers"]
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == ErrorCode.USER_NOT_FOUND
+
+
+def test_reject_and_remove(client, make_user, befriend):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    carol = make_user("carol@example.com")
+    client.post(f"/user/{bob['id']}/friend-request", headers=carol["headers"])
+    response = client.delete(
+        f"/user/me/requests/{carol['id']}", headers=bob["headers"]
+    )
+    assert response.status_code == 200
+    response = client.delete(
+        f"/user/me/requests/{carol['id']}", headers=bob["headers"]
+    )
+    assert response.status_code == 404
+
+    befriend(alice, bob)
+    url = f"/user/me/friends/{bob['id']}"
+    assert client.delete(url, headers=alice["headers"]).status_code == 204
+    response = client.delete(url, headers=alice["headers"])
+    assert response.status_code == 404
+    assert response.json()["detail"] == ErrorCode.FRIEND_NOT_FOUND
+    assert _profile(client, alice, bob)["friend_count"] == 0
+
+
+def test_mutual_friends_and_suggestions(client, make_user, befriend):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    carol, dave = make_user("carol@example.com"), make_user("dave@example.com")
+    befriend(alice, carol)
+    befriend(bob, carol)
+    befriend(alice, dave)
+    befriend(bob, dave)
+
+    response = client.get(
+        f"/user/{alice['id']}/mutual/{bob['id']}", headers=alice["headers"]
+    )
+    assert response.status_code == 200
+    mutual = response.json()
+    assert mutual["count"] == 2
+    assert sorted(mutual["ids"]) == sorted([carol["id"], dave["id"]])
+
+    response = client.get(
+        f"/user/{alice['id']}/suggestions", headers=alice["headers"]
+    )
+    assert response.json() == [{"user_id": bob["id"], "mutual_count": 2}]
+    response = client.get(
+        f"/user/{alice['id']}/suggestions", headers=bob["headers"]
+    )
+    assert response.status_code == 403
+
+    # Becoming friends invalidates the cached adjacency and suggestions.
+    befriend(alice, bob)
+    response = client.get(
+        f"/user/{alice['id']}/suggestions", headers=alice["headers"]
+    )
+    assert response.json() == []
+
+
+def test_suggestions_count_every_mutual_friend(
+    client, make_user, befriend, monkeypatch
+):
+    # Only the newest friend is walked, both are counted.
+    monkeypatch.setattr("src.user.graph.SUGGESTIONS_FANOUT", 1)
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    carol, dave = make_user("carol@example.com"), make_user("dave@example.com")
+    befriend(bob, carol)
+    befriend(bob, dave)
+    befriend(alice, carol)
+    befriend(alice, dave)
+
+    response = client.get(
+        f"/user/{alice['id']}/suggestions", headers=alice["headers"]
+    )
+    assert response.json() == [{"user_id": bob["id"], "mutual_count": 2}]
+
+
+def test_counters_follow_every_change(client, make_user):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    carol = make_user("carol@example.com")
+
+    def send(sender: dict, receiver: dict) -> None:
+        response = client.post(
+            f"/user/{receiver['id']}/friend-request",
+            headers=sender["headers"],
+        )
+        assert response.status_code == 201
+
+    send(alice, bob)
+    send(carol, bob)
+    assert _counts(client, alice, bob, carol) == [
+        (0, 0, 1),
+        (0, 2, 0),
+        (0, 0, 1),
+    ]
+
+    response = client.post(
+        f"/user/me/requests/{alice['id']}/accept", headers=bob["headers"]
+    )
+    assert response.status_code == 200
+    response = client.delete(
+        f"/user/me/requests/{carol['id']}", headers=bob["headers"]
+    )
+    assert response.status_code == 200
+    assert _counts(client, alice, bob, carol) == [
+        (1, 0, 0),
+        (1, 0, 0),
+        (0, 0, 0),
+    ]
+
+    # A request answered by one going the other way.
+    send(carol, alice)
+    send(alice, carol)
+    assert _counts(client, alice, carol) == [(2, 0, 0), (1, 0, 0)]
+
+    response = client.delete(
+        f"/user/me/friends/{bob['id']}", headers=alice["headers"]
+    )
+    assert response.status_code == 204
+    # Bob keeps a pending request to Alice.
+    assert _counts(client, alice, bob, carol) == [
+        (1, 1, 0),
+        (0, 0, 1),
+        (1, 0, 0),
+    ]
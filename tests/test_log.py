@@ -0,0 +1,40 @@
+import json
+import logging
+import queue
+
+from src.log import JsonFormatter, _QueueHandler
+
+
+def _record(**kwargs) -> logging.LogRecord:
+    logger = logging.getLogger("test")
+    return logger.makeRecord(
+        "test", logging.ERROR, __file__, 1, "failed %s", ("job",), **kwargs
+    )
+
+
+def test_json_keeps_the_traceback():
+    try:
+        raise ValueError("boom")
+    except ValueError as exc:
+        exc_info = (type(exc), exc, exc.__traceback__)
+    record = _record(exc_info=exc_info, sinfo="Stack (most recent call)")
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "failed job"
+    assert "ValueError: boom" in entry["exc_info"]
+    assert entry["stack_info"] == "Stack (most recent call)"
+
+
+def test_queued_record_keeps_the_traceback_apart():
+    try:
+        raise ValueError("boom")
+    except ValueError as exc:
+        exc_info = (type(exc), exc, exc.__traceback__)
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _QueueHandler(records).handle(_record(exc_info=exc_info))
+
+    entry = json.loads(JsonFormatter().format(records.get_nowait()))
+
+    assert entry["message"] == "failed job"
+    assert "ValueError: boom" in entry["exc_info"]
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_import_needs_no_environment(tmp_path):
+    # No settings, no .env file: clients are only built on first use.
+    env = {"PATH": os.environ.get("PATH", ""), "HOME": str(tmp_path)}
+    modules = "src.main, src.outbox.relay, src.user.bulk"
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {modules}"],
+        cwd=tmp_path,
+        env={**env, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+
+from src.database import get_engine
+from src.message.constant import PARTITION_NAME, PARTITION_PATTERN
+from src.message.partition import _month, ensure_partitions
+from src.message.schema import Message
+from src.message.writer import MessageWriter
+from src.notification.constant import NotificationType
+
+
+class MemoryWriter(MessageWriter):
+    """Keeps batches in memory and fails delivery when told to."""
+
+    def __init__(self, fail_delivery: bool = False):
+        super().__init__(None, None, 10, 10, 0)
+        self.fail_delivery = fail_delivery
+        self.stored: list[Message] = []
+
+    async def _insert(self, messages: list[Message]) -> None:
+        self.stored.extend(messages)
+
+    async def _deliver(self, messages: list[Message]) -> None:
+        if self.fail_delivery:
+            raise RuntimeError("delivery failed")
+
+
+def _message() -> Message:
+    return Message(
+        id=uuid4(),
+        sender_id=uuid4(),
+        recipient_id=uuid4(),
+        body="hi",
+        created_at=datetime.now(UTC),
+    )
+
+
+def test_writer_survives_failed_delivery():
+    async def main():
+        writer = MemoryWriter(fail_delivery=True)
+        await asyncio.wait_for(writer.write(_message()), 1)
+        writer.fail_delivery = False
+        await asyncio.wait_for(writer.write(_message()), 1)
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(main())
+    assert len(writer.stored) == 2
+    assert writer.errors == 1
+
+
+def test_writer_restarts_after_its_task_stopped():
+    async def main():
+        writer = MemoryWriter()
+        await writer.write(_message())
+        task = writer._task
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert writer._task is None
+        await asyncio.wait_for(writer.write(_message()), 1)
+        assert writer._task is not task
+        await writer.close()
+        return writer
+
+    assert len(asyncio.run(main()).stored) == 2
+
+
+@pytest.mark.db
+def test_message_reaches_recipient_socket(client, make_user, befriend):
+    alice, bob = make_user("alice@example.com"), make_user("bob@example.com")
+    befriend(alice, bob)
+    with client.websocket_connect(
+        "/ws/notifications", headers=bob["headers"]
+    ) as socket:
+        response = client.post(
+            f"/messages/{bob['id']}",
+            json={"body": "hello"},
+            headers=alice["headers"],
+        )
+        assert response.status_code == 201, response.text
+        while True:
+            event = json.loads(socket.receive_text())
+            if event["type"] == NotificationType.MESSAGE:
+                break
+    assert event["message"]["body"] == "hello"
+    assert event["message"]["sender_id"] == alice["id"]
+
+    unread = client.get("/messages/unread", headers=bob["headers"])
+    assert unread.json() == {alice["id"]: 1}
+
+
+@pytest.mark.db
+def test_partitions_are_created_ahead(client):
+    async def partitions() -> set[str]:
+        await ensure_partitions(get_engine(), 5)
+        async with get_engine().connect() as connection:
+            rows = await connection.execute(
+                text("SELECT tablename FROM pg_tables WHERE tablename ~ :p"),
+                {"p": f"^{PARTITION_PATTERN}$"},
+            )
+            return {row[0] for row in rows}
+
+    today = datetime.now(UTC).date()
+    expected = {PARTITION_NAME.format(_month(today, i)) for i in range(6)}
+    assert expected <= client.portal.call(partitions)
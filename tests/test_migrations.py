@@ -0,0 +1,12 @@
+import pytest
+from alembic.config import Config
+
+from alembic import command
+
+pytestmark = pytest.mark.db
+
+
+def test_models_match_migrations(client):
+    # Runtime partitions and the trigram index must not show up as
+    # changes, the next autogenerated migration would drop them.
+    command.check(Config("alembic.ini"))
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from src.config import config
+from src.notification.constant import NotificationType
+
+pytestmark = pytest.mark.db
+
+
+def test_socket_rejects_anonymous(client):
+    with (
+        pytest.raises(WebSocketDisconnect) as exc,
+        client.websocket_connect("/ws/notifications") as socket,
+    ):
+        socket.receive_text()
+    assert exc.value.code == 1008
+
+
+def test_socket_answers_presence(client, user, monkeypatch):
+    # The app-wide rate limit applies to the handshake as well.
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    with client.websocket_connect(
+        "/ws/notifications", headers=user["headers"]
+    ) as socket:
+        socket.send_text(
+            json.dumps(
+                {"type": NotificationType.PRESENCE, "ids": [user["id"]]}
+            )
+        )
+        while True:
+            message = json.loads(socket.receive_text())
+            if message["type"] == NotificationType.PRESENCE:
+                break
+    assert message["online"] == {user["id"]: True}
+
+
+def test_socket_handshake_is_rate_limited(client, user, monkeypatch):
+    from src.main import api_rate_limit
+
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(api_rate_limit.policy, "limit", 1)
+    monkeypatch.setattr(api_rate_limit.policy, "rate", 1 / 60000)
+    monkeypatch.setattr(api_rate_limit.policy, "lease", 1)
+    with client.websocket_connect(
+        "/ws/notifications", headers=user["headers"]
+    ):
+        pass
+    with (
+        pytest.raises(WebSocketDisconnect) as exc,
+        client.websocket_connect(
+            "/ws/notifications", headers=user["headers"]
+        ) as socket,
+    ):
+        socket.receive_text()
+    assert exc.value.code == 1008
+    assert exc.value.reason == "TOO_MANY_REQUESTS"
@@ -0,0 +1,71 @@
+import pytest
+from redis.exceptions import RedisError
+
+from src.auth.constant import LOGIN_PER_USER_IP
+from src.cache import get_redis
+from src.config import config
+from src.rate_limit import Policy, RateLimiter
+from tests.conftest import PASSWORD
+
+
+@pytest.fixture
+def limiter() -> RateLimiter:
+    return RateLimiter(get_redis(), 100, 60)
+
+
+def test_bucket_refuses_past_the_limit(client, limiter):
+    policy = Policy("test", 2, 60)
+    waits = [
+        client.portal.call(limiter.hit, policy, "/route", "1.2.3.4")
+        for _ in range(4)
+    ]
+    assert waits[:2] == [0, 0]
+    assert 0 < waits[2] <= 30
+    # Refused again without asking Redis.
+    assert 0 < waits[3] <= waits[2]
+    assert limiter.stats()["local_hits"] == 1
+    # Other identities and routes have buckets of their own.
+    assert client.portal.call(limiter.hit, policy, "/route", "5.6.7.8") == 0
+    assert client.portal.call(limiter.hit, policy, "/other", "1.2.3.4") == 0
+
+
+def test_leased_tokens_are_spent_locally(client, limiter):
+    policy = Policy("test", 10, 60, lease=5)
+    for _ in range(10):
+        assert client.portal.call(limiter.hit, policy, "/", "ip") == 0
+    assert client.portal.call(limiter.hit, policy, "/", "ip") > 0
+    stats = limiter.stats()
+    assert stats["redis_hits"] == 3
+    assert stats["local_hits"] == 8
+
+
+def test_requests_pass_when_redis_fails(client, limiter, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise RedisError("down")
+
+    monkeypatch.setattr(limiter, "_script", unavailable)
+    policy = Policy("test", 1, 60)
+    for _ in range(3):
+        assert client.portal.call(limiter.hit, policy, "/", "ip") == 0
+    assert limiter.stats()["errors"] == 3
+
+
+@pytest.mark.db
+def test_login_attempts_are_limited_per_user_and_address(
+    client, user, monkeypatch
+):
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    limit = LOGIN_PER_USER_IP[0]
+    form = {"username": "Alice@example.com", "password": "wrong-password"}
+    for _ in range(limit):
+        response = client.post("/auth/login", data=form)
+        assert response.status_code == 400
+    response = client.post("/auth/login", data=form)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    # Locked out from this address whatever the password.
+    form["password"] = PASSWORD
+    assert client.post("/auth/login", data=form).status_code == 429
+    # The owner logging in from elsewhere is not.
+    monkeypatch.setattr(client._transport, "client", ("10.0.0.2", 50000))
+    assert client.post("/auth/login", data=form).status_code == 204
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+from src.user.constant import ErrorCode
+from src.user.repositry import UserReadRepository
+
+pytestmark = pytest.mark.db
+
+
+def _walk(client, url: str, headers: dict, **params) -> list[dict]:
+    """Every item of a paged listing, following ``next_cursor``."""
+    items, cursor = [], None
+    while True:
+        page_params = params | ({"cursor": cursor} if cursor else {})
+        response = client.get(url, params=page_params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.fixture
+def circle(make_user, befriend) -> dict[str, dict]:
+    """Alice, her friend Bob, his friend Carol and two strangers."""
+    users = {
+        name: make_user(f"{name}@example.com")
+        for name in ("alice", "bob", "carol", "dave", "erin")
+    }
+    befriend(users["alice"], users["bob"])
+    befriend(users["bob"], users["carol"])
+    return users
+
+
+def test_search_lists_friends_then_friends_of_friends(client, circle):
+    alice = circle["alice"]
+    response = client.get(
+        "/user/search", params={"q": "test user"}, headers=alice["headers"]
+    )
+    assert response.status_code == 200, response.text
+    page = response.json()
+    ids = [item["id"] for item in page["items"]]
+
+    assert page["next_cursor"] is None
+    assert ids[:2] == [circle["bob"]["id"], circle["carol"]["id"]]
+    assert set(ids[2:]) == {circle["dave"]["id"], circle["erin"]["id"]}
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_search_cursor_runs_across_tiers(client, circle, limit):
+    headers = circle["alice"]["headers"]
+    whole = client.get(
+        "/user/search", params={"q": "test user"}, headers=headers
+    ).json()["items"]
+
+    pages = _walk(client, "/user/search", headers, q="test user", limit=limit)
+    assert pages == whole
+
+
+def test_search_pages_are_cached(client, circle, monkeypatch):
+    headers = circle["alice"]["headers"]
+    first = _walk(client, "/user/search", headers, q="Test  User", limit=2)
+
+    async def unreachable(*args, **kwargs):
+        raise AssertionError("searched the database again")
+
+    monkeypatch.setattr(UserReadRepository, "search", unreachable)
+    # Normalised the same way, so every page is a cache hit.
+    assert _walk(client, "/user/search", headers, q="test user", limit=2) == (
+        first
+    )
+
+
+def test_search_rejects_an_invalid_cursor(client, user):
+    response = client.get(
+        "/user/search",
+        params={"q": "test user", "cursor": "not-a-cursor"},
+        headers=user["headers"],
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == ErrorCode.INVALID_CURSOR
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_friends_pages_round_trip(client, make_user, befriend, limit):
+    alice = make_user("alice@example.com")
+    friends = [make_user(f"friend{i}@example.com") for i in range(4)]
+    for friend in friends:
+        befriend(alice, friend)
+    url = f"/user/{alice['id']}/friends"
+
+    whole = client.get(url, params={"limit": 10}, headers=alice["headers"])
+    assert sorted(item["id"] for item in whole.json()["items"]) == sorted(
+        friend["id"] for friend in friends
+    )
+
+    items = _walk(client, url, alice["headers"], limit=limit)
+    assert items == whole.json()["items"]
+
+
+def test_users_pages_round_trip(client, make_user):
+    users = [make_user(f"user{i}@example.com") for i in range(5)]
+    items = _walk(client, "/user", users[0]["headers"], limit=2)
+    assert [item["id"] for item in items] == [
+        item["id"]
+        for item in client.get(
+            "/user", params={"limit": 10}, headers=users[0]["headers"]
+        ).json()["items"]
+    ]
+    assert len(items) == len(users)
+
+
+@pytest.mark.parametrize("url", ["/user", "/user/{id}/friends"])
+def test_listings_reject_an_invalid_cursor(client, user, url):
+    response = client.get(
+        url.format(id=user["id"]),
+        params={"cursor": "not-a-cursor"},
+        headers=user["headers"],
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == ErrorCode.INVALID_CURSOR
+
+
+def test_listings_stream_as_ndjson(client, make_user, befriend, monkeypatch):
+    # Several batches per stream.
+    monkeypatch.setattr("src.user.repositry.STREAM_BATCH_SIZE", 2)
+    alice = make_user("alice@example.com")
+    friends = [make_user(f"friend{i}@example.com") for i in range(3)]
+    for friend in friends:
+        befriend(alice, friend)
+
+    for url, count in [
+        ("/user", len(friends) + 1),
+        (f"/user/{alice['id']}/friends", len(friends)),
+    ]:
+        response = client.get(
+            url, params={"stream": "true"}, headers=alice["headers"]
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert len(lines) == count
+        assert all(json.loads(line)["id"] for line in lines)
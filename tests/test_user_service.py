@@ -0,0 +1,86 @@
+from uuid import uuid4
+
+import pytest
+
+from src.auth.exceptions import UserAlreadyExists, UserNotExists
+from src.user.exception import AlreadyFriend, AlreadySentRequest, NotFound
+from src.user.repositry import FakeUserRepository
+from src.user.service import User
+
+
+def _user(name: str) -> User:
+    return User(uuid4(), name.title(), "User", f"{name}@example.com")
+
+
+def test_user_has_no_instance_dict():
+    alice = _user("alice")
+    assert not hasattr(alice, "__dict__")
+    with pytest.raises(AttributeError):
+        alice.nickname = "al"
+
+
+def test_containers_are_created_on_first_write():
+    alice, bob, carol = _user("alice"), _user("bob"), _user("carol")
+    assert (alice._friend, alice._sent, alice._received) == (None, None, None)
+    assert alice.send_request == alice.receive_request == []
+
+    request = alice.send_friendrequest(bob, "hi")
+    assert alice._sent == {bob.id: request}
+    assert bob._received == {alice.id: request}
+    # Only the side that was written to gets a container.
+    assert alice._received is None and bob._sent is None
+    assert carol._sent is carol._received is carol._friend is None
+
+
+def test_request_back_accepts():
+    alice, bob = _user("alice"), _user("bob")
+    request = alice.send_friendrequest(bob)
+    with pytest.raises(AlreadySentRequest):
+        alice.send_friendrequest(bob)
+
+    assert bob.send_friendrequest(alice) == request
+    assert alice._is_friend(bob) and bob._is_friend(alice)
+    assert alice.send_request == bob.receive_request == []
+    with pytest.raises(AlreadyFriend):
+        alice.send_friendrequest(bob)
+
+
+def test_removed_friend_keeps_a_request():
+    alice, bob = _user("alice"), _user("bob")
+    alice.send_friendrequest(bob)
+    bob.send_friendrequest(alice)
+
+    alice.remove_from_friend(bob)
+    assert not alice._is_friend(bob)
+    assert alice.get_request(bob).sender_id == bob.id
+    with pytest.raises(NotFound):
+        alice.remove_from_friend(bob)
+
+
+def test_repository_indexes_by_id_and_email():
+    alice, bob = _user("alice"), _user("bob")
+    repository = FakeUserRepository([alice])
+    repository.add(bob)
+
+    assert repository.get_by_id(bob.id) is bob
+    assert repository.get_by_email("alice@example.com") is alice
+    assert set(repository.list()) == {alice, bob}
+    with pytest.raises(UserNotExists):
+        repository.get_by_id(uuid4())
+    with pytest.raises(UserNotExists):
+        repository.get_by_email("carol@example.com")
+    with pytest.raises(UserAlreadyExists):
+        repository.add(User(uuid4(), "Alice", "Again", "alice@example.com"))
+
+
+def test_add_many_adds_all_or_nothing():
+    repository = FakeUserRepository([_user("alice")])
+    carol = _user("carol")
+    with pytest.raises(UserAlreadyExists):
+        repository.add_many([carol, _user("alice")])
+    with pytest.raises(UserAlreadyExists):
+        repository.add_many([_user("dave"), _user("dave")])
+
+    assert len(repository.list()) == 1
+    with pytest.raises(UserNotExists):
+        repository.get_by_id(carol.id)